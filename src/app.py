@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 
+from src.common.json_codec import CodecJSONResponse
 from src.entrypoints import router
+from src.infra.adapters.acl.http_client import close_http_client, start_http_client
+from src.infra.adapters.database.orm.settings import async_engine
 from src.infra.adapters.logging.settings import set_up_logger
+from src.infra.adapters.metrics.settings import PrometheusMiddleware, instrument_engine, mark_worker_dead
+from src.infra.adapters.trace.settings import instrument_app, set_up_tracing, shutdown_tracing
 from src.settings import get_settings
 
 
@@ -10,9 +15,16 @@ def create_app():
         title=get_settings().server_settings.project_description_api,
         version=get_settings().server_settings.project_version_api,
         contact=get_settings().server_settings.project_contact_api,
-        on_startup=[set_up_logger],
+        default_response_class=CodecJSONResponse,
+        on_startup=[set_up_logger, start_http_client],
+        on_shutdown=[close_http_client, mark_worker_dead, shutdown_tracing],
     )
     _app.include_router(router)
+    if get_settings().metrics_settings.metrics_enabled:
+        _app.add_middleware(PrometheusMiddleware)
+        instrument_engine(async_engine)
+    if set_up_tracing():
+        instrument_app(_app)
 
     return _app
 
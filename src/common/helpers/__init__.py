@@ -1,2 +1,3 @@
 from src.common.helpers.date_helper import DateHelper  # noqa F401
 from src.common.helpers.exception_helper import ExceptionHelper  # noqa F401
+from src.common.helpers.number_helper import NumberHelper  # noqa F401
@@ -5,6 +5,23 @@ from dateutil.relativedelta import relativedelta
 
 from src.settings import get_settings
 
+MONTH_TRANSLATIONS = {
+    'Jan': 'Jan',
+    'Feb': 'Fev',
+    'Mar': 'Mar',
+    'Apr': 'Abr',
+    'May': 'Mai',
+    'Jun': 'Jun',
+    'Jul': 'Jul',
+    'Aug': 'Ago',
+    'Sep': 'Set',
+    'Oct': 'Out',
+    'Nov': 'Nov',
+    'Dec': 'Dez',
+}
+# Abbreviation in pt_BR by month number - 1, independent of the locale of the process
+MONTH_ABBREVIATIONS_PT_BR = tuple(MONTH_TRANSLATIONS.values())
+
 
 @dataclass
 class DateHelper:
@@ -27,21 +44,12 @@ class DateHelper:
 
     @staticmethod
     def translate_month(month):
-        translation_dict = {
-            'Jan': 'Jan',
-            'Feb': 'Fev',
-            'Mar': 'Mar',
-            'Apr': 'Abr',
-            'May': 'Mai',
-            'Jun': 'Jun',
-            'Jul': 'Jul',
-            'Aug': 'Ago',
-            'Sep': 'Set',
-            'Oct': 'Out',
-            'Nov': 'Nov',
-            'Dec': 'Dez',
-        }
-        return translation_dict.get(month, month)
+        return MONTH_TRANSLATIONS.get(month, month)
+
+    @staticmethod
+    def month_abbreviation(date: datetime) -> str:
+        """Get the abbreviation of the month in pt_BR, e.g. Fev"""
+        return MONTH_ABBREVIATIONS_PT_BR[date.month - 1]
 
     @staticmethod
     def subtract_from(date: datetime, days: int = 0, hours: int = 0) -> datetime:
@@ -0,0 +1,19 @@
+from decimal import ROUND_HALF_EVEN, Decimal
+
+_CENTS = Decimal('0.01')
+_PT_BR_SEPARATORS = str.maketrans({',': '.', '.': ','})
+
+
+class NumberHelper:
+    @staticmethod
+    def format_decimal_pt_br(value: int | float | Decimal) -> str:
+        """Format the number with two decimal places in pt_BR, the same as babel's
+        ``format_decimal(value, format='#,##0.00', locale='pt_BR')`` without resolving the locale on every call.
+
+        :return: e.g. 1.234,50
+        """
+        if isinstance(value, int):
+            return f'{value:,}.00'.translate(_PT_BR_SEPARATORS)
+
+        number = Decimal(str(value)) if isinstance(value, float) else value
+        return f'{number.quantize(_CENTS, rounding=ROUND_HALF_EVEN):,}'.translate(_PT_BR_SEPARATORS)
@@ -0,0 +1,102 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+@dataclass
+class LatencyHistogram:
+    """Latency in seconds counted in fixed buckets.
+
+    Observing is a bisect and an increment, and histograms with the same buckets can be merged, e.g. the
+    histograms of each process of a job.
+    """
+
+    bounds: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    buckets: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def __post_init__(self):
+        if not self.buckets:
+            self.buckets = [0] * (len(self.bounds) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        if other.bounds != self.bounds:
+            raise ValueError('Histograms with different buckets can not be merged')
+
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, quantile: float) -> float:
+        """Estimate the latency of the quantile (0 to 1) interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+
+        rank = quantile * self.count
+        cumulative = 0
+        for index, bucket in enumerate(self.buckets):
+            if bucket and cumulative + bucket >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.maximum
+                return min(lower + (upper - lower) * (rank - cumulative) / bucket, self.maximum)
+            cumulative += bucket
+
+        return self.maximum
+
+    def prometheus_samples(self, name: str, labels: str = '') -> list[str]:
+        """Samples of the histogram in the Prometheus text format, with cumulative buckets
+
+        :param: name: metric name, without the _bucket, _sum and _count suffixes
+        :param: labels: labels of every sample, rendered, e.g. 'stage="send"'
+        """
+        separator = ',' if labels else ''
+        selector = f'{{{labels}}}' if labels else ''
+        samples, cumulative = [], 0
+        for bound, bucket in zip((*self.bounds, '+Inf'), self.buckets):
+            cumulative += bucket
+            samples.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        samples.append(f'{name}_sum{selector} {self.total}')
+        samples.append(f'{name}_count{selector} {self.count}')
+        return samples
+
+    def summary(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.maximum,
+        }
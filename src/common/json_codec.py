@@ -0,0 +1,60 @@
+"""JSON encoding shared by the http clients, the JSON columns and the API responses.
+
+Backed by orjson when it is installed, otherwise by the stdlib json with the same output: compact, UTF-8, datetimes
+in ISO 8601, Decimals as strings to keep them exact, dataclasses as objects and models through their ``to_dict``.
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'stdlib'
+
+
+def _default(obj: Any) -> Any:
+    """Encode the types orjson does not know, and for the stdlib json also the ones orjson knows"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if is_dataclass(obj):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+dumps = _orjson_dumps if orjson is not None else _stdlib_dumps
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps_str(obj: Any) -> str:
+    """Encode to str, as expected by the json_serializer of the SQLAlchemy engine"""
+    return dumps(obj).decode()
+
+
+class CodecJSONResponse(JSONResponse):
+    """Default response class of the API, encoding with the codec"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
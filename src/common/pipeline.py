@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Optional
+
+from src.common.histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_FAILED = object()
+
+
+@dataclass
+class Stage:
+    """Step of a pipeline executed by ``workers`` concurrent tasks.
+
+    The handler receives one item and returns the item handed over to the next stage, or ``None`` to drop it. With
+    ``batch_size`` above one it receives a list with up to ``batch_size`` items, the ones already waiting in the
+    queue, and returns a list with the result of each item.
+    """
+
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    batch_size: int = 1
+
+
+@dataclass
+class StageStats:
+    """Items handled by a stage and the time of each handler call, a batch counting as one call"""
+
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def merge(self, other: 'StageStats') -> 'StageStats':
+        self.processed += other.processed
+        self.skipped += other.skipped
+        self.failed += other.failed
+        self.latency.merge(other.latency)
+        return self
+
+
+@dataclass
+class Pipeline:
+    """Run items through a sequence of stages connected by bounded queues.
+
+    A full queue blocks the stage feeding it, so the throughput is limited by the slowest stage and the number of
+    items in memory never exceeds ``queue_size`` per stage plus the items being handled by the workers.
+
+    ``latency`` counts the time each item took from leaving the source to leaving the last stage, and ``on_done`` is
+    called with every item leaving the pipeline, processed by the last stage, skipped or failed, the failed ones being
+    given to ``on_failed`` before. The statistics of ``source_name`` count the items read from the source and the
+    time waiting for each one.
+    """
+
+    stages: list[Stage]
+    queue_size: int = 100
+    source_name: str = 'source'
+    on_done: Optional[Callable[[Any], None]] = None
+    on_failed: Optional[Callable[[Any], None]] = None
+    stats: dict[str, StageStats] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    async def run(self, source: AsyncIterable[Any]) -> dict[str, StageStats]:
+        """Consume the source until it is exhausted and wait every stage to drain
+
+        :param: source: async iterable with the items of the first stage
+
+        :return: statistics by stage name
+        """
+        self.stats = {self.source_name: StageStats(), **{stage.name: StageStats() for stage in self.stages}}
+        self.latency = LatencyHistogram()
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+
+        tasks = [asyncio.create_task(self._produce(source, queues[0], self.stages[0].workers))]
+        for index, stage in enumerate(self.stages):
+            has_next = index + 1 < len(self.stages)
+            tasks.append(
+                asyncio.create_task(
+                    self._run_stage(
+                        stage,
+                        input_queue=queues[index],
+                        output_queue=queues[index + 1] if has_next else None,
+                        next_workers=self.stages[index + 1].workers if has_next else 0,
+                    )
+                )
+            )
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return self.stats
+
+    async def _produce(self, source: AsyncIterable[Any], queue: asyncio.Queue, workers: int) -> None:
+        stats = self.stats[self.source_name]
+        waiting_since = time.perf_counter()
+        async for item in source:
+            read_at = time.perf_counter()
+            stats.latency.observe(read_at - waiting_since)
+            stats.processed += 1
+            await queue.put((read_at, item))
+            waiting_since = time.perf_counter()
+
+        for _ in range(workers):
+            await queue.put(_STOP)
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        input_queue: asyncio.Queue,
+        output_queue: Optional[asyncio.Queue],
+        next_workers: int,
+    ) -> None:
+        await asyncio.gather(*(self._work(stage, input_queue, output_queue) for _ in range(stage.workers)))
+
+        for _ in range(next_workers):
+            await output_queue.put(_STOP)
+
+    async def _work(self, stage: Stage, input_queue: asyncio.Queue, output_queue: Optional[asyncio.Queue]) -> None:
+        stats = self.stats[stage.name]
+
+        while True:
+            entries, stopped = await self._take(input_queue, stage.batch_size)
+            results = []
+            if entries:
+                handled_at = time.perf_counter()
+                results = await self._handle(stage, [item for _, item in entries])
+                stats.latency.observe(time.perf_counter() - handled_at)
+
+            for (started_at, item), result in zip(entries, results):
+                if result is _FAILED:
+                    stats.failed += 1
+                    if self.on_failed is not None:
+                        self.on_failed(item)
+                    self._done(item)
+                elif result is None:
+                    stats.skipped += 1
+                    self._done(item)
+                else:
+                    stats.processed += 1
+                    if output_queue is not None:
+                        await output_queue.put((started_at, result))
+                    else:
+                        self.latency.observe(time.perf_counter() - started_at)
+                        self._done(result)
+
+            if stopped:
+                return
+
+    @staticmethod
+    async def _take(queue: asyncio.Queue, batch_size: int) -> tuple[list[tuple[float, Any]], bool]:
+        """Wait for one entry and take the ones already waiting up to the batch size, telling if the stop was read"""
+        entries = []
+        entry = await queue.get()
+        while entry is not _STOP:
+            entries.append(entry)
+            if len(entries) >= batch_size or queue.empty():
+                return entries, False
+            entry = queue.get_nowait()
+
+        return entries, True
+
+    @staticmethod
+    async def _handle(stage: Stage, items: list[Any]) -> list[Any]:
+        try:
+            if stage.batch_size > 1:
+                return await stage.handler(items)
+            return [await stage.handler(items[0])]
+        except Exception as err:
+            failed = items if stage.batch_size > 1 else items[0]
+            logger.error(f'Stage {stage.name} failed for item {failed}, error: {err!r}')  # noqa G004
+            return [_FAILED] * len(items)
+
+    def _done(self, item: Any) -> None:
+        if self.on_done is not None:
+            self.on_done(item)
@@ -1,48 +1,140 @@
+import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Optional
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, TypeVar
 
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.domain.bank_billet.batch_item_writer import BatchItemWriter, save_batch_items
+from src.domain.bank_billet.dedupe import billet_idempotency_key
 from src.domain.bank_billet.use_cases.build_payload_for_create_billet import BuildPayload
 from src.infra.adapters.acl.acl_create_billet import CreateBilletRequest
+from src.infra.adapters.acl.circuit_breaker import CircuitOpenError
+from src.infra.adapters.database.orm import FinancialInstallment, Financing
 from src.infra.adapters.database.orm.models.bank_billet_creation_batch_item import BankBilletCreationBatchItem
 from src.infra.adapters.database.orm.settings import get_session
 from src.infra.adapters.repositories.bank_billet_creation_batch_item import RepositoryBankBilletCreationBatchItem
-from src.infra.adapters.repositories.financial_installment import RepositoryFinancialInstallment
-from src.services.exceptions import SQLAlchemyException
+from src.infra.adapters.repositories.financial_installment import (
+    FinancialInstallmentProjection,
+    FinancingProjection,
+    RepositoryFinancialInstallment,
+)
+from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+
+async def wait_while_circuit_is_open(call: Callable[[], Awaitable[T]]) -> T:
+    """Call the provider, waiting while its circuit is open instead of failing, up to the job max wait"""
+    give_up_at = time.monotonic() + get_settings().job_settings.job_circuit_open_max_wait_seconds
+    while True:
+        try:
+            return await call()
+        except CircuitOpenError as err:
+            if time.monotonic() + err.retry_after > give_up_at:
+                raise
+            await asyncio.sleep(err.retry_after)
+
 
 @dataclass
 class CreateBillet:
     installment_id: int
-    batch_id: int
+    batch_id: Optional[int]
+    financial_installment: Optional[FinancialInstallment | FinancialInstallmentProjection] = field(
+        default=None, repr=False
+    )
+    financing: Optional[Financing | FinancingProjection] = field(default=None, repr=False)
+    payload: Optional[dict] = field(default=None, repr=False)
+    response: Optional[dict] = field(default=None, repr=False)
 
     async def handle_create_billet(self) -> dict:
+        if self.financial_installment is None:
+            await self.fetch()
+        await self.build()
+        await self.send()
+        await self.persist()
+
+        return self.response
+
+    async def fetch(self) -> 'CreateBillet':
         async with get_session() as session:
             database = RepositoryFinancialInstallment(session)
             result_query_as_dict = await database.get_financial_installment_by_id(self.installment_id)
 
-        payload = await BuildPayload(
-            financial_installments=result_query_as_dict.get('financial_installments', None),
-            financings=result_query_as_dict.get('financings', None),
+        self.financial_installment = result_query_as_dict.get('financial_installments', None)
+        self.financing = result_query_as_dict.get('financings', None)
+        return self
+
+    async def build(self) -> 'CreateBillet':
+        self.payload = await BuildPayload(
+            financial_installments=self.financial_installment,
+            financings=self.financing,
         ).build_payload_for_create_billet()
+        return self
+
+    @property
+    def idempotency_key(self) -> str:
+        return billet_idempotency_key(
+            self.installment_id, self.financial_installment.number, self.financial_installment.expire_on
+        )
 
-        response = await CreateBilletRequest().create_billet(payload)
+    async def send(self) -> 'CreateBillet':
+        self.response = await wait_while_circuit_is_open(
+            lambda: CreateBilletRequest().create_billet(self.payload, idempotency_key=self.idempotency_key)
+        )
 
         logger.info(
             f'Response for creation billet for id financial installment: {self.installment_id}, '  # noqa G004
-            f'Response: {response.get("content")}'  # noqa G004
+            f'Response: {self.response.get("content")}'  # noqa G004
         )
+        return self
 
+    async def persist(self, writer: Optional[BatchItemWriter] = None) -> 'CreateBillet':
         await SaveInfoBillet(
-            content=response.get('content'),
-            status_code=response.get('status_code'),
+            content=self.response.get('content'),
+            status_code=self.response.get('status_code'),
             batch_id=self.batch_id,
             installment_id=self.installment_id,
-        ).handle_save_batch_items()
+        ).handle_save_batch_items(writer)
+        return self
+
+    @staticmethod
+    async def send_many(billets: list['CreateBillet']) -> list['CreateBillet']:
+        """Send the payloads of the billets with the batch requests of the provider"""
+        responses = await wait_while_circuit_is_open(
+            lambda: CreateBilletRequest().create_billets(
+                [billet.payload for billet in billets], [billet.idempotency_key for billet in billets]
+            )
+        )
 
-        return response
+        for billet, response in zip(billets, responses):
+            billet.response = response
+        logger.info(
+            f'Responses for creation of {len(billets)} billets, '  # noqa G004
+            f'status codes: {[response.get("status_code") for response in responses]}'  # noqa G004
+        )
+        return billets
+
+    @staticmethod
+    async def persist_many(
+        billets: list['CreateBillet'], writer: Optional[BatchItemWriter] = None
+    ) -> list['CreateBillet']:
+        await SaveInfoBillet.save_all(
+            [
+                SaveInfoBillet(
+                    content=billet.response.get('content'),
+                    status_code=billet.response.get('status_code'),
+                    batch_id=billet.batch_id,
+                    installment_id=billet.installment_id,
+                )
+                for billet in billets
+            ],
+            writer,
+        )
+        return billets
 
 
 @dataclass
@@ -52,37 +144,55 @@ class SaveInfoBillet:
     batch_id: Optional[int]
     installment_id: Optional[int]
 
-    async def handle_save_batch_items(self) -> None:
-        if self.status_code == 201:
-            await self.save_batch_items(
-                external_id=self.content.get('id'), status='done', description=self.content.get('description')
+    async def handle_save_batch_items(self, writer: Optional[BatchItemWriter] = None) -> None:
+        if writer is not None:
+            await writer.add(self.batch_item())
+        else:
+            await self.save_batch_items(**self.batch_item())
+
+    @staticmethod
+    async def save_all(infos: list['SaveInfoBillet'], writer: Optional[BatchItemWriter] = None) -> None:
+        """Save the batch items of every response together"""
+        values = [info.batch_item() for info in infos]
+        if writer is not None:
+            await writer.add_many(values)
+            return
+
+        try:
+            await save_batch_items(values)
+        except SQLAlchemyError as err:
+            logger.error(
+                f'Erro ao tentar salvar info no banco, installment_ids: '  # noqa G004
+                f'{[info.installment_id for info in infos]}, erro: {err}'  # noqa G004
             )
+
+    def batch_item(self) -> dict:
+        """Column values of the batch item which records the response of the billet creation"""
+        if self.status_code == 201:
+            external_id, status, description = self.content.get('id'), 'done', self.content.get('description')
         else:
             if self.content.get('erros'):
                 errors = self.content.get('erros')
-                description = f'{errors}'
             else:
                 errors = self.content.get('detail')
-                description = f'{errors}'
-
-            await self.save_batch_items(status='failed', description=description)
-
-    async def save_batch_items(self, external_id=None, status=None, description=None):
+            external_id, status, description = None, 'failed', f'{errors}'
+
+        return {
+            'bank_billet_creation_batch_id': self.batch_id,
+            'external_id': external_id,
+            'status': status,
+            'description': description,
+            'financial_installment_id': self.installment_id,
+            'content': self.content,
+        }
+
+    async def save_batch_items(self, **values):
         try:
             async with get_session() as session:
                 database = RepositoryBankBilletCreationBatchItem(session)
-                await database.save(
-                    BankBilletCreationBatchItem(
-                        bank_billet_creation_batch_id=self.batch_id,
-                        external_id=external_id,
-                        status=status,
-                        description=description,
-                        financial_installment_id=self.installment_id,
-                        content=self.content,
-                    )
-                )
+                await database.save(BankBilletCreationBatchItem(**values))
 
-        except SQLAlchemyException as err:
+        except SQLAlchemyError as err:
             logger.error(
                 f'Erro ao tentar salvar info no banco, installment_id: {self.installment_id}, erro: {err}'  # noqa G004
             )
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.common.histogram import LatencyHistogram
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.bank_billet_creation_batch_item import RepositoryBankBilletCreationBatchItem
+
+logger = logging.getLogger(__name__)
+
+
+async def save_batch_items(values: list[dict[str, Any]]) -> None:
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many(values)
+
+
+@dataclass
+class BatchItemWriter:
+    """Write-behind buffer of bank billet creation batch items.
+
+    Items are inserted together, in one transaction, when ``flush_size`` items are buffered or every
+    ``flush_interval_seconds``. When the insert fails the rows are retried one by one, so only the broken rows are
+    lost and reported in ``failed`` and to ``on_failed``. ``flush_latency`` counts the time of each flush.
+    """
+
+    flush_size: int
+    flush_interval_seconds: float
+    save_many: Callable[[list[dict[str, Any]]], Awaitable[None]] = save_batch_items
+    saved: int = 0
+    failed: list[tuple[dict[str, Any], str]] = field(default_factory=list)
+    on_failed: Optional[Callable[[dict[str, Any]], None]] = None
+    flush_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    _buffer: list[dict[str, Any]] = field(default_factory=list, repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    _flusher: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    async def __aenter__(self) -> 'BatchItemWriter':
+        self._flusher = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def add(self, values: dict[str, Any]) -> None:
+        self._buffer.append(values)
+
+        if len(self._buffer) >= self.flush_size:
+            await self.flush()
+
+    async def add_many(self, values: list[dict[str, Any]]) -> None:
+        self._buffer.extend(values)
+
+        if len(self._buffer) >= self.flush_size:
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the periodic flush and write the items still buffered"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+
+            started_at = time.perf_counter()
+            try:
+                await self.save_many(rows)
+                self.saved += len(rows)
+            except SQLAlchemyError as err:
+                logger.warning(
+                    f'Error when saving {len(rows)} batch items together, saving one by one: {err!r}'  # noqa G004
+                )
+                await self._save_one_by_one(rows)
+            finally:
+                self.flush_latency.observe(time.perf_counter() - started_at)
+
+    async def _save_one_by_one(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            try:
+                await self.save_many([row])
+                self.saved += 1
+            except SQLAlchemyError as err:
+                self.failed.append((row, repr(err)))
+                if self.on_failed is not None:
+                    self.on_failed(row)
+                logger.error(
+                    f'Erro ao tentar salvar info no banco, installment_id: {row.get("financial_installment_id")}, '  # noqa G004
+                    f'erro: {err!r}'  # noqa G004
+                )
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception as err:
+                logger.error(f'Error when flushing batch items: {err!r}')  # noqa G004
@@ -0,0 +1,48 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class CheckpointTracker:
+    """Low watermark of the installments handled by a run.
+
+    Installments are started in ascending id order but finish out of order, so the checkpoint is the greatest id
+    such that every installment started up to it has finished, and a run resumed with ``id > checkpoint`` never
+    skips an installment. A failed installment holds the checkpoint before it for the rest of the run, so the
+    resumed run retries it.
+    """
+
+    checkpoint: Optional[int] = None
+    _started: deque = field(default_factory=deque, repr=False)
+    _finished: set = field(default_factory=set, repr=False)
+    _failed: Optional[int] = field(default=None, repr=False)
+
+    def start(self, installment_id: int) -> None:
+        if self._failed is None or installment_id < self._failed:
+            self._started.append(installment_id)
+
+    def finish(self, installment_id: int) -> None:
+        if self._failed is not None and installment_id >= self._failed:
+            return
+        self._finished.add(installment_id)
+
+        while self._started and self._started[0] in self._finished:
+            self.checkpoint = self._started.popleft()
+            self._finished.discard(self.checkpoint)
+
+    def fail(self, installment_id: int) -> None:
+        """Hold the checkpoint before the installment, even when it has already gone past it"""
+        if self._failed is not None and installment_id >= self._failed:
+            return
+        self._failed = installment_id
+        self.checkpoint = self.held(self.checkpoint)
+
+        while self._started and self._started[-1] >= installment_id:
+            self._finished.discard(self._started.pop())
+
+    def held(self, checkpoint: Optional[int]) -> Optional[int]:
+        """The checkpoint, or the one just before the first failed installment when it is greater"""
+        if self._failed is None or checkpoint is None or checkpoint < self._failed:
+            return checkpoint
+        return self._failed - 1
@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from datetime import date
+from hashlib import sha256
+from typing import Optional
+
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.bank_billet_creation_batch_item import RepositoryBankBilletCreationBatchItem
+
+
+def billet_idempotency_key(installment_id: int, number: int, expire_on: date) -> str:
+    """Key sent with the billet request, the same for every request of the installment, so the provider creates its
+    billet only once"""
+    return sha256(f'{installment_id}:{number}:{expire_on:%Y-%m-%d}'.encode()).hexdigest()
+
+
+@dataclass
+class BilletDedupeIndex:
+    """Installments that already have a billet created, checked in O(1) before calling the provider.
+
+    Preloaded from the done batch items at the start of the run and updated with the billets created by it.
+    """
+
+    installment_ids: set[int] = field(default_factory=set)
+    skipped: int = 0
+
+    @classmethod
+    async def load(cls, after_id: Optional[int] = None) -> 'BilletDedupeIndex':
+        async with get_session() as session:
+            repository = RepositoryBankBilletCreationBatchItem(session)
+            return cls(installment_ids=await repository.find_done_installment_ids(after_id=after_id))
+
+    def __contains__(self, installment_id: int) -> bool:
+        return installment_id in self.installment_ids
+
+    def add(self, installment_id: int) -> None:
+        self.installment_ids.add(installment_id)
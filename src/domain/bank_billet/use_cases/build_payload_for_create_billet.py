@@ -1,14 +1,26 @@
 import logging
 from dataclasses import dataclass
-from datetime import date
 
-from babel.numbers import format_decimal
-
-from src.common.helpers import DateHelper
+from src.common.helpers import DateHelper, NumberHelper
 from src.infra.adapters.database.orm import FinancialInstallment, Financing
 
 logger = logging.getLogger(__name__)
 
+INSTRUCTIONS_DEFAULT = """Você também consegue acessar seus boletos através do nosso portal: cliente.xpto.com.br
+        Guarde esse site, para consultar quando precisar."""
+
+# Fields with the same value in every billet
+PAYLOAD_TEMPLATE = {
+    'fineType': 1,
+    'finePercentage': '2.00',
+    'fineValue': '0.01',
+    'daysForFine': 1,
+    'interestType': 0,
+    'interestPercentage': '0.03',
+    'interestValue': '0.01',
+    'daysToInterest': 1,
+}
+
 
 @dataclass
 class BuildPayload:
@@ -27,11 +39,6 @@ class BuildPayload:
         payment_slip_number_total = self.financings.installments_number
         return f'Parcela Nº {payment_slip_number}/{payment_slip_number_total} do Financiamento Solfácil'
 
-    @staticmethod
-    def _instructions_default():
-        return """Você também consegue acessar seus boletos através do nosso portal: cliente.xpto.com.br
-        Guarde esse site, para consultar quando precisar."""
-
     def _put_additional_numbers(self):
         value = str(self.financial_installments.number)
         number = value.rjust(3, '0')
@@ -40,7 +47,7 @@ class BuildPayload:
     def _tags(self):
         type_billet = 'regular'
         date_billet = self.parse_date()
-        currency = format_decimal(self.financial_installments.amount, format='#,##0.00', locale='pt_BR')
+        currency = NumberHelper.format_decimal_pt_br(self.financial_installments.amount)
         return [
             type_billet,
             date_billet,
@@ -48,26 +55,19 @@ class BuildPayload:
         ]
 
     def parse_date(self):
-        month_short, year = date.strftime(self.financial_installments.expire_on, '%b-%y').split('-')
-        translated_month_short = DateHelper.translate_month(month_short)
-        return f'{translated_month_short}-{year}'
+        expire_on = self.financial_installments.expire_on
+        return f'{DateHelper.month_abbreviation(expire_on)}-{expire_on.year % 100:02}'
 
     def _build_struct_to_send(self):
+        additional_numbers = self._put_additional_numbers()
         return {
             'amount': self.financial_installments.amount,
             'expireAt': self.financial_installments.expire_on.strftime('%Y-%m-%d'),
             'description': self.description(),
-            'instructions': self._instructions_default(),
-            'documentNumber': self._put_additional_numbers(),
-            'controlNumber': self._put_additional_numbers(),
+            'instructions': INSTRUCTIONS_DEFAULT,
+            'documentNumber': additional_numbers,
+            'controlNumber': additional_numbers,
             'tags': self._tags(),
             'customerID': self.financings.customer_id,
-            'fineType': 1,
-            'finePercentage': '2.00',
-            'fineValue': '0.01',
-            'daysForFine': 1,
-            'interestType': 0,
-            'interestPercentage': '0.03',
-            'interestValue': '0.01',
-            'daysToInterest': 1,
+            **PAYLOAD_TEMPLATE,
         }
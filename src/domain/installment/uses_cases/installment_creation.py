@@ -1,35 +1,90 @@
 import logging
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
 
 from src.domain.eventing.service import EventingService
-from src.infra.adapters.repositories.bank_billet_creation_batch import RepositoryBankBilletCreationBatch
-from src.services.service_base import try_query_except
 from src.infra.adapters.database.orm.models.bank_billet_creation_batch import BankBilletCreationBatch
-from src.services.exceptions import SQLAlchemyException
 from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.bank_billet_creation_batch import RepositoryBankBilletCreationBatch
+from src.services.service_base import try_query_except
 
 logger = logging.getLogger(__name__)
 
+BATCH_STATUS_PROCESSING = 'processing'
+BATCH_STATUS_DONE = 'done'
+BATCH_STATUS_FAILED = 'failed'
+BATCH_STATUS_INTERRUPTED = 'interrupted'
+BATCH_STATUS_RESUMABLE = (BATCH_STATUS_PROCESSING, BATCH_STATUS_INTERRUPTED, BATCH_STATUS_FAILED)
+
 
 @try_query_except
-async def send_installment_created_event(installment_id):
-    batch = create_bank_billet_creation_batch(installment_id)
-    event = EventingService(event='create', installment_id=installment_id, batch_id=batch.id)
+async def send_installment_created_event(installment_id, batch_id: Optional[int] = None):
+    if batch_id is None:
+        batch_id = (await open_bank_billet_creation_batch()).id
+
+    event = EventingService(event='create', installment_id=installment_id, batch_id=batch_id)
     await event.process_event()
     logger.info(f'Sent financial_installment {installment_id} successfully!')  # noqa G004
 
 
-async def create_bank_billet_creation_batch(installment_id):
-    try:
-        async with get_session() as session:
-            database = RepositoryBankBilletCreationBatch(session)
-    
-            return await database.save(BankBilletCreationBatch(
-                batch_identifier='xptoSomething',
-                status='pendding'
+def new_batch_identifier() -> str:
+    """Identifier of a batch, sortable by its creation time"""
+    return f'{datetime.utcnow():%Y%m%d%H%M%S}-{uuid4().hex[:12]}'
+
+
+async def open_bank_billet_creation_batch(run_key: Optional[str] = None) -> BankBilletCreationBatch:
+    """Create the batch which groups every billet created by one run"""
+    async with get_session() as session:
+        database = RepositoryBankBilletCreationBatch(session)
+        batch = await database.save(
+            BankBilletCreationBatch(
+                batch_identifier=new_batch_identifier(), status=BATCH_STATUS_PROCESSING, run_key=run_key
             )
         )
 
-    except SQLAlchemyException as err:
-        logger.error(
-            f'Erro ao tentar salvar info no banco, installment_id: {installment_id}, erro: {err}'  # noqa G004
-        )
+    logger.info(f'Opened bank billet creation batch {batch.batch_identifier}, id: {batch.id}')  # noqa G004
+    return batch
+
+
+async def resume_bank_billet_creation_batch(run_key: str) -> BankBilletCreationBatch:
+    """Resume the last batch of the run which did not finish, or open a new one"""
+    async with get_session() as session:
+        database = RepositoryBankBilletCreationBatch(session)
+        batch = await database.find_last_by_run_key(run_key, status=BATCH_STATUS_RESUMABLE)
+        if batch is not None:
+            await database.update(batch.id, {'status': BATCH_STATUS_PROCESSING, 'updated_at': datetime.utcnow()})
+
+    if batch is None:
+        return await open_bank_billet_creation_batch(run_key)
+
+    logger.info(
+        f'Resumed bank billet creation batch {batch.batch_identifier}, id: {batch.id}, '  # noqa G004
+        f'after installment {batch.checkpoint_installment_id}'  # noqa G004
+    )
+    return batch
+
+
+async def save_bank_billet_creation_batch_checkpoint(batch_id: int, checkpoint: Optional[int]) -> None:
+    """Save the last installment id handled by the run, all the lower ids were handled too"""
+    if checkpoint is None:
+        return
+
+    async with get_session() as session:
+        database = RepositoryBankBilletCreationBatch(session)
+        await database.update(batch_id, {'checkpoint_installment_id': checkpoint, 'updated_at': datetime.utcnow()})
+
+
+async def close_bank_billet_creation_batch(
+    batch_id: int, status: str = BATCH_STATUS_DONE, checkpoint: Optional[int] = None
+) -> None:
+    """Set the final status of the batch"""
+    values = {'status': status, 'updated_at': datetime.utcnow()}
+    if checkpoint is not None:
+        values['checkpoint_installment_id'] = checkpoint
+
+    async with get_session() as session:
+        database = RepositoryBankBilletCreationBatch(session)
+        await database.update(batch_id, values)
+
+    logger.info(f'Closed bank billet creation batch {batch_id} with status {status}')  # noqa G004
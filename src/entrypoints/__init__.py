@@ -2,8 +2,10 @@ from fastapi import APIRouter
 
 from src.entrypoints.routes import api_router, start
 from src.entrypoints.routes.health_check import router as router_health_check
+from src.entrypoints.routes.metrics import router as router_metrics
 
 router = APIRouter()
 router.include_router(router_health_check, tags=['Health'])
+router.include_router(router_metrics, tags=['Metrics'])
 router.include_router(start.router, tags=['Welcome'])
 router.include_router(api_router)
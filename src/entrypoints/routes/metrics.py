@@ -0,0 +1,15 @@
+import logging
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from src.infra.adapters.metrics.settings import render_metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get('/metrics', summary='Prometheus metrics of every worker of the API')
+async def metrics() -> Response:
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
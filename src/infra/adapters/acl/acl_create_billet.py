@@ -1,17 +1,134 @@
-import json
+import asyncio
+import time
+from functools import partial
+from typing import Optional
 
 import httpx
 
+from src.common import json_codec
+from src.infra.adapters.acl.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from src.infra.adapters.acl.http_client import get_http_client
+from src.infra.adapters.acl.rate_limiter import AdaptiveRateLimiter, get_rate_limiter, parse_retry_after
+from src.infra.adapters.acl.retry import Hedger, RetryPolicy, get_hedger, get_retry_policy
 from src.settings import get_settings
 
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_FIELD = 'idempotencyKey'
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 
 class CreateBilletRequest:
-    def __init__(self):
-        settings = get_settings()
-        self.base_url = f'{settings.broker_settings.any_api_external}'
-
-    async def create_billet(self, content: dict) -> dict:
-        async with httpx.AsyncClient(base_url=self.base_url, follow_redirects=True) as client:
-            response = await client.post('/xpto', json=content)
-            json_obj = json.loads(response.content)
-            return {'content': json_obj, 'status_code': response.status_code}
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedger: Optional[Hedger] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.client = client or get_http_client()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.hedger = hedger or get_hedger()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+
+    async def create_billet(self, content: dict, idempotency_key: Optional[str] = None) -> dict:
+        response = await self.post('/xpto', content, idempotency_key=idempotency_key)
+
+        json_obj = json_codec.loads(response.content)
+        return {'content': json_obj, 'status_code': response.status_code}
+
+    async def create_billets(
+        self, contents: list[dict], idempotency_keys: Optional[list[str]] = None
+    ) -> list[dict]:
+        """Create the billets with one request by ``broker_batch_size`` payloads
+
+        The provider answers a list with the result of each billet, matched to its payload by ``controlNumber``.
+
+        :param: idempotency_keys: key of each billet, sent in its own item of the batch body, so the provider
+            recognises a billet already created whichever chunk it is sent in
+        :return: content and status code of each billet, in the order of the payloads
+        """
+        size = get_settings().broker_settings.broker_batch_size
+        path = get_settings().broker_settings.broker_batch_path
+        payloads = contents
+        if idempotency_keys:
+            payloads = [
+                {**content, IDEMPOTENCY_KEY_FIELD: key} for content, key in zip(contents, idempotency_keys)
+            ]
+        bounds = [(start, start + size) for start in range(0, len(payloads), size)]
+        chunks = [payloads[start:end] for start, end in bounds]
+        responses = await asyncio.gather(
+            *(self.post(path, chunk, idempotent=bool(idempotency_keys)) for chunk in chunks)
+        )
+
+        return [
+            result for chunk, response in zip(chunks, responses) for result in self._batch_results(chunk, response)
+        ]
+
+    @staticmethod
+    def _batch_results(payloads: list[dict], response: httpx.Response) -> list[dict]:
+        json_obj = json_codec.loads(response.content)
+        if not response.is_success or not isinstance(json_obj, list):
+            return [{'content': json_obj, 'status_code': response.status_code} for _ in payloads]
+
+        results = {result.get('controlNumber'): result for result in json_obj}
+        missing = {'content': {'detail': 'Billet missing from the batch response'}, 'status_code': 502}
+        return [
+            (
+                {'content': result.get('content'), 'status_code': result.get('statusCode')}
+                if (result := results.get(payload.get('controlNumber'))) is not None
+                else missing
+            )
+            for payload in payloads
+        ]
+
+    async def post(
+        self, url: str, content: dict | list, idempotency_key: Optional[str] = None, idempotent: bool = False
+    ) -> httpx.Response:
+        """Post to the provider with rate limiting and retries, hedging the request when it is idempotent
+
+        Raises ``CircuitOpenError`` without sending anything while the circuit of the provider is open.
+
+        :param: url: path of the provider endpoint
+        :param: content: JSON body
+        :param: idempotency_key: sent in the Idempotency-Key header, the provider handles every request with the same
+            key only once, so the request can be retried and hedged safely
+        :param: idempotent: the request can be retried and hedged without a key in the header, e.g. a batch whose
+            items carry their own keys
+        """
+        idempotent = idempotent or idempotency_key is not None
+        headers = {**_JSON_HEADERS, IDEMPOTENCY_KEY_HEADER: idempotency_key} if idempotency_key else _JSON_HEADERS
+        send = partial(self._send, url, json_codec.dumps(content), headers)
+        if self.circuit_breaker is not None:
+            send = partial(self.circuit_breaker.call, send)
+        if idempotent and self.hedger is not None:
+            send = partial(self.hedger.run, send)
+
+        if self.retry_policy is None:
+            return await send()
+
+        return await self.retry_policy.run(send, idempotent=idempotent)
+
+    async def _send(self, url: str, content: bytes, headers: dict) -> httpx.Response:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+        started_at = time.perf_counter()
+        try:
+            response = await self.client.post(url, content=content, headers=headers)
+        except httpx.TimeoutException:
+            if self.rate_limiter is not None:
+                self.rate_limiter.on_timeout()
+            raise
+
+        latency = time.perf_counter() - started_at
+        if self.hedger is not None:
+            self.hedger.tracker.observe(latency)
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_response(
+                response.status_code,
+                latency_seconds=latency,
+                retry_after=parse_retry_after(response.headers.get('Retry-After')),
+            )
+        return response
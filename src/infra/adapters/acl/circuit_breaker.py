@@ -0,0 +1,129 @@
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_circuit_breaker: Optional['CircuitBreaker'] = None
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """The billet provider is considered down and the request was not sent"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'Circuit of the billet provider is open, retry after {retry_after:.3f} s')
+        self.retry_after = retry_after
+
+
+@dataclass
+class CircuitBreaker:
+    """Stop calling the billet provider after ``failure_threshold`` consecutive failures.
+
+    Failures are transport errors and 5xx responses. The open circuit rejects every call with ``CircuitOpenError``
+    during ``recovery_seconds``, then lets ``half_open_max_calls`` probes through: a successful probe closes the
+    circuit and a failed one opens it again. ``transitions`` counts the state changes, e.g. ``closed->open``.
+    """
+
+    failure_threshold: int = 5
+    recovery_seconds: float = 30.0
+    half_open_max_calls: int = 1
+    clock: Callable[[], float] = time.monotonic
+    state: CircuitState = CircuitState.CLOSED
+    transitions: Counter = field(default_factory=Counter)
+    rejected: int = 0
+    _failures: int = field(default=0, repr=False)
+    _opened_at: float = field(default=0.0, repr=False)
+    _probes: int = field(default=0, repr=False)
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        self._before_call()
+        try:
+            response = await send()
+        except httpx.TransportError:
+            self._on_failure()
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+
+        if response.status_code >= 500:
+            self._on_failure()
+        else:
+            self._on_success()
+        return response
+
+    def stats(self) -> dict:
+        return {'state': self.state.value, 'transitions': dict(self.transitions), 'rejected': self.rejected}
+
+    def _before_call(self) -> None:
+        if self.state is CircuitState.OPEN:
+            remaining = self._opened_at + self.recovery_seconds - self.clock()
+            if remaining > 0:
+                self._reject(remaining)
+            self._transition(CircuitState.HALF_OPEN)
+
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                self._reject(min(self.recovery_seconds, 1.0))
+            self._probes += 1
+
+    def _on_success(self) -> None:
+        self._release_probe()
+        self._failures = 0
+        if self.state is CircuitState.HALF_OPEN:
+            self._transition(CircuitState.CLOSED)
+
+    def _on_failure(self) -> None:
+        self._release_probe()
+        self._failures += 1
+        if self.state is CircuitState.HALF_OPEN or (
+            self.state is CircuitState.CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = self.clock()
+            self._transition(CircuitState.OPEN)
+
+    def _release_probe(self) -> None:
+        if self.state is CircuitState.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def _reject(self, retry_after: float) -> None:
+        self.rejected += 1
+        raise CircuitOpenError(retry_after)
+
+    def _transition(self, state: CircuitState) -> None:
+        logger.warning(
+            f'Circuit of the billet provider changed from {self.state.value} to {state.value}'  # noqa G004
+        )
+        self.transitions[f'{self.state.value}->{state.value}'] += 1
+        self.state = state
+        self._probes = 0
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """Get the circuit breaker shared by the process, or None when it is disabled"""
+    global _circuit_breaker
+
+    settings = get_settings().broker_settings
+    if not settings.broker_circuit_breaker_enabled:
+        return None
+
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.broker_circuit_breaker_failure_threshold,
+            recovery_seconds=settings.broker_circuit_breaker_recovery_seconds,
+        )
+
+    return _circuit_breaker
@@ -0,0 +1,70 @@
+import logging
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+
+from src.infra.adapters.trace.settings import instrument_http_client
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _is_http2_available() -> bool:
+    if not get_settings().broker_settings.broker_http2:
+        return False
+
+    if find_spec('h2') is None:
+        logger.warning('BROKER_HTTP2 is enabled but the h2 package is not installed, using HTTP/1.1')
+        return False
+
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a client for the billet provider with a pool of keep-alive connections"""
+    settings = get_settings().broker_settings
+    client = httpx.AsyncClient(
+        base_url=settings.any_api_external,
+        follow_redirects=True,
+        http2=_is_http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.broker_max_connections,
+            max_keepalive_connections=settings.broker_max_keepalive_connections,
+            keepalive_expiry=settings.broker_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.broker_connect_timeout_seconds,
+            read=settings.broker_read_timeout_seconds,
+            write=settings.broker_write_timeout_seconds,
+            pool=settings.broker_pool_timeout_seconds,
+        ),
+    )
+    instrument_http_client(client)
+    return client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the client shared by the process, creating it when the startup did not"""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+
+    return _http_client
+
+
+async def start_http_client() -> None:
+    """On startup, open the client shared by the process"""
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    """On shutdown, close the connections of the client shared by the process"""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_THROTTLING_STATUS = (429, 503)
+
+_rate_limiter: Optional['AdaptiveRateLimiter'] = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given in seconds or as an HTTP date"""
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class AdaptiveRateLimiter:
+    """Token bucket in front of the billet provider, with a rate adapted by AIMD.
+
+    Every successful response adds ``increase / rate``, so the rate grows ``increase`` requests/s each second of
+    successes. A throttled response (429/503), a timeout or a latency above the target multiplies the rate by
+    ``decrease_factor``, at most once by ``decrease_cooldown_seconds`` since the requests already in flight answer
+    the same. A Retry-After header pauses every request until it is over.
+    """
+
+    rate: float
+    min_rate: float
+    max_rate: float
+    increase: float
+    decrease_factor: float = 0.5
+    latency_target_seconds: Optional[float] = None
+    burst_seconds: float = 0.1
+    decrease_cooldown_seconds: float = 1.0
+    clock: Callable[[], float] = time.monotonic
+    _tokens: float = field(default=1.0, repr=False)
+    _updated_at: Optional[float] = field(default=None, repr=False)
+    _paused_until: float = field(default=0.0, repr=False)
+    _decreased_at: float = field(default=float('-inf'), repr=False)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.rate * self.burst_seconds)
+
+    async def acquire(self) -> None:
+        """Wait until a request can be sent to the provider"""
+        async with self._lock:
+            while True:
+                now = self.clock()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_response(self, status_code: int, latency_seconds: float, retry_after: Optional[float] = None) -> None:
+        if retry_after:
+            self._paused_until = max(self._paused_until, self.clock() + retry_after)
+
+        if status_code in _THROTTLING_STATUS:
+            self._decrease(f'status code {status_code}')
+        elif self.latency_target_seconds and latency_seconds > self.latency_target_seconds:
+            self._decrease(f'latency {latency_seconds:.3f} s')
+        elif status_code < 500:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_timeout(self) -> None:
+        self._decrease('timeout')
+
+    def _refill(self, now: float) -> None:
+        if self._updated_at is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _decrease(self, reason: str) -> None:
+        now = self.clock()
+        if now - self._decreased_at < self.decrease_cooldown_seconds:
+            return
+
+        self._decreased_at = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        logger.info(
+            f'Billet provider rate limit decreased to {self.rate:.2f} requests/s, caused by {reason}'  # noqa G004
+        )
+
+
+def get_rate_limiter() -> Optional[AdaptiveRateLimiter]:
+    """Get the rate limiter shared by the process, or None when it is disabled"""
+    global _rate_limiter
+
+    settings = get_settings().broker_settings
+    if not settings.broker_rate_limit_enabled:
+        return None
+
+    if _rate_limiter is None:
+        _rate_limiter = AdaptiveRateLimiter(
+            rate=settings.broker_rate_limit_initial_rate,
+            min_rate=settings.broker_rate_limit_min_rate,
+            max_rate=settings.broker_rate_limit_max_rate,
+            increase=settings.broker_rate_limit_increase,
+            decrease_factor=settings.broker_rate_limit_decrease_factor,
+            latency_target_seconds=settings.broker_rate_limit_latency_target_seconds,
+        )
+
+    return _rate_limiter
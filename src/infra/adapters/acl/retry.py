@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from src.infra.adapters.acl.rate_limiter import parse_retry_after
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses answered before the provider did anything, safe to retry even when the call is not idempotent
+_REJECTED_STATUS = frozenset({429, 503})
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Errors raised before the request left the client
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+Send = Callable[[], Awaitable[httpx.Response]]
+
+_retry_policy: Optional['RetryPolicy'] = None
+_hedger: Optional['Hedger'] = None
+
+
+@dataclass
+class RetryBudget:
+    """Tokens shared by every request of the process limiting retries and hedges to a ratio of the requests.
+
+    Each request deposits ``ratio`` tokens and each retry withdraws one, so during an outage the extra load sent to
+    the provider stays around ``ratio`` of the regular load instead of multiplying it by the attempts.
+    """
+
+    ratio: float = 0.1
+    max_tokens: float = 100.0
+    tokens: float = 10.0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class RetryPolicy:
+    """Retry transient failures with exponential backoff and full jitter, limited by a retry budget.
+
+    Calls that are not idempotent are only retried when the provider surely did not handle them: connection errors
+    and 429/503 responses. Idempotent calls are also retried on any transport error and on 5xx responses.
+    """
+
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.1
+    max_delay_seconds: float = 2.0
+    budget: RetryBudget = field(default_factory=RetryBudget)
+    random: Callable[[], float] = field(default=random.random, repr=False)
+
+    def backoff(self, attempt: int) -> float:
+        return self.random() * min(self.max_delay_seconds, self.base_delay_seconds * 2**attempt)
+
+    async def run(self, send: Send, idempotent: bool = False) -> httpx.Response:
+        attempt = 0
+        while True:
+            attempt += 1
+            self.budget.deposit()
+            retry_after = None
+            try:
+                response = await send()
+            except httpx.TransportError as err:
+                if not self._is_retryable_error(err, idempotent) or not self._can_retry(attempt):
+                    raise
+                reason = repr(err)
+            else:
+                if not self._is_retryable_status(response.status_code, idempotent) or not self._can_retry(attempt):
+                    return response
+                reason = f'status code {response.status_code}'
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            delay = max(self.backoff(attempt), retry_after or 0.0)
+            logger.warning(
+                f'Retrying billet provider request in {delay:.3f} s, attempt {attempt}, caused by {reason}'  # noqa G004
+            )
+            await asyncio.sleep(delay)
+
+    def _can_retry(self, attempt: int) -> bool:
+        return attempt < self.max_attempts and self.budget.withdraw()
+
+    @staticmethod
+    def _is_retryable_error(err: httpx.TransportError, idempotent: bool) -> bool:
+        return idempotent or isinstance(err, _NOT_SENT_ERRORS)
+
+    @staticmethod
+    def _is_retryable_status(status_code: int, idempotent: bool) -> bool:
+        return status_code in (_RETRYABLE_STATUS if idempotent else _REJECTED_STATUS)
+
+
+@dataclass
+class LatencyTracker:
+    """Latency quantile of the last ``window`` requests, recomputed every ``refresh_every`` observations"""
+
+    quantile: float = 0.95
+    window: int = 1000
+    min_samples: int = 20
+    refresh_every: int = 50
+    _samples: deque = field(default_factory=deque, repr=False)
+    _value: Optional[float] = field(default=None, repr=False)
+    _pending: int = field(default=0, repr=False)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        if len(self._samples) > self.window:
+            self._samples.popleft()
+
+        self._pending += 1
+        if (self._value is None and len(self._samples) >= self.min_samples) or self._pending >= self.refresh_every:
+            ordered = sorted(self._samples)
+            self._value = ordered[min(int(self.quantile * len(ordered)), len(ordered) - 1)]
+            self._pending = 0
+
+    @property
+    def value(self) -> Optional[float]:
+        """Latency of the quantile, or None while there are not enough samples"""
+        return self._value
+
+
+@dataclass
+class Hedger:
+    """Send a second copy of a slow request and keep the first answer.
+
+    The copy is sent when the request takes longer than the latency quantile observed by ``tracker``, and only if
+    the retry budget allows, so at most ``1 - quantile`` of the requests are hedged. Use only with idempotent calls.
+    """
+
+    tracker: LatencyTracker = field(default_factory=LatencyTracker)
+    budget: RetryBudget = field(default_factory=RetryBudget)
+    hedged: int = 0
+
+    async def run(self, send: Send) -> httpx.Response:
+        delay = self.tracker.value
+        first = asyncio.ensure_future(send())
+        tasks = [first]
+        try:
+            if delay is None:
+                return await first
+
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done or not self.budget.withdraw():
+                return await first
+
+            self.hedged += 1
+            tasks.append(asyncio.ensure_future(send()))
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # also when the caller is cancelled, so no request keeps running after it
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_retry_policy() -> Optional[RetryPolicy]:
+    """Get the retry policy shared by the process, or None when retries are disabled"""
+    global _retry_policy
+
+    settings = get_settings().broker_settings
+    if settings.broker_retry_max_attempts <= 1:
+        return None
+
+    if _retry_policy is None:
+        _retry_policy = RetryPolicy(
+            max_attempts=settings.broker_retry_max_attempts,
+            base_delay_seconds=settings.broker_retry_base_delay_seconds,
+            max_delay_seconds=settings.broker_retry_max_delay_seconds,
+            budget=RetryBudget(ratio=settings.broker_retry_budget_ratio),
+        )
+
+    return _retry_policy
+
+
+def get_hedger() -> Optional[Hedger]:
+    """Get the hedger shared by the process, or None when hedging is disabled"""
+    global _hedger
+
+    settings = get_settings().broker_settings
+    if not settings.broker_hedging_enabled:
+        return None
+
+    if _hedger is None:
+        retry_policy = get_retry_policy()
+        _hedger = Hedger(
+            tracker=LatencyTracker(quantile=settings.broker_hedging_quantile),
+            budget=retry_policy.budget if retry_policy else RetryBudget(ratio=settings.broker_retry_budget_ratio),
+        )
+
+    return _hedger
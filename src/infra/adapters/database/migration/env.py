@@ -5,16 +5,28 @@ from alembic import context
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from src.infra.adapters.database.orm.models.base import BaseModel
-from src.settings import get_settings
+from src.settings import Env, get_settings, is_env
 
 target_metadata = BaseModel.metadata
 
 
+def _get_async_uri():
+    """sqlalchemy.url of the alembic config when given, e.g. by the tests, otherwise the one of the environment"""
+    uri = context.config.get_main_option('sqlalchemy.url')
+    if uri:
+        return uri
+    if is_env(Env.UNITTEST):
+        return get_settings().database_settings.database_unittest_async_uri
+    return get_settings().database_settings.database_async_uri
+
+
 def do_run_migrations(connection):
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
         include_schemas=True,
+        # SQLite alters tables by copying them
+        render_as_batch=connection.dialect.name == 'sqlite',
     )
 
     with context.begin_transaction():
@@ -28,7 +40,7 @@ async def run_migrations_online():
     and associate a connection with the context.
 
     """
-    connectable = create_async_engine(get_settings().database_settings.database_async_uri, pool_pre_ping=True)
+    connectable = create_async_engine(_get_async_uri(), pool_pre_ping=True)
 
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
@@ -0,0 +1,115 @@
+"""create billing tables
+
+Revision ID: 0b5e8c1d2a47
+Revises:
+Create Date: 2026-10-18 11:00:00.000000
+
+Tables of the models before the first revision. A database created before the migrations already has them and
+must be stamped with this revision instead of running it: alembic stamp 0b5e8c1d2a47
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5e8c1d2a47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _entity_columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'financings',
+        sa.Column('project_amount', sa.Integer(), nullable=False),
+        sa.Column('identifier', sa.String(length=255), nullable=False),
+        sa.Column('issued_date', sa.DateTime(), nullable=True),
+        sa.Column('registration_fee', sa.String(length=255), nullable=False),
+        sa.Column('iof', sa.Integer(), nullable=False),
+        sa.Column('interest_fee', sa.Integer(), nullable=False),
+        sa.Column('cet', sa.String(length=255), nullable=False),
+        sa.Column('installments_number', sa.Integer(), nullable=False),
+        sa.Column('grace_period', sa.Integer(), nullable=False),
+        sa.Column('first_installment_date', sa.DateTime(), nullable=True),
+        sa.Column('last_installment_date', sa.DateTime(), nullable=True),
+        sa.Column('securitization', sa.String(length=255), nullable=False),
+        sa.Column('installment_amount', sa.Integer(), nullable=False),
+        sa.Column('next_ipca_update', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=255), nullable=False),
+        sa.Column('renegotiated', sa.String(length=255), nullable=False),
+        sa.Column('ipca_type', sa.String(length=255), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        *_entity_columns(),
+        sa.PrimaryKeyConstraint('id', name=op.f('financings_pkey')),
+    )
+    op.create_table(
+        'financial_installments',
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=255), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('expire_on', sa.DateTime(), nullable=True),
+        sa.Column('paid_at', sa.DateTime(), nullable=True),
+        sa.Column('paid_amount', sa.Integer(), nullable=False),
+        sa.Column('provider', sa.String(length=255), nullable=False),
+        sa.Column('discount_amount', sa.Integer(), nullable=False),
+        sa.Column('interest_amount', sa.Integer(), nullable=False),
+        sa.Column('securitization', sa.String(length=255), nullable=False),
+        sa.Column('financing_id', sa.Integer(), nullable=False),
+        *_entity_columns(),
+        sa.PrimaryKeyConstraint('id', name=op.f('financial_installments_pkey')),
+    )
+    op.create_table(
+        'payments',
+        sa.Column('financial_installment_id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.String(length=255), nullable=False),
+        sa.Column('issued_at', sa.DateTime(), nullable=False),
+        sa.Column('paid_at', sa.DateTime(), nullable=False),
+        sa.Column('paid_amount', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=255), nullable=False),
+        sa.Column('type', sa.String(length=255), nullable=False),
+        sa.Column('provider', sa.String(length=255), nullable=False),
+        sa.Column('tags', sa.Text(), nullable=True),
+        sa.Column('amount_installment_payable', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Integer(), nullable=False),
+        sa.Column('overpaid_amount', sa.Integer(), nullable=False),
+        sa.Column('discount_amount', sa.Integer(), nullable=False),
+        sa.Column('interest_amount', sa.Integer(), nullable=False),
+        sa.Column('financing_id', sa.Integer(), nullable=False),
+        *_entity_columns(),
+        sa.PrimaryKeyConstraint('id', name=op.f('payments_pkey')),
+    )
+    op.create_table(
+        'bank_billet_creation_batches',
+        sa.Column('batch_identifier', sa.String(length=255), nullable=False),
+        sa.Column('status', sa.String(length=255), nullable=False),
+        *_entity_columns(),
+        sa.PrimaryKeyConstraint('id', name=op.f('bank_billet_creation_batches_pkey')),
+    )
+    op.create_table(
+        'bank_billet_creation_batches_items',
+        sa.Column('bank_billet_creation_batch_id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=255), nullable=False),
+        sa.Column('financial_installment_id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.JSON(), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        *_entity_columns(),
+        sa.PrimaryKeyConstraint('id', name=op.f('bank_billet_creation_batches_items_pkey')),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bank_billet_creation_batches_items')
+    op.drop_table('bank_billet_creation_batches')
+    op.drop_table('payments')
+    op.drop_table('financial_installments')
+    op.drop_table('financings')
@@ -0,0 +1,36 @@
+"""create bank_billet_installment_leases
+
+Revision ID: 4c1f2a9d7e31
+Revises: 0b5e8c1d2a47
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f2a9d7e31'
+down_revision = '0b5e8c1d2a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'bank_billet_installment_leases',
+        sa.Column('financial_installment_id', sa.Integer(), nullable=False),
+        sa.Column('owner', sa.String(length=255), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name=op.f('bank_billet_installment_leases_pkey')),
+        sa.UniqueConstraint(
+            'financial_installment_id', name=op.f('bank_billet_installment_leases_financial_installment_id_key')
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bank_billet_installment_leases')
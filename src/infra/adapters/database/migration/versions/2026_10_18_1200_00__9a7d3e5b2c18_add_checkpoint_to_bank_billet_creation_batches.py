@@ -0,0 +1,28 @@
+"""add checkpoint to bank_billet_creation_batches
+
+Revision ID: 9a7d3e5b2c18
+Revises: 4c1f2a9d7e31
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7d3e5b2c18'
+down_revision = '4c1f2a9d7e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('bank_billet_creation_batches', sa.Column('run_key', sa.String(length=255), nullable=True))
+    op.add_column(
+        'bank_billet_creation_batches', sa.Column('checkpoint_installment_id', sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('bank_billet_creation_batches', 'checkpoint_installment_id')
+    op.drop_column('bank_billet_creation_batches', 'run_key')
@@ -0,0 +1,50 @@
+"""add billing eligibility indexes
+
+Revision ID: d3b8f1a6c5e4
+Revises: 9a7d3e5b2c18
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8f1a6c5e4'
+down_revision = '9a7d3e5b2c18'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('financial_installments_status_expire_on_idx', 'financial_installments', ['status', 'expire_on'], None),
+    ('financial_installments_financing_id_idx', 'financial_installments', ['financing_id'], None),
+    (
+        'payments_financial_installment_id_regular_idx',
+        'payments',
+        ['financial_installment_id'],
+        sa.text("type = 'regular'"),
+    ),
+    ('financings_cet_securitization_status_idx', 'financings', ['cet', 'securitization', 'status'], None),
+    (
+        'bank_billet_creation_batches_items_done_installment_idx',
+        'bank_billet_creation_batches_items',
+        ['financial_installment_id'],
+        sa.text("status = 'done'"),
+    ),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock the tables for writes, but can not run inside a transaction.
+    # When it fails it leaves an INVALID index behind, which must be dropped before running the migration again.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, postgresql_where=where, sqlite_where=where
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,26 @@
+"""make external_id of bank_billet_creation_batches_items nullable
+
+Revision ID: 6e2a9c4f1b73
+Revises: d3b8f1a6c5e4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2a9c4f1b73'
+down_revision = 'd3b8f1a6c5e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('bank_billet_creation_batches_items') as batch_op:
+        batch_op.alter_column('external_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('bank_billet_creation_batches_items') as batch_op:
+        batch_op.alter_column('external_id', existing_type=sa.Integer(), nullable=False)
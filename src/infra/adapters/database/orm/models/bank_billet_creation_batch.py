@@ -9,9 +9,12 @@ class BankBilletCreationBatch(EntityModelBase):
 
     batch_identifier: Mapped[str] = mapped_column(String(255))
     status: Mapped[str] = mapped_column(String(255))
+    run_key: Mapped[str] = mapped_column(String(255), nullable=True)
+    checkpoint_installment_id: Mapped[int] = mapped_column(nullable=True)
 
     def __repr__(self):
         return (
             f'<BankBilletCreationBatch(id={self.id}, status="{self.status}", '
-            f'batch_identifier="{self.batch_identifier}">'
+            f'batch_identifier="{self.batch_identifier}", run_key="{self.run_key}", '
+            f'checkpoint_installment_id={self.checkpoint_installment_id}>'
         )
@@ -1,4 +1,6 @@
-from sqlalchemy import JSON, Column, String
+from typing import Optional
+
+from sqlalchemy import JSON, Column, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
@@ -6,9 +8,18 @@ from src.infra.adapters.database.orm.models.entity_model_base import EntityModel
 
 class BankBilletCreationBatchItem(EntityModelBase):
     __tablename__ = 'bank_billet_creation_batches_items'
+    __table_args__ = (
+        # installments already billed, skipped by the claim and the dedupe of the job
+        Index(
+            'bank_billet_creation_batches_items_done_installment_idx',
+            'financial_installment_id',
+            postgresql_where=text("status = 'done'"),
+            sqlite_where=text("status = 'done'"),
+        ),
+    )
 
     bank_billet_creation_batch_id: Mapped[int] = mapped_column()
-    external_id: Mapped[int] = mapped_column()
+    external_id: Mapped[Optional[int]] = mapped_column()
     status: Mapped[str] = mapped_column(String(255))
     financial_installment_id: Mapped[int] = mapped_column()
     content = Column(JSON, nullable=False)
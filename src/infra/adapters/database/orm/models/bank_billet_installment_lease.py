@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
+
+
+class BankBilletInstallmentLease(EntityModelBase):
+    __tablename__ = 'bank_billet_installment_leases'
+
+    financial_installment_id: Mapped[int] = mapped_column(unique=True)
+    owner: Mapped[str] = mapped_column(String(255))
+    expires_at: Mapped[datetime] = mapped_column()
+
+    def __repr__(self):
+        return (
+            f'<BankBilletInstallmentLease(id={self.id}, financial_installment_id={self.financial_installment_id}, '
+            f'owner="{self.owner}", expires_at="{self.expires_at}")>'
+        )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
@@ -8,6 +8,11 @@ from src.infra.adapters.database.orm.models.entity_model_base import EntityModel
 
 class FinancialInstallment(EntityModelBase):
     __tablename__ = 'financial_installments'
+    __table_args__ = (
+        # eligibility of the installments to be billed: status IN (...) AND expire_on <= :future_data
+        Index('financial_installments_status_expire_on_idx', 'status', 'expire_on'),
+        Index('financial_installments_financing_id_idx', 'financing_id'),
+    )
 
     number: Mapped[int] = mapped_column()
     status: Mapped[str] = mapped_column(String(255))
@@ -37,9 +42,9 @@ class FinancialInstallment(EntityModelBase):
             'number': self.number,
             'status': self.status,
             'amount': self.amount,
-            'expire_on': self.expire_on.isoformat(),
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
+            'expire_on': self.expire_on,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'paid_at': self.paid_at,
             'paid_amount': self.paid_amount,
             'provider': self.provider,
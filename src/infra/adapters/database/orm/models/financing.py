@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
@@ -8,6 +8,7 @@ from src.infra.adapters.database.orm.models.entity_model_base import EntityModel
 
 class Financing(EntityModelBase):
     __tablename__ = 'financings'
+    __table_args__ = (Index('financings_cet_securitization_status_idx', 'cet', 'securitization', 'status'),)
 
     project_amount: Mapped[int] = mapped_column()
     identifier: Mapped[str] = mapped_column(String(255))
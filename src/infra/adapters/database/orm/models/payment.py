@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, Index, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
@@ -8,6 +8,15 @@ from src.infra.adapters.database.orm.models.entity_model_base import EntityModel
 
 class Payment(EntityModelBase):
     __tablename__ = 'payments'
+    __table_args__ = (
+        # anti-join of the installments to be billed with their regular payments
+        Index(
+            'payments_financial_installment_id_regular_idx',
+            'financial_installment_id',
+            postgresql_where=text("type = 'regular'"),
+            sqlite_where=text("type = 'regular'"),
+        ),
+    )
 
     financial_installment_id: Mapped[int] = mapped_column()
     external_id: Mapped[str] = mapped_column(String(255))
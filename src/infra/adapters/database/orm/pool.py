@@ -0,0 +1,23 @@
+import time
+from typing import Callable
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# called with the seconds each checkout waited for a connection, e.g. by the Prometheus metrics
+checkout_wait_listeners: list[Callable[[float], None]] = []
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool timing how long each checkout waits for a connection, including the connect of new ones
+    and the wait for a checkin when every connection of the pool and of the overflow is checked out.
+    """
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            for listener in checkout_wait_listeners:
+                listener(waited)
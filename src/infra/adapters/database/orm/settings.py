@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session, create_as
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.scoping import scoped_session
 
+from src.common import json_codec
+from src.infra.adapters.database.orm.pool import TimedAsyncAdaptedQueuePool
 from src.settings import Env, get_settings, is_env
 
 _CONNECT_ARGS_SQLITE = {'check_same_thread': False}
@@ -25,14 +27,26 @@ def _create_async_engine():
         return create_async_engine(
             _get_async_uri(),
             connect_args=_CONNECT_ARGS_SQLITE,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            query_cache_size=get_settings().database_settings.database_query_cache_size,
+            json_serializer=json_codec.dumps_str,
+            json_deserializer=json_codec.loads,
         )
     return create_async_engine(
         _get_async_uri(),
+        poolclass=TimedAsyncAdaptedQueuePool,
         pool_size=get_settings().database_settings.database_pool_size,
         max_overflow=get_settings().database_settings.database_max_overflow,
         pool_pre_ping=True,
         pool_recycle=get_settings().database_settings.database_pool_recicle_seconds,
         echo=get_settings().database_settings.database_echo_sql,
+        query_cache_size=get_settings().database_settings.database_query_cache_size,
+        # asyncpg prepares every statement, keeping the prepared ones by connection up to this size
+        connect_args={
+            'prepared_statement_cache_size': get_settings().database_settings.database_prepared_statement_cache_size
+        },
+        json_serializer=json_codec.dumps_str,
+        json_deserializer=json_codec.loads,
     )
 
 
@@ -4,6 +4,7 @@ from typing import Any, Dict
 
 from uvicorn.config import LOGGING_CONFIG as UVICORN_LOGGING_CONFIG
 
+from src.infra.adapters.trace.settings import current_trace_ids
 from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,16 @@ class EndpointFilter(logging.Filter):
         )
 
 
+class TraceContextFilter(logging.Filter):
+    """
+    Fills the otelTraceID and otelSpanID of the log format with the current span, or with 0 when there is none
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.otelTraceID, record.otelSpanID = current_trace_ids()
+        return True
+
+
 # https://docs.python.org/3/library/logging.config.html#dictionary-schema-details
 LOGGING_CONFIG = {
     'version': 1,
@@ -30,11 +41,17 @@ LOGGING_CONFIG = {
             'datefmt': get_settings().log_settings.date_format,
         },
     },
+    'filters': {
+        'trace_context': {
+            '()': 'src.infra.adapters.logging.settings.TraceContextFilter',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'level': get_settings().log_settings.log_level,
             'formatter': 'standard',
+            'filters': ['trace_context'],
             'stream': 'ext://sys.stdout',
         },
     },
@@ -97,6 +114,7 @@ def get_logger_uvicorn() -> Dict[str, Any]:
     DATEFMT = 'datefmt'
     FILTERS = 'filters'
     SKIP_ENDPOINT = 'skip_endpoint'
+    TRACE_CONTEXT = 'trace_context'
     HANDLERS = 'handlers'
     # https://github.com/tiangolo/fastapi/discussions/7457#discussioncomment-5565969
     uvicorn_log_config = deepcopy(UVICORN_LOGGING_CONFIG)
@@ -107,9 +125,13 @@ def get_logger_uvicorn() -> Dict[str, Any]:
     uvicorn_log_config[FILTERS] = {
         SKIP_ENDPOINT: {
             '()': 'src.infra.adapters.logging.settings.EndpointFilter',
-        }
+        },
+        TRACE_CONTEXT: {
+            '()': 'src.infra.adapters.logging.settings.TraceContextFilter',
+        },
     }
-    uvicorn_log_config[HANDLERS][ACCESS][FILTERS] = [SKIP_ENDPOINT]
+    uvicorn_log_config[HANDLERS][DEFAULT][FILTERS] = [TRACE_CONTEXT]
+    uvicorn_log_config[HANDLERS][ACCESS][FILTERS] = [SKIP_ENDPOINT, TRACE_CONTEXT]
     return uvicorn_log_config
 
 
@@ -0,0 +1,157 @@
+"""Prometheus metrics of the service, exposed in GET /metrics.
+
+With more than one uvicorn worker each one keeps its metrics in files of PROMETHEUS_MULTIPROC_DIR, which
+/metrics aggregates, so any worker answering the scrape gives the view of all of them. prometheus_client reads
+PROMETHEUS_MULTIPROC_DIR when it is imported, so ``prepare_multiprocess_dir`` must run before the workers start.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.common.histogram import DEFAULT_LATENCY_BUCKETS
+from src.infra.adapters.database.orm.pool import checkout_wait_listeners
+from src.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+UNMATCHED_ROUTE = 'unmatched'
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'Requests answered, by route template and status code',
+    ['method', 'route', 'status_code'],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time to answer the requests, by route template',
+    ['method', 'route'],
+    buckets=DEFAULT_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests being answered', multiprocess_mode='livesum')
+
+DB_POOL_SIZE = Gauge('db_pool_size', 'Connections kept by the database pools', multiprocess_mode='livesum')
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections of the database pools in use', multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Connections opened beyond the size of the database pools', multiprocess_mode='livesum'
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time waiting for a connection of the database pool, high when the pool is too small',
+    buckets=DEFAULT_LATENCY_BUCKETS,
+)
+
+
+def prepare_multiprocess_dir(workers: int) -> Optional[str]:
+    """Directory of the metrics files of the workers, created when needed and cleaned of a previous run"""
+    directory = get_settings().metrics_settings.prometheus_multiproc_dir
+    if directory is None:
+        if workers <= 1:
+            return None
+        directory = tempfile.mkdtemp(prefix='prometheus_')
+
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    for path in Path(directory).glob('*.db'):
+        path.unlink()
+    os.environ[MULTIPROC_DIR_ENV] = directory
+    logger.info(f'Metrics of the workers shared in {directory}')  # noqa G004
+    return directory
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def render_metrics() -> bytes:
+    """Metrics in the Prometheus text format, aggregating every worker in multiprocess mode"""
+    if not is_multiprocess():
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def _observe_pool(engine: AsyncEngine) -> None:
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, 'checkedout'):
+        return
+    DB_POOL_SIZE.set(pool.size())
+    DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Keep the pool gauges up to date on each checkout and checkin, and time the checkouts"""
+
+    def on_pool_event(*args) -> None:
+        _observe_pool(engine)
+
+    if getattr(engine.sync_engine, '_prometheus_instrumented', False):
+        return
+    engine.sync_engine._prometheus_instrumented = True
+    event.listen(engine.sync_engine, 'checkout', on_pool_event)
+    event.listen(engine.sync_engine, 'checkin', on_pool_event)
+    checkout_wait_listeners.append(DB_POOL_CHECKOUT_WAIT.observe)
+    _observe_pool(engine)
+
+
+def mark_worker_dead() -> None:
+    """Drop the gauges of this worker from the aggregation, on its shutdown"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware counting and timing the requests by route template, e.g. /v1/installments/{id}, so the path
+    parameters do not create new series. Requests matching no route are labeled as unmatched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes: dict[Any, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = self._route(scope)
+            HTTP_REQUEST_DURATION.labels(scope['method'], route).observe(elapsed)
+            HTTP_REQUESTS.labels(scope['method'], route, str(status_code)).inc()
+
+    def _route(self, scope: Scope) -> str:
+        """Template of the route matched by the router, which leaves its endpoint in the scope"""
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if endpoint not in self._routes:
+            routes = {getattr(route, 'endpoint', None): route.path for route in scope['app'].routes}
+            self._routes[endpoint] = routes.get(endpoint, UNMATCHED_ROUTE)
+        return self._routes[endpoint]
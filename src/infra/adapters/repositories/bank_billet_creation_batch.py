@@ -1,37 +1,29 @@
-from typing import Any, Dict, List, Optional, Type
+from typing import Optional, Sequence
 
-from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
-from src.infra.adapters.repositories import AbstractRepository
-from src.schemas.schema_base import PaginateQuery
+from sqlalchemy.future import select
 
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch import BankBilletCreationBatch
+from src.infra.adapters.repositories.sqlalchemy_repository import SqlAlchemyRepository
 
-class RepositoryBankBilletCreationBatch(AbstractRepository):
-    def __init__(self, session):
-        self.session_db = session
-
-    async def get_all(self, query: PaginateQuery = None) -> List[tuple[Any]]:
-        raise NotImplementedError
 
-    async def get_by_id(self, model_id: int) -> Type[EntityModelBase] | None:
-        raise NotImplementedError
-
-    async def find_by_id(self, model_id: int) -> tuple[Any] | None:
-        raise NotImplementedError
+class RepositoryBankBilletCreationBatch(SqlAlchemyRepository):
+    def __init__(self, session):
+        super().__init__(session)
+        self.entity_model = BankBilletCreationBatch
 
-    async def save(self, model) -> EntityModelBase:
-        """Save BaseModel into database
-        :param: model: Model to save
+    async def find_last_by_run_key(self, run_key: str, status: Sequence[str]) -> Optional[BankBilletCreationBatch]:
+        """Find the last batch of the run with one of the status
+        :param run_key: key of the job run, the same for every run of a job and shard
+        :param status: accepted status
 
-        :return: Refresh model object
+        :return: BankBilletCreationBatch or None
         """
-        self.session_db.add(model)
-
-        await self.session_db.flush()
-
-        return model
-
-    async def update(self, model_id: int, values: Dict[str, Any]) -> tuple[Any] | None:
-        raise NotImplementedError
-
-    async def delete(self, model: Optional[Type[EntityModelBase]]) -> None:
-        raise NotImplementedError
+        statement = (
+            select(self.entity_model)
+            .where(self.entity_model.run_key == run_key)
+            .where(self.entity_model.status.in_(status))
+            .order_by(self.entity_model.id.desc())
+            .limit(1)
+        )
+        results = await self.session_db.execute(statement=statement)
+        return results.scalars().one_or_none()
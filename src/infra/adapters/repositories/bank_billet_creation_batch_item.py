@@ -1,37 +1,38 @@
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Optional, Sequence
 
-from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
-from src.infra.adapters.repositories import AbstractRepository
-from src.schemas.schema_base import PaginateQuery
+from sqlalchemy import insert, select
 
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch_item import BankBilletCreationBatchItem
+from src.infra.adapters.repositories.sqlalchemy_repository import SqlAlchemyRepository
 
-class RepositoryBankBilletCreationBatchItem(AbstractRepository):
-    def __init__(self, session):
-        self.session_db = session
-
-    async def get_all(self, query: PaginateQuery = None) -> List[tuple[Any]]:
-        raise NotImplementedError
-
-    async def get_by_id(self, model_id: int) -> Type[EntityModelBase] | None:
-        raise NotImplementedError
 
-    async def find_by_id(self, model_id: int) -> tuple[Any] | None:
-        raise NotImplementedError
+class RepositoryBankBilletCreationBatchItem(SqlAlchemyRepository):
+    def __init__(self, session):
+        super().__init__(session)
+        self.entity_model = BankBilletCreationBatchItem
 
-    async def save(self, model) -> EntityModelBase:
-        """Save BaseModel into database
-        :param: model: Model to save
+    async def save_many(self, values: Sequence[dict[str, Any]]) -> None:
+        """Save all items with a single multi-row INSERT
+        :param: values: list of column values by item, every item with the same columns
 
-        :return: Refresh model object
+        :return: None
         """
-        self.session_db.add(model)
+        if not values:
+            return
 
+        await self.session_db.execute(insert(self.entity_model), values)
         await self.session_db.flush()
 
-        return model
+    async def find_done_installment_ids(self, after_id: Optional[int] = None) -> set[int]:
+        """Find the installments that have a billet created
+        :param: after_id: finds only the installments with a greater id
 
-    async def update(self, model_id: int, values: Dict[str, Any]) -> tuple[Any] | None:
-        raise NotImplementedError
+        :return: set of financial installment ids
+        """
+        stmt = (
+            select(self.entity_model.financial_installment_id).distinct().where(self.entity_model.status == 'done')
+        )
+        if after_id is not None:
+            stmt = stmt.where(self.entity_model.financial_installment_id > after_id)
 
-    async def delete(self, model: Optional[Type[EntityModelBase]]) -> None:
-        raise NotImplementedError
+        return set((await self.session_db.execute(stmt)).scalars())
@@ -0,0 +1,48 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from src.settings import get_settings
+
+
+@dataclass
+class CountCache:
+    """Total counts of paginated queries, kept for ``ttl_seconds`` by the statement and its parameters
+
+    The count of a page query is the same for every page, so a client walking the pages pays the count scan once
+    per TTL instead of once per page, at the cost of a count up to ``ttl_seconds`` old.
+    """
+
+    ttl_seconds: float = 60.0
+    max_entries: int = 1024
+    clock: Callable[[], float] = time.monotonic
+    _entries: dict[str, tuple[float, int]] = field(default_factory=dict, repr=False)
+
+    def get(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, count = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        return count
+
+    def set(self, key: str, count: int) -> None:
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # dicts keep the insertion order, the first entry is the oldest
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (self.clock() + self.ttl_seconds, count)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_count_cache: Optional[CountCache] = None
+
+
+def get_count_cache() -> CountCache:
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = CountCache(ttl_seconds=get_settings().database_settings.database_count_cache_ttl_seconds)
+    return _count_cache
@@ -1,15 +1,37 @@
-import json
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
 
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, List, Optional, Type
+from sqlalchemy import Row, Select, bindparam, delete, exists, insert
 from sqlalchemy.future import select
 
+from src.common import json_codec
 from src.infra.adapters.database.orm import Financing
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch_item import BankBilletCreationBatchItem
+from src.infra.adapters.database.orm.models.bank_billet_installment_lease import BankBilletInstallmentLease
+from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
 from src.infra.adapters.database.orm.models.financial_installment import FinancialInstallment
 from src.infra.adapters.database.orm.models.payment import Payment
 from src.infra.adapters.repositories import AbstractRepository
 from src.schemas.schema_base import PaginateQuery
-from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
+
+
+@dataclass(slots=True)
+class FinancialInstallmentProjection:
+    id: int  # noqa VNE003
+    number: int
+    amount: int
+    expire_on: datetime
+    financing_id: int
+
+
+@dataclass(slots=True)
+class FinancingProjection:
+    id: int  # noqa VNE003
+    identifier: str
+    installments_number: int
+    customer_id: int
 
 
 @dataclass
@@ -18,22 +40,62 @@ class FinancialInstallmentPreload:
         'financial_installments',
         'financings',
     ]
-    financial_installments: FinancialInstallment
-    financings: Financing
+    financial_installments: FinancialInstallment | FinancialInstallmentProjection
+    financings: Financing | FinancingProjection
 
     def dict(self):
         return asdict(self)
 
     def json(self):
-        return json.dumps(self.dict())
+        return json_codec.dumps_str(self)
+
+
+_INSTALLMENT_PROJECTION_FIELDS = tuple(field.name for field in fields(FinancialInstallmentProjection))
+_FINANCING_PROJECTION_FIELDS = tuple(field.name for field in fields(FinancingProjection))
+
+
+@lru_cache(maxsize=None)
+def _build_installments_not_billet_stmt(
+    installment_status: tuple[str, ...], financing_status: tuple[str, ...], securitization: tuple[str, ...]
+) -> Select:
+    """Statement of the installments don't have billet, built once and bound to ``future_data`` when executed"""
+    return (
+        select(
+            *(getattr(FinancialInstallment, name) for name in _INSTALLMENT_PROJECTION_FIELDS),
+            *(getattr(Financing, name) for name in _FINANCING_PROJECTION_FIELDS),
+        )
+        .join(Financing, FinancialInstallment.financing_id == Financing.id)
+        .outerjoin(
+            Payment,
+            (Payment.financial_installment_id == FinancialInstallment.id) & (Payment.type == 'regular'),
+        )
+        .where(FinancialInstallment.status.in_(installment_status))
+        .where(FinancialInstallment.expire_on <= bindparam('future_data'))
+        .where(Financing.cet == 'PRE_FIXADO')
+        .where(Financing.securitization.in_(securitization))
+        .where(Financing.status.in_(financing_status))
+        .where(Payment.id.is_(None))
+    )
+
+
+@lru_cache(maxsize=None)
+def _build_financial_installment_by_id_stmt() -> Select:
+    """Statement of the installment and its financing, built once and bound to ``financial_installment_id``"""
+    return (
+        select(FinancialInstallment, Financing)
+        .join(Financing, Financing.id == FinancialInstallment.financing_id)
+        .where(FinancialInstallment.id == bindparam('financial_installment_id'))
+    )
 
 
 class RepositoryFinancialInstallment(AbstractRepository):
     def __init__(self, session):
-        super().__init__(session)
+        self.session_db = session
         self.financial_installment_model = FinancialInstallment
         self.financing_model = Financing
         self.payment = Payment
+        self.lease_model = BankBilletInstallmentLease
+        self.batch_item_model = BankBilletCreationBatchItem
         self.installment_status = ['opened', 'expired']
         self.financing_status = [
             'active',
@@ -63,29 +125,124 @@ class RepositoryFinancialInstallment(AbstractRepository):
     async def delete(self, model: Optional[Type[EntityModelBase]]) -> None:
         raise NotImplementedError
 
-    async def find_installments_not_billet(self, future_data) -> FinancialInstallment:
-        """Find all installments don't have billet
+    async def find_installments_not_billet(self, future_data) -> List[FinancialInstallmentPreload]:
+        """Find all installments don't have billet, with the columns of the installment and the financing
+        needed to create the billet
         :param future_data
 
-        :return: FinancialInstallment
+        :return: List[FinancialInstallmentPreload]
         """
+        result = await self.session_db.execute(self._installments_not_billet_stmt(), {'future_data': future_data})
+        return [self._preload_projection(row) for row in result]
+
+    async def stream_installments_not_billet(
+        self,
+        future_data,
+        chunk_size: int,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        after_id: Optional[int] = None,
+    ) -> AsyncIterator[List[FinancialInstallmentPreload]]:
+        """Stream the installments don't have billet through a server-side cursor, in ascending id order
+        :param future_data
+        :param chunk_size: number of rows fetched from the cursor at a time
+        :param shard_index: with shard_count, streams only the installments of financings where
+            financing_id % shard_count == shard_index
+        :param after_id: streams only the installments with a greater id, to resume from a checkpoint
+
+        :return: chunks of FinancialInstallmentPreload with at most chunk_size rows
+        """
+        stmt = self._shard(self._installments_not_billet_stmt(), shard_index, shard_count)
+        if after_id is not None:
+            stmt = stmt.where(self.financial_installment_model.id > after_id)
+
+        stmt = stmt.order_by(self.financial_installment_model.id).execution_options(yield_per=chunk_size)
+        result = await self.session_db.stream(stmt, {'future_data': future_data})
+
+        async for partition in result.partitions():
+            yield [self._preload_projection(row) for row in partition]
+
+    async def claim_installments_not_billet(
+        self,
+        future_data,
+        owner: str,
+        limit: int,
+        lease_seconds: int,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> List[FinancialInstallmentPreload]:
+        """Claim installments don't have billet, leasing them to the owner, so concurrent workers never bill the
+        same installment. Installments locked by the claim of another worker are skipped (SKIP LOCKED), those
+        with a lease not expired or already billed are not eligible, and expired leases are taken over.
+        The lease is stored when the session is committed.
+        :param future_data
+        :param owner: identifier of the worker claiming the installments
+        :param limit: maximum number of installments claimed
+        :param lease_seconds: time until the lease expires and the installment can be claimed by another worker
+
+        :return: List[FinancialInstallmentPreload]
+        """
+        now = datetime.utcnow()
         stmt = (
-            select(self.financial_installment_model, self.f)
-            .join(self.f, self.financial_installment_model.financing_id == self.f.id)
+            self._shard(self._installments_not_billet_stmt(), shard_index, shard_count)
             .outerjoin(
-                self.payment,
-                (self.payment.financial_installment_id == self.financial_installment_model.id) & (self.payment.type == 'regular'),
+                self.lease_model,
+                (self.lease_model.financial_installment_id == self.financial_installment_model.id)
+                & (self.lease_model.expires_at > now),
             )
-            .where(self.financial_installment_model.status.in_(self.installment_status))
-            .where(self.financial_installment_model.expire_on <= future_data)
-            .where(self.f.cet == 'PRE_FIXADO')
-            .where(self.f.securitization.in_(self.securitization))
-            .where(self.f.status.in_(self.financing_status))
-            .where(self.payment.id.is_(None))
+            .where(self.lease_model.id.is_(None))
+            .where(
+                ~exists().where(
+                    (self.batch_item_model.financial_installment_id == self.financial_installment_model.id)
+                    & (self.batch_item_model.status == 'done')
+                )
+            )
+            .order_by(self.financial_installment_model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=self.financial_installment_model)
+        )
+
+        result = await self.session_db.execute(stmt, {'future_data': future_data})
+        preloads = [self._preload_projection(row) for row in result]
+        if not preloads:
+            return preloads
+
+        installment_ids = [preload.financial_installments.id for preload in preloads]
+        await self.session_db.execute(
+            delete(self.lease_model).where(self.lease_model.financial_installment_id.in_(installment_ids))
         )
+        await self.session_db.execute(
+            insert(self.lease_model),
+            [
+                {
+                    'financial_installment_id': installment_id,
+                    'owner': owner,
+                    'expires_at': now + timedelta(seconds=lease_seconds),
+                }
+                for installment_id in installment_ids
+            ],
+        )
+        await self.session_db.flush()
+
+        return preloads
 
-        result = await self.session_db.execute(stmt)
-        return result.scalars().all()
+    def _shard(self, stmt: Select, shard_index: int, shard_count: int) -> Select:
+        if shard_count > 1:
+            stmt = stmt.where(self.financial_installment_model.financing_id % shard_count == shard_index)
+        return stmt
+
+    @staticmethod
+    def _preload_projection(row: Row) -> FinancialInstallmentPreload:
+        installment_columns = len(_INSTALLMENT_PROJECTION_FIELDS)
+        return FinancialInstallmentPreload(
+            financial_installments=FinancialInstallmentProjection(*row[:installment_columns]),
+            financings=FinancingProjection(*row[installment_columns:]),
+        )
+
+    def _installments_not_billet_stmt(self) -> Select:
+        return _build_installments_not_billet_stmt(
+            tuple(self.installment_status), tuple(self.financing_status), tuple(self.securitization)
+        )
 
     async def get_financial_installment_by_id(self, financial_installment_id) -> dict:
         """Get financial installment by id
@@ -94,20 +251,13 @@ class RepositoryFinancialInstallment(AbstractRepository):
         :return: dict
         """
 
-        stmt = (
-            select(
-                self.financial_installment_model,
-                self.financing_model,
-            )
-            .join(self.financing_model, self.financing_model.id == self.financial_installment_model.financing_id)
-            .where(self.financial_installment_model.id == financial_installment_id)
+        result = await self.session_db.execute(
+            _build_financial_installment_by_id_stmt(), {'financial_installment_id': financial_installment_id}
         )
-
-        result = await self.session_db.execute(stmt)
         row = result.one()
 
         if row:
             return FinancialInstallmentPreload(
                 financial_installments=row[0],
-                kobana_wallets=row[1],
+                financings=row[1],
             ).dict()
@@ -1,15 +1,75 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Type
 
-from sqlalchemy import Select, asc, delete, desc, func, update
+from sqlalchemy import Column, Select, and_, asc, delete, desc, func, literal, or_, text, tuple_, update
 from sqlalchemy.future import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement, UnaryExpression
 
+from src.common import json_codec
 from src.constants import DEFAULT_OFFSET, DEFAULT_SORT_COLUMN, DEFAULT_SORT_TYPE, ORDER_BY_ASC, ORDER_BY_DESC
 from src.infra.adapters.database.orm.models.entity_model_base import EntityModelBase
 from src.infra.adapters.repositories.abstract_repository import AbstractRepository
-from src.schemas.schema_base import PaginateQuery
+from src.infra.adapters.repositories.count_cache import get_count_cache
+from src.schemas.schema_base import CountStrategy, PaginateQuery
 from src.settings import get_settings
 
+# Parse the values of the cursor back into the type of their column, JSON has no dates nor decimals
+_CURSOR_TYPES = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    Decimal: lambda value: Decimal(str(value)),
+}
+
+SortKeys = tuple[tuple[Column, str], ...]
+
+
+@lru_cache(maxsize=256)
+def _sort_keys(model: Type[EntityModelBase], sort: str, tiebreaker: bool = True) -> SortKeys:
+    """Columns and orders of the sort spec, ignoring unknown columns and orders, with the id as the last key
+    when tiebreaker, so the order is total. Cached by model and sort spec, parsed once per spec."""
+    columns_and_orders = {
+        column_orders.split(':')[0]: column_orders.split(':')[1]
+        for column_orders in (sort or '').split(',')
+        if len(column_orders.split(':')) > 1
+    } or {DEFAULT_SORT_COLUMN: DEFAULT_SORT_TYPE}
+
+    columns = model.__table__.columns
+    keys = [
+        (columns[column], order)
+        for column, order in columns_and_orders.items()
+        if column in columns and order in (ORDER_BY_ASC, ORDER_BY_DESC)
+    ]
+    if tiebreaker and DEFAULT_SORT_COLUMN not in (column.name for column, _ in keys):
+        keys.append((columns[DEFAULT_SORT_COLUMN], keys[-1][1] if keys else DEFAULT_SORT_TYPE))
+    return tuple(keys)
+
+
+@lru_cache(maxsize=256)
+def _order_by(model: Type[EntityModelBase], sort: str, tiebreaker: bool = True) -> tuple[UnaryExpression, ...]:
+    return tuple(
+        desc(column) if ORDER_BY_DESC == order else asc(column)
+        for column, order in _sort_keys(model, sort, tiebreaker)
+    )
+
+
+@lru_cache(maxsize=256)
+def _page_stmt(model: Type[EntityModelBase], sort: str) -> Select:
+    """Select of every item of the model in the order of the sort spec, built once per spec"""
+    return select(model).order_by(*_order_by(model, sort))
+
+
+@dataclass
+class Page:
+    items: list[Any]
+    count: Optional[int]
+    count_strategy: CountStrategy = CountStrategy.EXACT
+    next_cursor: Optional[str] = None
+
 
 class SqlAlchemyRepository(AbstractRepository):
     def __init__(self, session: Session):
@@ -24,45 +84,128 @@ class SqlAlchemyRepository(AbstractRepository):
         if not sort:
             return stmt
 
-        columns_and_orders = {
-            column_orders.split(':')[0]: column_orders.split(':')[1]
-            for column_orders in sort.split(',')
-            if len(column_orders.split(':')) > 1
-        } or {DEFAULT_SORT_COLUMN: DEFAULT_SORT_TYPE}
+        return stmt.order_by(*_order_by(self.entity_model, sort, tiebreaker=False))
+
+    def _sort_keys(self, sort: str, tiebreaker: bool = True) -> SortKeys:
+        return _sort_keys(self.entity_model, sort, tiebreaker)
 
-        columns = self.entity_model.__table__.columns
+    @staticmethod
+    def _encode_cursor(keys: SortKeys, item: Any) -> str:
+        return urlsafe_b64encode(json_codec.dumps([getattr(item, column.key) for column, _ in keys])).decode()
 
-        for column, order in columns_and_orders.items():
-            if column in columns:
-                if ORDER_BY_DESC == order:
-                    stmt = stmt.order_by(desc(column))
-                elif ORDER_BY_ASC == order:
-                    stmt = stmt.order_by(asc(column))
+    @staticmethod
+    def _decode_cursor(keys: SortKeys, cursor: str) -> list[Any]:
+        try:
+            values = json_codec.loads(urlsafe_b64decode(cursor.encode()))
+        except ValueError as err:
+            raise ValueError(f'Invalid cursor: {cursor}') from err
 
-        return stmt
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(f'Invalid cursor for the sort: {cursor}')
 
-    async def _get_page(self, stmt: Select, limit: int = None, offset: int = None):
+        try:
+            return [
+                (
+                    _CURSOR_TYPES.get(column.type.python_type, lambda value: value)(value)
+                    if value is not None
+                    else None
+                )
+                for (column, _), value in zip(keys, values)
+            ]
+        except (TypeError, ValueError, ArithmeticError) as err:
+            raise ValueError(f'Invalid cursor: {cursor}') from err
+
+    @staticmethod
+    def _keyset_predicate(keys: SortKeys, values: list[Any]) -> ColumnElement[bool]:
+        """Rows after the values in the order of the keys: ``(a, b) > (:a, :b)`` when every key has the same order,
+        otherwise ``a > :a OR (a = :a AND b < :b)``"""
+        if len({order for _, order in keys}) == 1:
+            row = tuple_(*(column for column, _ in keys))
+            after = tuple_(*(literal(value, column.type) for (column, _), value in zip(keys, values)))
+            return row > after if keys[0][1] == ORDER_BY_ASC else row < after
+
+        clauses = []
+        for index, (column, order) in enumerate(keys):
+            previous = [key == value for (key, _), value in zip(keys[:index], values[:index])]
+            clauses.append(
+                and_(*previous, column > values[index] if order == ORDER_BY_ASC else column < values[index])
+            )
+        return or_(*clauses)
+
+    async def _get_page(
+        self,
+        stmt: Select,
+        limit: int = None,
+        offset: int = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        count_stmt: Optional[Select] = None,
+    ) -> tuple[list[Any], Optional[int], CountStrategy]:
         """
-        O objetivo deste método é executar o select e um count da subquery na base e retornar um tupla com os items e qtd_total_items
+        O objetivo deste método é executar o select e contar os itens da query conforme a estratégia, retornando uma
+        tupla com os items, qtd_total_items e a estratégia usada
         :param stmt: Statement in which the limit and offset will be added.
         :param: offset: Number of pagna to offset.
         :param: limit: Number of items to fetch.
+        :param: count_strategy: How to count the items, see ``_count``
+        :param: count_stmt: Statement whose items are counted, when it is not ``stmt``, e.g. without the cursor filter
         """
-        stmt = stmt.offset(offset or DEFAULT_OFFSET).limit(
-            min(limit, get_settings().database_settings.database_page_size)
-            if limit
-            else get_settings().database_settings.database_page_size
-        )
+        stmt = stmt.offset(offset or DEFAULT_OFFSET).limit(self._page_size(limit))
+        if count_strategy == CountStrategy.EXACT and count_stmt is None:
+            # count(*) OVER () is computed before the limit, so the page and its count come in one round trip
+            result = await self.session_db.execute(statement=stmt.add_columns(func.count().over()))
+            rows = result.all()
+            items = [row[0] for row in rows]
+            if rows or not offset:
+                return items, rows[0][1] if rows else 0, count_strategy
+            # past the last page there is no row to carry the count
+            return items, await self._count(stmt, count_strategy), count_strategy
 
         result = await self.session_db.execute(statement=stmt)
-
         items = result.scalars().all()
+        count_stmt = stmt if count_stmt is None else count_stmt
+        if count_strategy == CountStrategy.ESTIMATED:
+            estimated = await self._estimate_count(count_stmt)
+            if estimated is not None:
+                return items, estimated, count_strategy
+            count_strategy = CountStrategy.EXACT
+
+        return items, await self._count(count_stmt, count_strategy), count_strategy
+
+    async def _count(self, stmt: Select, count_strategy: CountStrategy) -> Optional[int]:
+        """Count the items of the statement, ``exact`` with a count of its subquery, ``cached`` with the same count kept
+        by ``get_count_cache`` and ``none`` not at all"""
+        if count_strategy == CountStrategy.NONE:
+            return None
+
         stmt_count = select(func.count()).select_from(stmt.order_by(None).offset(None).limit(None).subquery())
+        if count_strategy != CountStrategy.CACHED:
+            result = await self.session_db.execute(statement=stmt_count)
+            return result.scalars().one()
 
-        result = await self.session_db.execute(statement=stmt_count)
-        qtd_total_items = result.scalars().one()
+        compiled = stmt_count.compile()
+        key = f'{compiled}|{sorted(compiled.params.items())!r}'
+        count = get_count_cache().get(key)
+        if count is None:
+            result = await self.session_db.execute(statement=stmt_count)
+            count = result.scalars().one()
+            get_count_cache().set(key, count)
+        return count
 
-        return items, qtd_total_items
+    async def _estimate_count(self, stmt: Select) -> Optional[int]:
+        """Rows of the table estimated by the planner statistics of Postgres, updated by ANALYZE and autovacuum.
+
+        Only for statements without filters, None when there are filters, the database is not Postgres or the table
+        was never analyzed.
+        """
+        if stmt.whereclause is not None or self.session_db.get_bind().dialect.name != 'postgresql':
+            return None
+
+        result = await self.session_db.execute(
+            text('SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)'),
+            {'table': self.entity_model.__table__.fullname},
+        )
+        estimated = result.scalar_one_or_none()
+        return estimated if estimated is not None and estimated >= 0 else None
 
     async def get_all(self, query: PaginateQuery = None) -> List[tuple[Any]]:
         """Get all item from database
@@ -70,12 +213,49 @@ class SqlAlchemyRepository(AbstractRepository):
 
         :return: List[tuple[Any]]
         """
+        page = await self.get_page(query)
+        return page.items, page.count
+
+    async def get_page(self, query: PaginateQuery = None) -> Page:
+        """Get a page of items from database, by offset or after the cursor of the previous page.
+
+        Pages by cursor filter on the sort keys, plus the id as tiebreaker, instead of skipping rows, so every page
+        costs the same however deep it is. The sort columns should not be nullable.
+        The count is of every item, not only of the items after the cursor, by ``query.count_strategy`` or by the
+        ``database_count_strategy`` setting. An estimated count falls back to the exact one when there are no
+        statistics.
+        :param: query: paginate query params, the cursor has precedence over the offset
+
+        :return: Page with the items, the total count, the strategy used to count and the cursor of the next page,
+            None on the last page
+        """
         if not query:
             query = PaginateQuery()
-        statement = select(self.entity_model)
-        statement = await self._set_order_by(stmt=statement, sort=query.sort)
-        items, qtd_total_items = await self._get_page(stmt=statement, limit=query.limit, offset=query.offset)
-        return items, qtd_total_items
+        count_strategy = query.count_strategy or get_settings().database_settings.database_count_strategy
+        keys = self._sort_keys(query.sort)
+        statement = _page_stmt(self.entity_model, query.sort)
+        count_statement = None
+        offset = query.offset
+        if query.cursor:
+            count_statement = statement
+            statement = statement.where(self._keyset_predicate(keys, self._decode_cursor(keys, query.cursor)))
+            offset = None
+
+        items, qtd_total_items, count_strategy = await self._get_page(
+            stmt=statement,
+            limit=query.limit,
+            offset=offset,
+            count_strategy=count_strategy,
+            count_stmt=count_statement,
+        )
+        page_size = self._page_size(query.limit)
+        next_cursor = self._encode_cursor(keys, items[-1]) if items and len(items) == page_size else None
+        return Page(items=items, count=qtd_total_items, count_strategy=count_strategy, next_cursor=next_cursor)
+
+    @staticmethod
+    def _page_size(limit: Optional[int]) -> int:
+        page_size = get_settings().database_settings.database_page_size
+        return min(limit, page_size) if limit else page_size
 
     async def get_by_id(self, model_id: int) -> Type[EntityModelBase] | None:
         """Get item by id
@@ -0,0 +1,226 @@
+"""Opt-in OpenTelemetry tracing of the API routes, the SQL statements, the requests to the billet provider and
+the stages of the billing job, enabled by OTLP_TRACING_ENABLED.
+
+Traces are sampled twice: ``otlp_head_sampling_ratio`` of the traces are recorded at all, following the decision
+of the caller when there is one, and ``otlp_tail_sampling_ratio`` of the recorded ones are exported once their
+local root span ends, always keeping the traces with an error or slower than the latency threshold. Exported spans
+go through a BatchSpanProcessor, off the request path.
+
+The opentelemetry packages are optional: with the tracing disabled or the packages missing nothing is instrumented
+and ``trace_handler`` returns the handlers untouched.
+"""
+
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+from src.settings import OtlpExporterProtocol, get_settings, is_otlp_exporter_protocol
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import StatusCode
+except ImportError:  # pragma: no cover
+    trace = None
+    SpanProcessor = object
+
+logger = logging.getLogger(__name__)
+
+NO_TRACE_ID = '0'
+NO_SPAN_ID = '0'
+
+_TRACE_ID_LIMIT = (1 << 64) - 1
+
+_tracer_provider: Optional['TracerProvider'] = None
+_tracer: Optional['trace.Tracer'] = None
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Buffers the spans of each trace until its local root span ends and forwards the whole trace to ``processor``
+    when it has an error, when the root took at least ``latency_threshold_seconds`` or, for the others, for
+    ``ratio`` of the trace ids. Up to ``max_traces`` traces are buffered, dropping the oldest one past it.
+    """
+
+    def __init__(
+        self, processor: 'SpanProcessor', ratio: float, latency_threshold_seconds: float, max_traces: int = 10000
+    ):
+        self.processor = processor
+        self.latency_threshold_nanos = latency_threshold_seconds * 1e9
+        self.max_traces = max_traces
+        self._bound = round(ratio * (_TRACE_ID_LIMIT + 1))
+        self._traces: dict[int, list['ReadableSpan']] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None) -> None:
+        self.processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: 'ReadableSpan') -> None:
+        trace_id = span.context.trace_id
+        with self._lock:
+            self._traces.setdefault(trace_id, []).append(span)
+            if span.parent is not None and not span.parent.is_remote:
+                if len(self._traces) > self.max_traces:
+                    self._traces.pop(next(iter(self._traces)))
+                return
+            spans = self._traces.pop(trace_id)
+
+        if self._keep(span, spans):
+            for kept in spans:
+                self.processor.on_end(kept)
+
+    def _keep(self, root: 'ReadableSpan', spans: list['ReadableSpan']) -> bool:
+        if any(span.status.status_code is StatusCode.ERROR for span in spans):
+            return True
+        if root.end_time - root.start_time >= self.latency_threshold_nanos:
+            return True
+        return root.context.trace_id & _TRACE_ID_LIMIT < self._bound
+
+    def shutdown(self) -> None:
+        self.processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.processor.force_flush(timeout_millis)
+
+
+def _otlp_exporter() -> 'SpanExporter':
+    settings = get_settings().otlp_settings
+    host = settings.otlp_agent_host or 'localhost'
+    headers = (
+        {'Authorization': f'Bearer {settings.otlp_agent_auth_token}'} if settings.otlp_agent_auth_token else None
+    )
+    if is_otlp_exporter_protocol(OtlpExporterProtocol.GRPC):
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=f'{host}:{settings.otlp_agent_grpc_port}', insecure=True, headers=headers)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(endpoint=f'http://{host}:{settings.otlp_agent_http_port}/v1/traces', headers=headers)
+
+
+def create_tracer_provider(exporter: 'SpanExporter') -> 'TracerProvider':
+    settings = get_settings().otlp_settings
+    server_settings = get_settings().server_settings
+    provider = TracerProvider(
+        resource=Resource.create(
+            {
+                SERVICE_NAME: server_settings.deployment_name or server_settings.project_name_api,
+                'deployment.environment': server_settings.environment,
+            }
+        ),
+        sampler=ParentBased(TraceIdRatioBased(settings.otlp_head_sampling_ratio)),
+    )
+    processor = BatchSpanProcessor(
+        exporter,
+        max_queue_size=settings.otlp_batch_max_queue_size,
+        max_export_batch_size=settings.otlp_batch_max_export_batch_size,
+        schedule_delay_millis=settings.otlp_batch_schedule_delay_millis,
+    )
+    if settings.otlp_tail_sampling_ratio < 1:
+        processor = TailSamplingSpanProcessor(
+            processor,
+            ratio=settings.otlp_tail_sampling_ratio,
+            latency_threshold_seconds=settings.otlp_tail_sampling_latency_threshold_seconds,
+        )
+    provider.add_span_processor(processor)
+    return provider
+
+
+def set_up_tracing(exporter: Optional['SpanExporter'] = None) -> bool:
+    """
+    Start the tracing of the process when OTLP_TRACING_ENABLED, instrumenting the SQL statements of the engine,
+    telling if it is on. The exporter defaults to the OTLP one of ``otlp_exporter_protocol``.
+    """
+    global _tracer_provider, _tracer
+
+    if _tracer is not None:
+        return True
+    if not get_settings().otlp_settings.otlp_tracing_enabled:
+        return False
+    if trace is None:
+        logger.warning('OTLP_TRACING_ENABLED is enabled but the opentelemetry packages are not installed')
+        return False
+
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    from src.infra.adapters.database.orm.settings import async_engine
+
+    _tracer_provider = create_tracer_provider(exporter or _otlp_exporter())
+    _tracer = _tracer_provider.get_tracer('src')
+    SQLAlchemyInstrumentor().instrument(
+        engine=async_engine.sync_engine,
+        tracer_provider=_tracer_provider,
+        enable_commenter=get_settings().otlp_settings.otlp_sqlalchemy_enable_commenter,
+    )
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Export the spans still buffered and stop the tracing"""
+    global _tracer_provider, _tracer
+
+    if _tracer_provider is None:
+        return
+
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    SQLAlchemyInstrumentor().uninstrument()
+    _tracer_provider.shutdown()
+    _tracer_provider, _tracer = None, None
+
+
+def is_tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def instrument_app(app: Any) -> None:
+    """Trace the requests of the FastAPI app, but the ones of OTEL_PYTHON_FASTAPI_EXCLUDED_URLS"""
+    if _tracer is None:
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_tracer_provider)
+
+
+def instrument_http_client(client: Any) -> None:
+    """Trace the requests of the httpx client"""
+    if _tracer is None:
+        return
+
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+    HTTPXClientInstrumentor.instrument_client(client, tracer_provider=_tracer_provider)
+
+
+def trace_handler(name: str, handler: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Handler running each call in a span named ``name``, or the same handler when the tracing is off"""
+    if _tracer is None:
+        return handler
+
+    tracer = _tracer
+
+    async def traced(item, *args, **kwargs):
+        with tracer.start_as_current_span(name) as span:
+            if isinstance(item, list):
+                span.set_attribute('billing.batch_size', len(item))
+            elif getattr(item, 'installment_id', None) is not None:
+                span.set_attribute('billing.installment_id', item.installment_id)
+            return await handler(item, *args, **kwargs)
+
+    return traced
+
+
+def current_trace_ids() -> tuple[str, str]:
+    """Ids of the trace and span of the current context, as in the exported spans, or 0 out of a recorded span"""
+    if _tracer is None:
+        return NO_TRACE_ID, NO_SPAN_ID
+
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid:
+        return NO_TRACE_ID, NO_SPAN_ID
+    return format(context.trace_id, '032x'), format(context.span_id, '016x')
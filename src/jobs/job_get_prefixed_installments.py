@@ -1,16 +1,111 @@
+import argparse
 import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
 
+from src.common.histogram import LatencyHistogram
+from src.common.pipeline import StageStats
+from src.infra.adapters.acl.http_client import close_http_client, start_http_client
 from src.infra.adapters.database.orm.settings import get_session
 from src.infra.adapters.repositories.financial_installment import RepositoryFinancialInstallment
+from src.infra.adapters.trace.settings import set_up_tracing, shutdown_tracing
+from src.jobs.job_metrics import summary_table, write_prometheus_textfile
 from src.services.financial_installment import ServiceFinancialInstallment
+from src.settings import get_settings
 
+logger = logging.getLogger(__name__)
 
-async def job_get_prefixed_installments():
-    async with get_session() as session:
-        repository = RepositoryFinancialInstallment(session=session)
 
-        return await ServiceFinancialInstallment(repository=repository).send_installment_to_()
+async def job_get_prefixed_installments(shard_index: int = 0, shard_count: int = 1):
+    set_up_tracing()
+    await start_http_client()
+    try:
+        async with get_session() as session:
+            repository = RepositoryFinancialInstallment(session=session)
+
+            return await ServiceFinancialInstallment(
+                repository=repository, shard_index=shard_index, shard_count=shard_count
+            ).send_installment_to_()
+    finally:
+        await close_http_client()
+        shutdown_tracing()
+
+
+def run_shard(shard_index: int, shard_count: int) -> dict:
+    """Entrypoint of each worker process, with its own event loop, database engine and http client"""
+    return asyncio.run(job_get_prefixed_installments(shard_index=shard_index, shard_count=shard_count))
+
+
+def run_sharded(workers: int) -> dict:
+    """Split the installments in one shard by worker process and aggregate the results of the shards"""
+    # spawn, so no process inherits the connections of the engine created on import
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+        results = list(executor.map(run_shard, range(workers), repeat(workers)))
+
+    return aggregate_shard_results(results)
+
+
+def aggregate_shard_results(results: list[dict]) -> dict:
+    latency = LatencyHistogram()
+    stages: dict[str, StageStats] = {}
+    circuit_breakers = [result['circuit_breaker'] for result in results if result.get('circuit_breaker')]
+    transitions, states = Counter(), Counter()
+    for result in results:
+        latency.merge(result['latency'])
+        for name, stats in result['stages'].items():
+            stages.setdefault(name, StageStats()).merge(stats)
+    for circuit_breaker in circuit_breakers:
+        transitions.update(circuit_breaker['transitions'])
+        states[circuit_breaker['state']] += 1
+
+    return {
+        'Success': all(result['Success'] for result in results),
+        'shards': len(results),
+        'processed': sum(result['processed'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'failed': sum(result['failed'] for result in results),
+        'created': sum(result['created'] for result in results),
+        'rejected': sum(result['rejected'] for result in results),
+        'interrupted': any(result['interrupted'] for result in results),
+        'elapsed_seconds': max((result['elapsed_seconds'] for result in results), default=0.0),
+        'latency': latency,
+        'stages': stages,
+        'circuit_breaker': (
+            {
+                'states': dict(states),
+                'transitions': dict(transitions),
+                'rejected': sum(circuit_breaker['rejected'] for circuit_breaker in circuit_breakers),
+            }
+            if circuit_breakers
+            else None
+        ),
+    }
+
+
+def main(workers: int) -> dict:
+    if workers > 1:
+        result = run_sharded(workers)
+    else:
+        result = asyncio.run(job_get_prefixed_installments())
+
+    table = summary_table(result)
+    logger.info(f'Job finished: {table}')  # noqa G004
+    print(table)
+    metrics_textfile = get_settings().job_settings.job_metrics_textfile
+    if metrics_textfile:
+        write_prometheus_textfile(metrics_textfile, result)
+    return result
 
 
 if __name__ == '__main__':
-    asyncio.run(job_get_prefixed_installments())
+    parser = argparse.ArgumentParser(description='Send the prefixed installments without billet to the provider')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=get_settings().job_settings.job_workers,
+        help='number of processes, each one billing the installments of financing_id %% workers',
+    )
+    main(parser.parse_args().workers)
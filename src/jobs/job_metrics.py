@@ -0,0 +1,140 @@
+"""Per-run metrics of the billing job: a summary table for the logs and the Prometheus text format.
+
+The stages are the ones of ``ServiceFinancialInstallment.billet_pipeline`` plus ``fetch``, the time waiting for the
+installments read from the database, and ``flush``, the inserts of the batch items. The counters tell how many
+billets the provider created, how many it rejected and how many were skipped or failed in the job, and, when the
+circuit breaker is enabled, its state changes, the calls it rejected and the state it ended the run in.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from src.common.histogram import LatencyHistogram
+from src.common.pipeline import StageStats
+from src.infra.adapters.acl.circuit_breaker import CircuitState
+
+PROMETHEUS_PREFIX = 'billing_job'
+
+_COUNTERS = ('created', 'rejected', 'skipped', 'failed')
+
+
+def _circuit_states(circuit_breaker: dict) -> dict[str, int]:
+    """Circuits ending the run in each state, one for a single run and one by shard for a sharded run"""
+    states = circuit_breaker.get('states') or {circuit_breaker['state']: 1}
+    return {state.value: states.get(state.value, 0) for state in CircuitState}
+
+
+def summary_table(result: dict) -> str:
+    """Table with the items and the latency percentiles of each stage, followed by the totals of the run"""
+    rows = [('stage', 'processed', 'skipped', 'failed', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms', 'total s')]
+    for name, stats in result['stages'].items():
+        latency = stats.latency
+        rows.append(
+            (
+                name,
+                str(stats.processed),
+                str(stats.skipped),
+                str(stats.failed),
+                *(f'{latency.percentile(quantile) * 1000:.1f}' for quantile in (0.5, 0.95, 0.99)),
+                f'{latency.maximum * 1000:.1f}',
+                f'{latency.total:.2f}',
+            )
+        )
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = [
+        '  '.join(
+            cell.ljust(width) if not column else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in rows
+    ]
+
+    elapsed = result['elapsed_seconds']
+    billets = result['latency']
+    lines.append(
+        f'billets: {", ".join(f"{name} {result.get(name, 0)}" for name in _COUNTERS)}, '
+        f'{result["processed"] / elapsed if elapsed else 0.0:.1f} billets/s in {elapsed:.2f} s, '
+        f'end to end p50 {billets.percentile(0.5) * 1000:.1f} ms, p99 {billets.percentile(0.99) * 1000:.1f} ms'
+    )
+    circuit_breaker = result.get('circuit_breaker')
+    if circuit_breaker:
+        states = ', '.join(
+            f'{state} {count}' for state, count in _circuit_states(circuit_breaker).items() if count
+        )
+        transitions = ', '.join(f'{name} {count}' for name, count in circuit_breaker['transitions'].items())
+        lines.append(
+            f'circuit breaker: ended {states}, transitions {transitions or "none"}, '
+            f'rejected {circuit_breaker["rejected"]}'
+        )
+    return '\n'.join(lines)
+
+
+def prometheus_text(result: dict, prefix: str = PROMETHEUS_PREFIX) -> str:
+    """Metrics of the run in the Prometheus text exposition format, e.g. for the textfile collector"""
+    stages: dict[str, StageStats] = result['stages']
+    latency: LatencyHistogram = result['latency']
+
+    lines = [
+        f'# HELP {prefix}_stage_seconds Time of each call of the stage, a batch counting as one call.',
+        f'# TYPE {prefix}_stage_seconds histogram',
+    ]
+    for name, stats in stages.items():
+        lines.extend(stats.latency.prometheus_samples(f'{prefix}_stage_seconds', f'stage="{name}"'))
+
+    lines.extend(
+        [
+            f'# HELP {prefix}_stage_items_total Items handled by the stage, by result.',
+            f'# TYPE {prefix}_stage_items_total counter',
+        ]
+    )
+    for name, stats in stages.items():
+        for outcome in ('processed', 'skipped', 'failed'):
+            lines.append(
+                f'{prefix}_stage_items_total{{stage="{name}",result="{outcome}"}} {getattr(stats, outcome)}'
+            )
+
+    lines.extend(
+        [
+            f'# HELP {prefix}_billets_total Billets of the run, by result.',
+            f'# TYPE {prefix}_billets_total counter',
+            *(f'{prefix}_billets_total{{result="{name}"}} {result.get(name, 0)}' for name in _COUNTERS),
+            f'# HELP {prefix}_billet_seconds Time of each billet from its fetch to its persistence.',
+            f'# TYPE {prefix}_billet_seconds histogram',
+            *latency.prometheus_samples(f'{prefix}_billet_seconds'),
+            f'# HELP {prefix}_duration_seconds Duration of the run.',
+            f'# TYPE {prefix}_duration_seconds gauge',
+            f'{prefix}_duration_seconds {result["elapsed_seconds"]}',
+        ]
+    )
+
+    circuit_breaker = result.get('circuit_breaker')
+    if circuit_breaker:
+        lines.extend(
+            [
+                f'# HELP {prefix}_circuit_breaker_transitions_total State changes of the circuit breaker.',
+                f'# TYPE {prefix}_circuit_breaker_transitions_total counter',
+                *(
+                    f'{prefix}_circuit_breaker_transitions_total{{transition="{name}"}} {count}'
+                    for name, count in circuit_breaker['transitions'].items()
+                ),
+                f'# HELP {prefix}_circuit_breaker_rejected_calls_total Calls rejected without reaching the provider.',
+                f'# TYPE {prefix}_circuit_breaker_rejected_calls_total counter',
+                f'{prefix}_circuit_breaker_rejected_calls_total {circuit_breaker["rejected"]}',
+                f'# HELP {prefix}_circuit_breaker_state Circuits in each state at the end of the run.',
+                f'# TYPE {prefix}_circuit_breaker_state gauge',
+                *(
+                    f'{prefix}_circuit_breaker_state{{state="{state}"}} {count}'
+                    for state, count in _circuit_states(circuit_breaker).items()
+                ),
+            ]
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(path: str, result: dict) -> None:
+    """Write the metrics replacing the file atomically, so the collector never reads it half written"""
+    directory = Path(path).resolve().parent
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as file:
+        file.write(prometheus_text(result))
+    os.replace(file.name, path)
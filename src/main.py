@@ -1,10 +1,12 @@
 import uvicorn
 
 from src.infra.adapters.logging.settings import get_logger_uvicorn
+from src.infra.adapters.metrics.settings import prepare_multiprocess_dir
 from src.settings import get_settings
 
 
 def run():
+    prepare_multiprocess_dir(get_settings().server_settings.workers)
     uvicorn.run(
         'app:app',
         host=get_settings().server_settings.app_default_host,
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Any, Optional
 
 from fastapi import Query
@@ -5,12 +6,21 @@ from fastapi_camelcase import CamelModel
 from pydantic import Field
 
 
+class CountStrategy(str, Enum):
+    EXACT = 'exact'
+    CACHED = 'cached'
+    ESTIMATED = 'estimated'
+    NONE = 'none'
+
+
 class DefaultResponse(CamelModel):
     data: list[Any] = Field(..., description='Objetos retornados')
 
 
 class PaginateResponse(DefaultResponse):
-    count: int = Field(..., description='Quantidade total de objetos')
+    count: Optional[int] = Field(..., description='Quantidade total de objetos, nula quando não foi contada')
+    count_strategy: CountStrategy = Field(CountStrategy.EXACT, description='Como a quantidade total foi obtida')
+    next_cursor: Optional[str] = Field(None, description='Cursor da próxima página, nulo na última página')
 
 
 class PaginateQuery(CamelModel):
@@ -18,6 +28,14 @@ class PaginateQuery(CamelModel):
     offset: Optional[int] = Query(
         None, description='Número que identifica a partir de qual objeto deve comecar a contar'
     )
+    cursor: Optional[str] = Query(
+        None, description='Cursor da página anterior, a página começa após ele e o offset é ignorado'
+    )
+    count_strategy: Optional[CountStrategy] = Query(
+        None,
+        description='Como obter a quantidade total: exact, cached (exata, mantida em cache por alguns segundos), '
+        'estimated (estatísticas do banco) ou none',
+    )
     sort: str = Query(
         default='id:desc',
         examples={'created_at:desc', 'updated_at:desc'},
@@ -1,12 +1,39 @@
 import asyncio
 import logging
+import os
+import socket
 import time
+from collections import Counter
+from contextlib import aclosing, suppress
 from dataclasses import dataclass, field
+from functools import partial
+from typing import AsyncIterator, Optional
+from uuid import uuid4
 
 from src.common.helpers import DateHelper
-from src.domain.installment.uses_cases.installment_creation import send_installment_created_event
-from src.infra.adapters.repositories.financial_installment import RepositoryFinancialInstallment
+from src.common.pipeline import Pipeline, Stage, StageStats
+from src.domain.bank_billet.bank_billet_proccess import CreateBillet
+from src.domain.bank_billet.batch_item_writer import BatchItemWriter
+from src.domain.bank_billet.checkpoint import CheckpointTracker
+from src.domain.bank_billet.dedupe import BilletDedupeIndex
+from src.domain.installment.uses_cases.installment_creation import (
+    BATCH_STATUS_DONE,
+    BATCH_STATUS_FAILED,
+    BATCH_STATUS_INTERRUPTED,
+    close_bank_billet_creation_batch,
+    open_bank_billet_creation_batch,
+    resume_bank_billet_creation_batch,
+    save_bank_billet_creation_batch_checkpoint,
+)
+from src.infra.adapters.acl.circuit_breaker import get_circuit_breaker
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.financial_installment import (
+    FinancialInstallmentPreload,
+    RepositoryFinancialInstallment,
+)
+from src.infra.adapters.trace.settings import trace_handler
 from src.services.service_base import ServiceBase, try_query_except
+from src.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +41,12 @@ logger = logging.getLogger(__name__)
 @dataclass
 class ServiceFinancialInstallment(ServiceBase):
     repository: RepositoryFinancialInstallment
+    batch_id: Optional[int] = None
+    shard_index: int = 0
+    shard_count: int = 1
+    interrupted: bool = False
+    dedupe: BilletDedupeIndex = field(default_factory=BilletDedupeIndex)
+    billets: Counter = field(default_factory=Counter)
 
     date_helper: DateHelper = field(default_factory=DateHelper)
 
@@ -21,26 +54,232 @@ class ServiceFinancialInstallment(ServiceBase):
     async def get_installments_not_billet(self):
         """Find all installments don't have billit
 
-        :return: FinancialInstallment
+        :return: List[FinancialInstallmentPreload]
         :raises NotFoundException or SQLAlchemyException
         """
         return await self.repository.find_installments_not_billet(self.date_helper.future_data())
 
+    async def stream_installments_not_billet(
+        self, after_id: Optional[int] = None
+    ) -> AsyncIterator[FinancialInstallmentPreload]:
+        """Stream the installments don't have billet, reading them from the database in chunks
+        :param after_id: checkpoint of the run, only greater ids are streamed
+
+        :return: FinancialInstallmentPreload
+        """
+        chunks = self.repository.stream_installments_not_billet(
+            self.date_helper.future_data(),
+            chunk_size=get_settings().job_settings.job_fetch_chunk_size,
+            shard_index=self.shard_index,
+            shard_count=self.shard_count,
+            after_id=after_id,
+        )
+        async for chunk in chunks:
+            for installment in chunk:
+                yield installment
+
+    async def claim_installments_not_billet(self) -> AsyncIterator[FinancialInstallmentPreload]:
+        """Claim chunks of installments don't have billet until none is left, so several replicas of the job can
+        share them without billing the same installment twice
+
+        :return: FinancialInstallmentPreload
+        """
+        settings = get_settings().job_settings
+        owner = f'{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}'
+
+        while True:
+            async with get_session() as session:
+                chunk = await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+                    self.date_helper.future_data(),
+                    owner=owner,
+                    limit=settings.job_lease_chunk_size,
+                    lease_seconds=settings.job_lease_seconds,
+                    shard_index=self.shard_index,
+                    shard_count=self.shard_count,
+                )
+
+            if not chunk:
+                return
+
+            logger.info(f'{owner} claimed {len(chunk)} installments')  # noqa G004
+            for installment in chunk:
+                yield installment
+
+    def installments_not_billet(
+        self, after_id: Optional[int] = None
+    ) -> AsyncIterator[FinancialInstallmentPreload]:
+        if get_settings().job_settings.job_lease_enabled:
+            return self.claim_installments_not_billet()
+        return self.stream_installments_not_billet(after_id=after_id)
+
+    @property
+    def run_key(self) -> str:
+        return f'prefixed-installments:{self.shard_index}/{self.shard_count}'
+
     @try_query_except
     async def send_installment_to_(self):
-        """Loop in installments list and send to kafka for each"""
+        """Send every installment without billet through the build, send and persist stages, grouping
+        all of them in one creation batch.
+
+        The run saves its checkpoint periodically and, if it does not finish, the next run of the same shard
+        resumes the batch after the checkpoint. With a time budget, the run stops sending new installments when the
+        budget is over and finishes as interrupted. Installments with a billet already created, found in the dedupe
+        index, are skipped without calling the provider.
+        """
         start_time = time.time()
-        installments = await self.get_installments_not_billet()
+        settings = get_settings().job_settings
 
-        await asyncio.gather(
-            *map(  # noqa C417
-                lambda installment: send_installment_created_event(installment.id),
-                installments,
+        if settings.job_lease_enabled:
+            batch = await open_bank_billet_creation_batch()
+        else:
+            batch = await resume_bank_billet_creation_batch(self.run_key)
+        self.batch_id = batch.id
+
+        tracker = CheckpointTracker(checkpoint=batch.checkpoint_installment_id)
+        if settings.job_dedupe_enabled:
+            self.dedupe = await BilletDedupeIndex.load(after_id=tracker.checkpoint)
+        writer = BatchItemWriter(
+            flush_size=settings.job_persist_buffer_size,
+            flush_interval_seconds=settings.job_persist_flush_interval_seconds,
+            on_failed=lambda row: tracker.fail(row['financial_installment_id']),
+        )
+        pipeline = self.billet_pipeline(writer)
+        pipeline.on_done = partial(self._billet_done, tracker)
+        pipeline.on_failed = lambda billet: tracker.fail(billet.installment_id)
+        deadline = (
+            time.monotonic() + settings.job_time_budget_seconds if settings.job_time_budget_seconds else None
+        )
+
+        checkpoints = asyncio.create_task(self._save_checkpoints(writer, tracker))
+        try:
+            async with writer:
+                stats = await pipeline.run(
+                    self._billets(self.installments_not_billet(after_id=tracker.checkpoint), tracker, deadline)
+                )
+        except Exception:
+            await close_bank_billet_creation_batch(
+                self.batch_id, status=BATCH_STATUS_FAILED, checkpoint=tracker.checkpoint
             )
+            raise
+        finally:
+            checkpoints.cancel()
+            with suppress(asyncio.CancelledError):
+                await checkpoints
+
+        await close_bank_billet_creation_batch(
+            self.batch_id,
+            status=BATCH_STATUS_INTERRUPTED if self.interrupted else BATCH_STATUS_DONE,
+            checkpoint=tracker.checkpoint,
         )
-        
+
         process_time = round(time.time() - start_time, 10)
-        logger.info(f'LATENCY[*] {process_time} s')  # noqa G004
-        print('LATENCY', f'[*] {process_time} s')
+        circuit_breaker = get_circuit_breaker()
+        logger.info(
+            f'Run of {self.run_key} finished in {process_time} s, '  # noqa G004
+            f'batch items saved: {writer.saved}, failed: {len(writer.failed)}, '  # noqa G004
+            f'interrupted: {self.interrupted}, checkpoint: {tracker.checkpoint}'  # noqa G004
+        )
+
+        flush = StageStats(processed=writer.saved, failed=len(writer.failed), latency=writer.flush_latency)
+        return {
+            'Success': True,
+            'processed': stats['persist'].processed - len(writer.failed),
+            'skipped': sum(stage.skipped for stage in stats.values()) + self.dedupe.skipped,
+            'failed': sum(stage.failed for stage in stats.values()) + len(writer.failed),
+            'created': self.billets['created'],
+            'rejected': self.billets['rejected'],
+            'interrupted': self.interrupted,
+            'checkpoint': tracker.checkpoint,
+            'elapsed_seconds': process_time,
+            'latency': pipeline.latency,
+            'stages': {**stats, 'flush': flush},
+            'circuit_breaker': circuit_breaker.stats() if circuit_breaker else None,
+        }
+
+    def _billet_done(self, tracker: CheckpointTracker, billet: CreateBillet) -> None:
+        tracker.finish(billet.installment_id)
+        status_code = billet.response.get('status_code') if billet.response else None
+        if status_code == 201:
+            self.billets['created'] += 1
+            self.dedupe.add(billet.installment_id)
+        elif status_code is not None:
+            self.billets['rejected'] += 1
+
+    async def _save_checkpoints(self, writer: BatchItemWriter, tracker: CheckpointTracker) -> None:
+        """Save the checkpoint periodically, after flushing the items handled up to it"""
+        while True:
+            await asyncio.sleep(get_settings().job_settings.job_checkpoint_interval_seconds)
+            checkpoint = tracker.checkpoint
+            try:
+                await writer.flush()
+                await save_bank_billet_creation_batch_checkpoint(self.batch_id, tracker.held(checkpoint))
+            except Exception as err:
+                logger.error(
+                    f'Error when saving the checkpoint {checkpoint} of batch {self.batch_id}: {err!r}'  # noqa G004
+                )
+
+    @staticmethod
+    def billet_pipeline(writer: BatchItemWriter) -> Pipeline:
+        """Pipeline with one bounded stage by each step of the billet creation
+
+        With the batch mode of the provider the send and persist stages handle ``broker_batch_size`` billets at
+        once.
+        """
+        settings = get_settings().job_settings
+        broker_settings = get_settings().broker_settings
+        if broker_settings.broker_batch_enabled:
+            send, persist = CreateBillet.send_many, CreateBillet.persist_many
+            batch_size = broker_settings.broker_batch_size
+        else:
+            send, persist, batch_size = CreateBillet.send, CreateBillet.persist, 1
+
+        return Pipeline(
+            source_name='fetch',
+            stages=[
+                Stage(
+                    name='build',
+                    handler=trace_handler('billing_job.build', CreateBillet.build),
+                    workers=settings.job_build_workers,
+                ),
+                Stage(
+                    name='send',
+                    handler=trace_handler('billing_job.send', send),
+                    workers=settings.job_send_workers,
+                    batch_size=batch_size,
+                ),
+                Stage(
+                    name='persist',
+                    handler=trace_handler('billing_job.persist', partial(persist, writer=writer)),
+                    workers=settings.job_persist_workers,
+                    batch_size=batch_size,
+                ),
+            ],
+            queue_size=settings.job_queue_size,
+        )
+
+    async def _billets(
+        self,
+        installments: AsyncIterator[FinancialInstallmentPreload],
+        tracker: CheckpointTracker,
+        deadline: Optional[float],
+    ) -> AsyncIterator[CreateBillet]:
+        async with aclosing(installments):
+            async for installment in installments:
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.warning(
+                        f'Time budget is over, stopping after installment {tracker.checkpoint}'  # noqa G004
+                    )
+                    self.interrupted = True
+                    return
+
+                if installment.financial_installments.id in self.dedupe:
+                    self.dedupe.skipped += 1
+                    continue
 
-        return {'Success': True}
+                tracker.start(installment.financial_installments.id)
+                yield CreateBillet(
+                    installment_id=installment.financial_installments.id,
+                    batch_id=self.batch_id,
+                    financial_installment=installment.financial_installments,
+                    financing=installment.financings,
+                )
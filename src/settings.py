@@ -7,6 +7,8 @@ from typing import Optional
 import tomli
 from pydantic import BaseSettings, Field
 
+from src.schemas.schema_base import CountStrategy
+
 
 class Env(str, Enum):
     HML = 'hml'
@@ -77,6 +79,10 @@ class DatabaseSettings(BaseSettings):
     database_user: str = Field(..., env='DATABASE_USER')
     database_password: str = Field(..., env='DATABASE_PASSWORD')
     database_page_size: int = Field(1000, env='PAGE_SIZE')
+    database_count_strategy: CountStrategy = Field(CountStrategy.EXACT, env='DATABASE_COUNT_STRATEGY')
+    database_count_cache_ttl_seconds: float = Field(60.0, env='DATABASE_COUNT_CACHE_TTL_SECONDS')
+    database_query_cache_size: int = Field(1000, env='DATABASE_QUERY_CACHE_SIZE')
+    database_prepared_statement_cache_size: int = Field(500, env='DATABASE_PREPARED_STATEMENT_CACHE_SIZE')
 
     @property
     def database_echo_sql(self):
@@ -113,6 +119,15 @@ class OTLPSettings(BaseSettings):
     otlp_agent_auth_token: Optional[str] = Field(None, env='OTLP_AGENT_AUTH_TOKEN')
     otlp_exporter_protocol: Optional[str] = Field('http', env='OTLP_EXPORTER_PROTOCOL')
     otlp_sqlalchemy_enable_commenter: bool = Field(False, env='OTLP_SQLALCHEMY_ENABLE_COMMENTER')
+    otlp_tracing_enabled: bool = Field(False, env='OTLP_TRACING_ENABLED')
+    otlp_head_sampling_ratio: float = Field(1.0, env='OTLP_HEAD_SAMPLING_RATIO')
+    otlp_tail_sampling_ratio: float = Field(1.0, env='OTLP_TAIL_SAMPLING_RATIO')
+    otlp_tail_sampling_latency_threshold_seconds: float = Field(
+        1.0, env='OTLP_TAIL_SAMPLING_LATENCY_THRESHOLD_SECONDS'
+    )
+    otlp_batch_max_queue_size: int = Field(2048, env='OTLP_BATCH_MAX_QUEUE_SIZE')
+    otlp_batch_max_export_batch_size: int = Field(512, env='OTLP_BATCH_MAX_EXPORT_BATCH_SIZE')
+    otlp_batch_schedule_delay_millis: int = Field(5000, env='OTLP_BATCH_SCHEDULE_DELAY_MILLIS')
 
     @property
     def otlp_agent_host(self):
@@ -139,6 +154,60 @@ class LogSettings(BaseSettings):
 
 class BrokerSettings(BaseSettings):
     any_api_external: str = Field('http://localhost:xpto', env='ANY_API_MAYBE_A_ACL')
+    broker_max_connections: int = Field(100, env='BROKER_MAX_CONNECTIONS')
+    broker_max_keepalive_connections: int = Field(20, env='BROKER_MAX_KEEPALIVE_CONNECTIONS')
+    broker_keepalive_expiry_seconds: float = Field(30.0, env='BROKER_KEEPALIVE_EXPIRY_SECONDS')
+    broker_http2: bool = Field(False, env='BROKER_HTTP2')
+    broker_connect_timeout_seconds: float = Field(5.0, env='BROKER_CONNECT_TIMEOUT_SECONDS')
+    broker_read_timeout_seconds: float = Field(30.0, env='BROKER_READ_TIMEOUT_SECONDS')
+    broker_write_timeout_seconds: float = Field(10.0, env='BROKER_WRITE_TIMEOUT_SECONDS')
+    broker_pool_timeout_seconds: float = Field(10.0, env='BROKER_POOL_TIMEOUT_SECONDS')
+    broker_rate_limit_enabled: bool = Field(False, env='BROKER_RATE_LIMIT_ENABLED')
+    broker_rate_limit_initial_rate: float = Field(50.0, env='BROKER_RATE_LIMIT_INITIAL_RATE')
+    broker_rate_limit_min_rate: float = Field(1.0, env='BROKER_RATE_LIMIT_MIN_RATE')
+    broker_rate_limit_max_rate: float = Field(500.0, env='BROKER_RATE_LIMIT_MAX_RATE')
+    broker_rate_limit_increase: float = Field(5.0, env='BROKER_RATE_LIMIT_INCREASE')
+    broker_rate_limit_decrease_factor: float = Field(0.5, env='BROKER_RATE_LIMIT_DECREASE_FACTOR')
+    broker_rate_limit_latency_target_seconds: Optional[float] = Field(
+        None, env='BROKER_RATE_LIMIT_LATENCY_TARGET_SECONDS'
+    )
+    broker_retry_max_attempts: int = Field(3, env='BROKER_RETRY_MAX_ATTEMPTS')
+    broker_retry_base_delay_seconds: float = Field(0.1, env='BROKER_RETRY_BASE_DELAY_SECONDS')
+    broker_retry_max_delay_seconds: float = Field(2.0, env='BROKER_RETRY_MAX_DELAY_SECONDS')
+    broker_retry_budget_ratio: float = Field(0.1, env='BROKER_RETRY_BUDGET_RATIO')
+    broker_hedging_enabled: bool = Field(True, env='BROKER_HEDGING_ENABLED')
+    broker_hedging_quantile: float = Field(0.95, env='BROKER_HEDGING_QUANTILE')
+    broker_circuit_breaker_enabled: bool = Field(True, env='BROKER_CIRCUIT_BREAKER_ENABLED')
+    broker_circuit_breaker_failure_threshold: int = Field(5, env='BROKER_CIRCUIT_BREAKER_FAILURE_THRESHOLD')
+    broker_circuit_breaker_recovery_seconds: float = Field(30.0, env='BROKER_CIRCUIT_BREAKER_RECOVERY_SECONDS')
+    broker_batch_enabled: bool = Field(False, env='BROKER_BATCH_ENABLED')
+    broker_batch_path: str = Field('/xpto/batch', env='BROKER_BATCH_PATH')
+    broker_batch_size: int = Field(50, env='BROKER_BATCH_SIZE')
+
+
+class JobSettings(BaseSettings):
+    job_workers: int = Field(1, env='JOB_WORKERS')
+    job_queue_size: int = Field(500, env='JOB_QUEUE_SIZE')
+    job_fetch_chunk_size: int = Field(1000, env='JOB_FETCH_CHUNK_SIZE')
+    job_build_workers: int = Field(2, env='JOB_BUILD_WORKERS')
+    job_send_workers: int = Field(20, env='JOB_SEND_WORKERS')
+    job_persist_workers: int = Field(5, env='JOB_PERSIST_WORKERS')
+    job_persist_buffer_size: int = Field(500, env='JOB_PERSIST_BUFFER_SIZE')
+    job_persist_flush_interval_seconds: float = Field(1.0, env='JOB_PERSIST_FLUSH_INTERVAL_SECONDS')
+    job_lease_enabled: bool = Field(False, env='JOB_LEASE_ENABLED')
+    job_lease_chunk_size: int = Field(500, env='JOB_LEASE_CHUNK_SIZE')
+    job_lease_seconds: int = Field(900, env='JOB_LEASE_SECONDS')
+    job_checkpoint_interval_seconds: float = Field(30.0, env='JOB_CHECKPOINT_INTERVAL_SECONDS')
+    job_time_budget_seconds: Optional[float] = Field(None, env='JOB_TIME_BUDGET_SECONDS')
+    job_dedupe_enabled: bool = Field(True, env='JOB_DEDUPE_ENABLED')
+    job_circuit_open_max_wait_seconds: float = Field(900.0, env='JOB_CIRCUIT_OPEN_MAX_WAIT_SECONDS')
+    job_metrics_textfile: Optional[str] = Field(None, env='JOB_METRICS_TEXTFILE')
+
+
+class MetricsSettings(BaseSettings):
+    metrics_enabled: bool = Field(True, env='METRICS_ENABLED')
+    prometheus_multiproc_dir: Optional[str] = Field(None, env='PROMETHEUS_MULTIPROC_DIR')
+
 
 class FutureData(BaseSettings):
     months: int = Field(1, env='INSTALLMENTS_MONTHS')
@@ -152,6 +221,8 @@ class EnvSettings(BaseSettings):
     otlp_settings = OTLPSettings()
     server_settings = ServerSettings()
     future_data = FutureData()
+    job_settings = JobSettings()
+    metrics_settings = MetricsSettings()
 
 
 @lru_cache
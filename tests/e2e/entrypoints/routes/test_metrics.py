@@ -0,0 +1,23 @@
+import pytest
+from httpx import AsyncClient
+
+from src.app import app
+from tests import base_url
+
+
+@pytest.mark.asyncio()
+async def test_metrics_should_count_requests_by_route():
+    # act
+    async with AsyncClient(app=app, base_url=base_url) as client:
+        await client.get('/healthcheck')
+        await client.get('/not-a-route')
+        response = await client.get('/metrics')
+
+    # assert
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'http_requests_total{method="GET",route="/healthcheck",status_code="200"}' in response.text
+    assert 'http_requests_total{method="GET",route="unmatched",status_code="404"}' in response.text
+    assert 'http_request_duration_seconds_bucket{le="0.001",method="GET",route="/healthcheck"}' in response.text
+    assert 'http_requests_in_flight 1.0' in response.text
+    assert 'db_pool_size' in response.text
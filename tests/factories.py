@@ -0,0 +1,158 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infra.adapters.database.orm import FinancialInstallment, Financing
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch_item import BankBilletCreationBatchItem
+from src.infra.adapters.database.orm.models.payment import Payment
+
+DATASET_FIRST_EXPIRE_ON = datetime(2022, 1, 10)
+DATASET_TODAY = datetime(2023, 2, 1)
+
+
+def make_financing(**values) -> Financing:
+    return Financing(
+        **{
+            'project_amount': 1500000,
+            'identifier': 'FIN-0001',
+            'registration_fee': '0',
+            'iof': 0,
+            'interest_fee': 0,
+            'cet': 'PRE_FIXADO',
+            'installments_number': 12,
+            'grace_period': 0,
+            'securitization': 'a1',
+            'installment_amount': 125000,
+            'status': 'active',
+            'renegotiated': 'false',
+            'customer_id': 1,
+            **values,
+        }
+    )
+
+
+def make_financial_installment(**values) -> FinancialInstallment:
+    return FinancialInstallment(
+        **{
+            'number': 1,
+            'status': 'opened',
+            'amount': 125000,
+            'expire_on': datetime(2023, 1, 10),
+            'provider': 'xpto',
+            'securitization': 'a1',
+            **values,
+        }
+    )
+
+
+def make_payment(**values) -> Payment:
+    return Payment(
+        **{
+            'external_id': 'external',
+            'issued_at': datetime(2023, 1, 1),
+            'paid_at': datetime(2023, 1, 2),
+            'paid_amount': 0,
+            'status': 'paid',
+            'type': 'regular',
+            'provider': 'xpto',
+            'amount_installment_payable': 0,
+            'total_amount': 0,
+            'overpaid_amount': 0,
+            'discount_amount': 0,
+            'interest_amount': 0,
+            **values,
+        }
+    )
+
+
+@dataclass
+class BillingDataset:
+    financings: list[dict]
+    installments: list[dict]
+    payments: list[dict]
+    batch_items: list[dict]
+
+
+def _values(model: Any) -> dict:
+    return {key: value for key, value in vars(model).items() if not key.startswith('_')}
+
+
+def make_billing_dataset(
+    financings: int,
+    rng: random.Random,
+    first_expire_on: datetime = DATASET_FIRST_EXPIRE_ON,
+    today: datetime = DATASET_TODAY,
+    billed_rate: float = 0.3,
+) -> BillingDataset:
+    """Financings of 12 monthly installments with the mix of the production data: most of them PRE_FIXADO and
+    active, the first installments paid with a regular payment, the others expired or opened at ``today``, and a
+    billet already created for ``billed_rate`` of the unpaid ones"""
+    dataset = BillingDataset(financings=[], installments=[], payments=[], batch_items=[])
+    installment_id = 0
+    for financing_id in range(1, financings + 1):
+        dataset.financings.append(
+            _values(
+                make_financing(
+                    id=financing_id,
+                    identifier=f'FIN-{financing_id:06}',
+                    cet=rng.choices(['PRE_FIXADO', 'POS_FIXADO'], weights=[8, 2])[0],
+                    securitization=rng.choice(['a1', 'a2', 'a3', 'b1', 'b2']),
+                    status=rng.choices(['active', 'disabled', 'finished'], weights=[7, 1, 2])[0],
+                    customer_id=financing_id,
+                )
+            )
+        )
+        financing_first_expire_on = first_expire_on + timedelta(days=rng.randint(0, 365))
+        paid_until = rng.randint(0, 12)
+        for number in range(1, 13):
+            installment_id += 1
+            expire_on = financing_first_expire_on + timedelta(days=30 * (number - 1))
+            paid = number <= paid_until
+            dataset.installments.append(
+                _values(
+                    make_financial_installment(
+                        id=installment_id,
+                        number=number,
+                        status='paid' if paid else ('expired' if expire_on < today else 'opened'),
+                        expire_on=expire_on,
+                        financing_id=financing_id,
+                    )
+                )
+            )
+            if paid:
+                dataset.payments.append(
+                    _values(
+                        make_payment(
+                            financial_installment_id=installment_id,
+                            financing_id=financing_id,
+                            type=rng.choices(['regular', 'renegotiation'], weights=[19, 1])[0],
+                        )
+                    )
+                )
+            elif rng.random() < billed_rate:
+                dataset.batch_items.append(
+                    {
+                        'bank_billet_creation_batch_id': 1,
+                        'external_id': installment_id,
+                        'status': rng.choices(['done', 'failed'], weights=[9, 1])[0],
+                        'description': 'description',
+                        'financial_installment_id': installment_id,
+                        'content': {'id': installment_id},
+                    }
+                )
+    return dataset
+
+
+async def insert_billing_dataset(session: AsyncSession, dataset: BillingDataset) -> None:
+    for model, rows in (
+        (Financing, dataset.financings),
+        (FinancialInstallment, dataset.installments),
+        (Payment, dataset.payments),
+        (BankBilletCreationBatchItem, dataset.batch_items),
+    ):
+        if rows:
+            await session.execute(insert(model), rows)
@@ -0,0 +1,27 @@
+import pytest
+
+from src.domain.installment.uses_cases.installment_creation import (
+    BATCH_STATUS_DONE,
+    BATCH_STATUS_PROCESSING,
+    close_bank_billet_creation_batch,
+    open_bank_billet_creation_batch,
+)
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.bank_billet_creation_batch import RepositoryBankBilletCreationBatch
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_open_and_close_bank_billet_creation_batch(create_database):
+    batch = await open_bank_billet_creation_batch()
+
+    assert batch.id is not None
+    assert batch.status == BATCH_STATUS_PROCESSING
+
+    await close_bank_billet_creation_batch(batch.id)
+
+    async with get_session() as session:
+        closed = await RepositoryBankBilletCreationBatch(session).get_by_id(batch.id)
+
+    assert closed.status == BATCH_STATUS_DONE
+    assert closed.batch_identifier == batch.batch_identifier
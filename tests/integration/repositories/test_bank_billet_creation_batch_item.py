@@ -0,0 +1,131 @@
+import pytest
+
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.bank_billet_creation_batch_item import RepositoryBankBilletCreationBatchItem
+from src.infra.adapters.repositories.count_cache import get_count_cache
+from src.schemas.schema_base import CountStrategy, PaginateQuery
+
+pytestmark = pytest.mark.asyncio
+
+
+def _item(installment_id: int, status: str = 'done') -> dict:
+    return {
+        'bank_billet_creation_batch_id': 1,
+        'external_id': installment_id,
+        'status': status,
+        'description': 'description',
+        'financial_installment_id': installment_id,
+        'content': {'id': installment_id},
+    }
+
+
+async def test_save_many_should_insert_every_item(create_database):
+    values = [_item(installment_id) for installment_id in range(1, 4)]
+
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many(values)
+
+    async with get_session() as session:
+        items, count = await RepositoryBankBilletCreationBatchItem(session).get_all()
+
+    assert count == 3
+    assert sorted(item.content['id'] for item in items) == [1, 2, 3]
+
+
+async def test_find_done_installment_ids_should_ignore_failed_items(create_database):
+    values = [_item(1), _item(1), _item(2, status='failed'), _item(3), _item(4)]
+
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many(values)
+
+    async with get_session() as session:
+        repository = RepositoryBankBilletCreationBatchItem(session)
+
+        assert await repository.find_done_installment_ids() == {1, 3, 4}
+        assert await repository.find_done_installment_ids(after_id=3) == {4}
+
+
+async def _pages(repository: RepositoryBankBilletCreationBatchItem, sort: str, limit: int) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        page = await repository.get_page(PaginateQuery(sort=sort, limit=limit, cursor=cursor))
+        pages.append([item.financial_installment_id for item in page.items])
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize(
+    ('sort', 'expected'),
+    [
+        ('id:desc', [[7, 6, 5], [4, 3, 2], [1]]),
+        ('status:asc', [[1, 3, 5], [7, 2, 4], [6]]),
+        ('status:asc,id:desc', [[7, 5, 3], [1, 6, 4], [2]]),
+    ],
+)
+async def test_get_page_should_walk_every_item_once_by_cursor(create_database, sort, expected):
+    values = [_item(installment_id, 'done' if installment_id % 2 else 'failed') for installment_id in range(1, 8)]
+
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many(values)
+
+    async with get_session() as session:
+        pages = await _pages(RepositoryBankBilletCreationBatchItem(session), sort=sort, limit=3)
+
+    assert pages == expected
+
+
+async def test_get_page_should_reject_an_invalid_cursor(create_database):
+    async with get_session() as session:
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            await RepositoryBankBilletCreationBatchItem(session).get_page(PaginateQuery(cursor='not-a-cursor'))
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected_count', 'expected_strategy'),
+    [
+        (PaginateQuery(limit=3), 7, CountStrategy.EXACT),
+        (PaginateQuery(limit=3, offset=10), 7, CountStrategy.EXACT),
+        (PaginateQuery(limit=3, count_strategy=CountStrategy.NONE), None, CountStrategy.NONE),
+        # SQLite has no planner statistics to estimate from
+        (PaginateQuery(limit=3, count_strategy=CountStrategy.ESTIMATED), 7, CountStrategy.EXACT),
+    ],
+)
+async def test_get_page_should_count_by_the_strategy(create_database, query, expected_count, expected_strategy):
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many([_item(i) for i in range(1, 8)])
+
+    async with get_session() as session:
+        page = await RepositoryBankBilletCreationBatchItem(session).get_page(query)
+
+    assert (page.count, page.count_strategy) == (expected_count, expected_strategy)
+
+
+async def test_get_page_should_count_every_item_when_paging_by_cursor(create_database):
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many([_item(i) for i in range(1, 8)])
+
+    async with get_session() as session:
+        repository = RepositoryBankBilletCreationBatchItem(session)
+        first = await repository.get_page(PaginateQuery(limit=3))
+        second = await repository.get_page(PaginateQuery(limit=3, cursor=first.next_cursor))
+
+    assert (first.count, second.count) == (7, 7)
+
+
+async def test_get_page_should_reuse_the_cached_count(create_database):
+    get_count_cache().clear()
+    query = PaginateQuery(limit=3, count_strategy=CountStrategy.CACHED)
+
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many([_item(i) for i in range(1, 8)])
+    async with get_session() as session:
+        first = await RepositoryBankBilletCreationBatchItem(session).get_page(query)
+
+    async with get_session() as session:
+        await RepositoryBankBilletCreationBatchItem(session).save_many([_item(8)])
+    async with get_session() as session:
+        second = await RepositoryBankBilletCreationBatchItem(session).get_page(query)
+
+    get_count_cache().clear()
+    assert (first.count, second.count, second.count_strategy) == (7, 7, CountStrategy.CACHED)
@@ -0,0 +1,165 @@
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.financial_installment import RepositoryFinancialInstallment
+from tests.factories import make_financial_installment, make_financing, make_payment
+
+pytestmark = pytest.mark.asyncio
+
+FUTURE_DATA = datetime(2023, 2, 1)
+
+
+@pytest_asyncio.fixture()
+async def installments(create_database):
+    async with get_session() as session:
+        financing = make_financing()
+        session.add(financing)
+        await session.flush()
+
+        eligible = [make_financial_installment(number=number, financing_id=financing.id) for number in range(1, 6)]
+        paid = make_financial_installment(number=6, financing_id=financing.id)
+        expire_later = make_financial_installment(
+            number=7, financing_id=financing.id, expire_on=datetime(2023, 3, 1)
+        )
+        session.add_all([*eligible, paid, expire_later])
+        await session.flush()
+
+        session.add(make_payment(financial_installment_id=paid.id, financing_id=financing.id))
+
+    return eligible
+
+
+@pytest_asyncio.fixture()
+async def installments_of_financings(create_database):
+    async with get_session() as session:
+        financings = [make_financing(identifier=f'FIN-{number:04}') for number in range(1, 8)]
+        session.add_all(financings)
+        await session.flush()
+
+        eligible = [
+            make_financial_installment(number=number, financing_id=financing.id)
+            for financing in financings
+            for number in (1, 2)
+        ]
+        session.add_all(eligible)
+
+    return eligible
+
+
+async def test_find_installments_not_billet_should_return_only_eligible_installments(installments):
+    async with get_session() as session:
+        result = await RepositoryFinancialInstallment(session).find_installments_not_billet(FUTURE_DATA)
+
+    assert sorted(preload.financial_installments.id for preload in result) == [
+        installment.id for installment in installments
+    ]
+    assert {preload.financings.identifier for preload in result} == {'FIN-0001'}
+
+
+async def test_stream_installments_not_billet_should_yield_chunks(installments):
+    async with get_session() as session:
+        chunks = [
+            chunk
+            async for chunk in RepositoryFinancialInstallment(session).stream_installments_not_billet(
+                FUTURE_DATA, chunk_size=2
+            )
+        ]
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert sorted(preload.financial_installments.id for chunk in chunks for preload in chunk) == [
+        installment.id for installment in installments
+    ]
+
+
+async def test_get_financial_installment_by_id_should_return_installment_and_financing(installments):
+    async with get_session() as session:
+        result = await RepositoryFinancialInstallment(session).get_financial_installment_by_id(installments[0].id)
+
+    assert result['financial_installments'].id == installments[0].id
+    assert result['financings'].id == installments[0].financing_id
+
+
+async def test_claim_installments_not_billet_should_not_claim_leased_installments(installments):
+    async with get_session() as session:
+        first = await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+            FUTURE_DATA, owner='first', limit=3, lease_seconds=60
+        )
+    async with get_session() as session:
+        second = await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+            FUTURE_DATA, owner='second', limit=3, lease_seconds=60
+        )
+    async with get_session() as session:
+        third = await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+            FUTURE_DATA, owner='third', limit=3, lease_seconds=60
+        )
+
+    assert [preload.financial_installments.id for preload in first + second] == [
+        installment.id for installment in installments
+    ]
+    assert third == []
+
+
+async def test_claim_installments_not_billet_should_take_over_expired_leases(installments):
+    async with get_session() as session:
+        crashed = await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+            FUTURE_DATA, owner='crashed', limit=10, lease_seconds=-1
+        )
+    async with get_session() as session:
+        claimed = await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+            FUTURE_DATA, owner='alive', limit=10, lease_seconds=60
+        )
+
+    assert len(crashed) == len(installments)
+    assert [preload.financial_installments.id for preload in claimed] == [
+        preload.financial_installments.id for preload in crashed
+    ]
+
+
+@pytest.mark.parametrize('shard_count', [2, 3])
+async def test_stream_installments_not_billet_should_split_the_installments_in_disjoint_shards(
+    installments_of_financings, shard_count
+):
+    shards = []
+    for shard_index in range(shard_count):
+        async with get_session() as session:
+            shards.append(
+                [
+                    preload.financial_installments
+                    async for chunk in RepositoryFinancialInstallment(session).stream_installments_not_billet(
+                        FUTURE_DATA, chunk_size=100, shard_index=shard_index, shard_count=shard_count
+                    )
+                    for preload in chunk
+                ]
+            )
+
+    for shard_index, shard in enumerate(shards):
+        assert shard
+        assert {installment.financing_id % shard_count for installment in shard} == {shard_index}
+    ids = [installment.id for shard in shards for installment in shard]
+    assert sorted(ids) == sorted(installment.id for installment in installments_of_financings)
+
+
+async def test_claim_installments_not_billet_should_claim_only_the_installments_of_the_shard(
+    installments_of_financings,
+):
+    claimed = []
+    for shard_index in range(3):
+        async with get_session() as session:
+            claimed.append(
+                await RepositoryFinancialInstallment(session).claim_installments_not_billet(
+                    FUTURE_DATA,
+                    owner=f'shard-{shard_index}',
+                    limit=100,
+                    lease_seconds=60,
+                    shard_index=shard_index,
+                    shard_count=3,
+                )
+            )
+
+    for shard_index, shard in enumerate(claimed):
+        assert {preload.financial_installments.financing_id % 3 for preload in shard} == {shard_index}
+    ids = [preload.financial_installments.id for shard in claimed for preload in shard]
+    assert sorted(ids) == sorted(installment.id for installment in installments_of_financings)
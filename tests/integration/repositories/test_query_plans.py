@@ -0,0 +1,201 @@
+"""Query plans of the repository queries against stored baselines.
+
+Seeds a few thousand financings, runs each repository query capturing the SQL it executes, and explains it on the
+database the tests are configured with: ``EXPLAIN (FORMAT JSON)`` on Postgres (``make test-integrated``), and
+``EXPLAIN QUERY PLAN`` on the SQLite database of the unit tests otherwise. A query fails when its plan stops using
+one of the baseline indexes, or:
+
+- Postgres: when it scans sequentially a table the baseline did not, or its total cost estimated by the planner is
+  more than ``QUERY_PLAN_COST_TOLERANCE`` above the baseline
+- SQLite: when it has more full table scans and temporary b-trees than the baseline, as it has no cost estimate
+
+Each dialect has its own baselines. Record the ones of the configured database, after an intended change of a query
+or of the indexes, with ``ENVIRONMENT=unittest`` for SQLite or the ``DATABASE_*`` settings of a Postgres for it:
+
+    UPDATE_QUERY_PLAN_BASELINES=1 ENVIRONMENT=unittest pytest tests/integration/repositories/test_query_plans.py
+"""
+
+import json
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+
+from src.infra.adapters.database.orm.settings import async_engine, get_session
+from src.infra.adapters.repositories.bank_billet_creation_batch_item import RepositoryBankBilletCreationBatchItem
+from src.infra.adapters.repositories.financial_installment import RepositoryFinancialInstallment
+from src.schemas.schema_base import CountStrategy, PaginateQuery
+from tests import create_test_database
+from tests.factories import insert_billing_dataset, make_billing_dataset
+
+pytestmark = pytest.mark.asyncio
+
+BASELINES_PATH = Path(__file__).with_name('query_plan_baselines.json')
+UPDATE_BASELINES = os.getenv('UPDATE_QUERY_PLAN_BASELINES') == '1'
+COST_TOLERANCE = float(os.getenv('QUERY_PLAN_COST_TOLERANCE', '0.2'))
+
+FINANCINGS = 2000
+FUTURE_DATA = datetime(2023, 2, 1)
+
+
+@dataclass
+class Plan:
+    indexes: set[str]
+    cost: float
+    lines: list[str]
+    seq_scans: set[str] = field(default_factory=set)
+
+
+@pytest_asyncio.fixture(scope='module')
+async def seeded_database():
+    await create_test_database()
+    async with get_session() as session:
+        await insert_billing_dataset(
+            session, make_billing_dataset(FINANCINGS, random.Random(42), today=FUTURE_DATA)
+        )
+        await session.execute(text('ANALYZE'))
+    yield
+    await create_test_database()
+
+
+async def _capture_statements(call: Callable[[], Awaitable[Any]]) -> list[tuple[str, Any]]:
+    """SQL and parameters of the SELECTs executed by the call, as sent to the driver"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        await call()
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+def _sqlite_plan(rows: list) -> Plan:
+    lines = [row[3] for row in rows]
+    indexes = {
+        match.group(1) or 'INTEGER PRIMARY KEY'
+        for line in lines
+        if (match := re.search(r'USING (?:COVERING )?INDEX (\w+)|USING (?:INTEGER )?PRIMARY KEY', line))
+    }
+    full_scans = sum(bool(re.match(r'SCAN \w+$', line)) for line in lines)
+    temp_btrees = sum('USE TEMP B-TREE' in line for line in lines)
+    return Plan(indexes=indexes, cost=full_scans + temp_btrees, lines=lines)
+
+
+def _postgres_plan(rows: list) -> Plan:
+    document = rows[0][0]
+    root = (json.loads(document) if isinstance(document, str) else document)[0]['Plan']
+    indexes, seq_scans, lines, nodes = set(), set(), [], [(root, 0)]
+    while nodes:
+        node, depth = nodes.pop()
+        if 'Index Name' in node:
+            indexes.add(node['Index Name'])
+        if node['Node Type'] == 'Seq Scan':
+            seq_scans.add(node['Relation Name'])
+        lines.append(
+            f'{"  " * depth}{node["Node Type"]} {node.get("Relation Name", "")} {node.get("Index Name", "")}'.rstrip()
+        )
+        nodes.extend((child, depth + 1) for child in reversed(node.get('Plans', [])))
+    return Plan(indexes=indexes, cost=root['Total Cost'], lines=lines, seq_scans=seq_scans)
+
+
+async def _explain(statement: str, parameters: Any) -> Plan:
+    async with async_engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            result = await connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            return _postgres_plan(result.all())
+        result = await connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return _sqlite_plan(result.all())
+
+
+def _get_page_after(sort: str, **values: Any) -> Callable[[Any], Awaitable[Any]]:
+    """Page of batch items after the cursor of ``values``, without counting, so only the page query is explained"""
+
+    async def get_page(session):
+        repository = RepositoryBankBilletCreationBatchItem(session)
+        cursor = repository._encode_cursor(repository._sort_keys(sort), SimpleNamespace(**values))
+        return await repository.get_page(
+            PaginateQuery(limit=50, sort=sort, cursor=cursor, count_strategy=CountStrategy.NONE)
+        )
+
+    return get_page
+
+
+async def _stream(session) -> None:
+    """Installments after a checkpoint, as streamed by a run resumed in the second of three shards"""
+    async for _ in RepositoryFinancialInstallment(session).stream_installments_not_billet(
+        FUTURE_DATA, chunk_size=500, shard_index=1, shard_count=3, after_id=1000
+    ):
+        pass
+
+
+QUERIES = {
+    'find_installments_not_billet': lambda session: RepositoryFinancialInstallment(
+        session
+    ).find_installments_not_billet(FUTURE_DATA),
+    'stream_installments_not_billet': _stream,
+    'claim_installments_not_billet': lambda session: RepositoryFinancialInstallment(
+        session
+    ).claim_installments_not_billet(FUTURE_DATA, owner='query-plans', limit=100, lease_seconds=60),
+    'get_financial_installment_by_id': lambda session: RepositoryFinancialInstallment(
+        session
+    ).get_financial_installment_by_id(1234),
+    'get_page:id:desc': _get_page_after('id:desc', id=1000),
+    'get_page:created_at:desc': _get_page_after('created_at:desc', created_at=FUTURE_DATA, id=1000),
+    'get_page:status:asc,financial_installment_id:desc': _get_page_after(
+        'status:asc,financial_installment_id:desc', status='done', financial_installment_id=12000, id=1000
+    ),
+}
+
+
+def _read_baselines() -> dict:
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def _write_baseline(dialect: str, name: str, plan: Plan) -> None:
+    baselines = _read_baselines()
+    baseline = {'indexes': sorted(plan.indexes), 'cost': plan.cost}
+    if dialect == 'postgresql':
+        baseline['seq_scans'] = sorted(plan.seq_scans)
+    baselines.setdefault(name, {})[dialect] = baseline
+    BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.mark.parametrize('name', QUERIES)
+async def test_query_plan_should_not_regress_from_the_baseline(seeded_database, name):
+    async with get_session() as session:
+        statements = await _capture_statements(lambda: QUERIES[name](session))
+    assert statements, f'{name} executed no SELECT'
+    plan = await _explain(*statements[0])
+    dialect = async_engine.dialect.name
+
+    if UPDATE_BASELINES:
+        _write_baseline(dialect, name, plan)
+        return
+
+    baseline = _read_baselines().get(name, {}).get(dialect)
+    assert baseline is not None, f'no {dialect} baseline for {name}, record it with UPDATE_QUERY_PLAN_BASELINES=1'
+
+    plan_text = '\n'.join(plan.lines)
+    missing = set(baseline['indexes']) - plan.indexes
+    assert not missing, f'{name} stopped using {sorted(missing)}, plan:\n{plan_text}'
+    scanned = plan.seq_scans - set(baseline.get('seq_scans', []))
+    assert not scanned, f'{name} scans {sorted(scanned)} sequentially, plan:\n{plan_text}'
+    max_cost = baseline['cost'] * (1 + COST_TOLERANCE) if dialect == 'postgresql' else baseline['cost']
+    assert (
+        plan.cost <= max_cost
+    ), f'{name} cost {plan.cost} is above the baseline {baseline["cost"]}, plan:\n{plan_text}'
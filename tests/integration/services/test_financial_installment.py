@@ -0,0 +1,182 @@
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+import respx
+from sqlalchemy import select
+
+from src.domain.bank_billet.dedupe import billet_idempotency_key
+from src.domain.installment.uses_cases.installment_creation import (
+    BATCH_STATUS_INTERRUPTED,
+    close_bank_billet_creation_batch,
+    open_bank_billet_creation_batch,
+)
+from src.infra.adapters.acl.http_client import close_http_client
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch import BankBilletCreationBatch
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch_item import BankBilletCreationBatchItem
+from src.infra.adapters.database.orm.settings import get_session
+from src.infra.adapters.repositories.financial_installment import RepositoryFinancialInstallment
+from src.services.financial_installment import ServiceFinancialInstallment
+from src.settings import get_settings
+from tests.factories import make_financial_installment, make_financing
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.usefixtures('_future_data')]
+
+
+@pytest.fixture()
+def provider(mocker):
+    mocker.patch.object(get_settings().broker_settings, 'any_api_external', 'http://provider')
+    with respx.mock(base_url='http://provider') as provider:
+        yield provider
+
+
+@pytest.fixture()
+def _future_data(mocker):
+    mocker.patch('src.common.helpers.DateHelper.future_data', return_value=datetime(2023, 2, 1))
+
+
+async def _create_installments(quantity):
+    async with get_session() as session:
+        financing = make_financing()
+        session.add(financing)
+        await session.flush()
+        installments = [
+            make_financial_installment(number=number, financing_id=financing.id)
+            for number in range(1, quantity + 1)
+        ]
+        session.add_all(installments)
+    return installments
+
+
+async def test_send_installment_to_should_bill_every_installment_in_one_batch(create_database, provider):
+    await _create_installments(3)
+    provider.post('/xpto').respond(201, json={'id': 99, 'description': 'created'})
+
+    async with get_session() as session:
+        result = await ServiceFinancialInstallment(
+            repository=RepositoryFinancialInstallment(session)
+        ).send_installment_to_()
+    await close_http_client()
+
+    async with get_session() as session:
+        batches = (await session.execute(select(BankBilletCreationBatch))).scalars().all()
+        items = (await session.execute(select(BankBilletCreationBatchItem))).scalars().all()
+
+    assert result['Success'] is True
+    assert result['processed'] == 3
+    assert result['created'] == 3
+    assert list(result['stages']) == ['fetch', 'build', 'send', 'persist', 'flush']
+    assert result['stages']['flush'].processed == 3
+    assert provider.calls.call_count == 3
+    assert [batch.status for batch in batches] == ['done']
+    assert {(item.bank_billet_creation_batch_id, item.status) for item in items} == {(batches[0].id, 'done')}
+    assert len(items) == 3
+
+
+async def test_send_installment_to_should_send_billets_in_batches(create_database, provider, mocker):
+    await _create_installments(3)
+    mocker.patch.object(get_settings().broker_settings, 'broker_batch_enabled', True)
+
+    def respond(request):
+        payloads = json.loads(request.content)
+        return httpx.Response(
+            207,
+            json=[
+                {
+                    'controlNumber': payload['controlNumber'],
+                    'statusCode': 201,
+                    'content': {'id': index, 'description': 'created'},
+                }
+                for index, payload in enumerate(payloads[1:])
+            ],
+        )
+
+    provider.post('/xpto/batch').mock(side_effect=respond)
+
+    async with get_session() as session:
+        result = await ServiceFinancialInstallment(
+            repository=RepositoryFinancialInstallment(session)
+        ).send_installment_to_()
+    await close_http_client()
+
+    async with get_session() as session:
+        items = (await session.execute(select(BankBilletCreationBatchItem))).scalars().all()
+
+    assert result['processed'] == 3
+    assert len(items) == 3
+    assert [item.status for item in items].count('failed') == provider.calls.call_count
+
+
+async def test_send_installment_to_should_skip_installments_with_billet_created(create_database, provider):
+    installments = await _create_installments(3)
+    async with get_session() as session:
+        session.add(
+            BankBilletCreationBatchItem(
+                bank_billet_creation_batch_id=1,
+                external_id=1,
+                status='done',
+                description='created',
+                financial_installment_id=installments[0].id,
+                content={},
+            )
+        )
+    route = provider.post('/xpto').respond(201, json={'id': 99, 'description': 'created'})
+
+    async with get_session() as session:
+        result = await ServiceFinancialInstallment(
+            repository=RepositoryFinancialInstallment(session)
+        ).send_installment_to_()
+    await close_http_client()
+
+    assert result['processed'] == 2
+    assert result['skipped'] == 1
+    assert route.call_count == 2
+    assert {call.request.headers['Idempotency-Key'] for call in route.calls} == {
+        billet_idempotency_key(installment.id, installment.number, installment.expire_on)
+        for installment in installments[1:]
+    }
+
+
+async def test_send_installment_to_should_resume_the_interrupted_batch(create_database, provider):
+    installments = await _create_installments(4)
+    interrupted = await open_bank_billet_creation_batch(run_key='prefixed-installments:0/1')
+    await close_bank_billet_creation_batch(
+        interrupted.id, status=BATCH_STATUS_INTERRUPTED, checkpoint=installments[1].id
+    )
+    provider.post('/xpto').respond(201, json={'id': 99, 'description': 'created'})
+
+    async with get_session() as session:
+        result = await ServiceFinancialInstallment(
+            repository=RepositoryFinancialInstallment(session)
+        ).send_installment_to_()
+    await close_http_client()
+
+    async with get_session() as session:
+        batches = (await session.execute(select(BankBilletCreationBatch))).scalars().all()
+        items = (await session.execute(select(BankBilletCreationBatchItem))).scalars().all()
+
+    assert result['processed'] == 2
+    assert result['checkpoint'] == installments[3].id
+    assert [(batch.id, batch.status) for batch in batches] == [(interrupted.id, 'done')]
+    assert sorted(item.financial_installment_id for item in items) == [
+        installment.id for installment in installments[2:]
+    ]
+
+
+async def test_send_installment_to_should_stop_when_the_time_budget_is_over(create_database, provider, mocker):
+    await _create_installments(2)
+    mocker.patch.object(get_settings().job_settings, 'job_time_budget_seconds', 1e-9)
+
+    async with get_session() as session:
+        result = await ServiceFinancialInstallment(
+            repository=RepositoryFinancialInstallment(session)
+        ).send_installment_to_()
+    await close_http_client()
+
+    async with get_session() as session:
+        batches = (await session.execute(select(BankBilletCreationBatch))).scalars().all()
+
+    assert result['interrupted'] is True
+    assert result['processed'] == 0
+    assert [batch.status for batch in batches] == [BATCH_STATUS_INTERRUPTED]
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+import src.constants
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch import BankBilletCreationBatch  # noqa F401
+from src.infra.adapters.database.orm.models.bank_billet_creation_batch_item import (  # noqa F401
+    BankBilletCreationBatchItem,
+)
+from src.infra.adapters.database.orm.models.bank_billet_installment_lease import (  # noqa F401
+    BankBilletInstallmentLease,
+)
+from src.infra.adapters.database.orm.models.base import BaseModel
+from src.infra.adapters.database.orm.models.financial_installment import FinancialInstallment  # noqa F401
+from src.infra.adapters.database.orm.models.financing import Financing  # noqa F401
+from src.infra.adapters.database.orm.models.payment import Payment  # noqa F401
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+@pytest.fixture()
+def database(tmp_path):
+    path = tmp_path / 'migrations.db'
+    cfg = Config(str(ROOT / src.constants.ALEMBIC_INI_FILE))
+    cfg.set_main_option('script_location', str(ROOT / src.constants.ALEMBIC_INI_SCRIPT_LOCATION))
+    cfg.set_main_option('version_locations', str(ROOT / src.constants.ALEMBIC_INI_VERSION_LOCATIONS))
+    cfg.set_main_option('sqlalchemy.url', f'sqlite+aiosqlite:///{path}')
+    engine = create_engine(f'sqlite:///{path}')
+    yield cfg, engine
+    engine.dispose()
+
+
+def test_migrations_should_upgrade_an_empty_database_to_the_models(database):
+    cfg, engine = database
+
+    command.upgrade(cfg, 'heads')
+
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), BaseModel.metadata) == []
+
+
+def test_migrations_should_downgrade_to_an_empty_database_and_upgrade_again(database):
+    cfg, engine = database
+    command.upgrade(cfg, 'heads')
+
+    command.downgrade(cfg, 'base')
+
+    assert inspect(engine).get_table_names() == ['alembic_version']
+    command.upgrade(cfg, 'heads')
+    assert set(inspect(engine).get_table_names()) == {'alembic_version', *BaseModel.metadata.tables}
+
+
+def test_migrations_should_create_the_partial_indexes_of_the_models(database):
+    cfg, engine = database
+
+    command.upgrade(cfg, 'heads')
+
+    with engine.connect() as connection:
+        created = dict(connection.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index'")).all())
+    for table in BaseModel.metadata.tables.values():
+        for index in table.indexes:
+            where = index.dialect_options['sqlite']['where']
+            if where is not None:
+                assert created[index.name].endswith(f'WHERE {where}')
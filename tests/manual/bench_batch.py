@@ -0,0 +1,65 @@
+"""Billets/sec of CreateBilletRequest posting one payload per request and posting batches of payloads.
+
+Run with the environment of the project loaded:
+
+    PYTHONPATH=. python tests/manual/bench_batch.py --billets 5000 --batch-size 50 --latency 0.01
+"""
+import argparse
+import asyncio
+import time
+
+from tests.manual.stub_server import StubBilletServer
+
+
+def _payload(number: int) -> dict:
+    return {'amount': 125000, 'expireAt': '2023-01-10', 'controlNumber': f'1{number:06}', 'description': 'Parcela'}
+
+
+async def _run(billets: int, concurrency: int, batch_size: int) -> tuple[float, int]:
+    from src.infra.adapters.acl.acl_create_billet import CreateBilletRequest
+
+    payloads = [_payload(number) for number in range(billets)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request(start: int) -> list[dict]:
+        async with semaphore:
+            if batch_size == 1:
+                return [await CreateBilletRequest().create_billet(payloads[start])]
+            end = start + batch_size
+            return await CreateBilletRequest().create_billets(payloads[start:end])
+
+    started_at = time.perf_counter()
+    results = await asyncio.gather(*(one_request(start) for start in range(0, billets, batch_size)))
+    elapsed = time.perf_counter() - started_at
+    created = sum(result['status_code'] == 201 for chunk in results for result in chunk)
+    return billets / elapsed, created
+
+
+async def main(billets: int, concurrency: int, batch_size: int, latency: float, item_error_rate: float) -> None:
+    from src.infra.adapters.acl.http_client import close_http_client
+    from src.settings import get_settings
+
+    settings = get_settings().broker_settings
+    settings.broker_rate_limit_enabled = False
+    settings.broker_batch_size = batch_size
+
+    for size in (1, batch_size):
+        async with StubBilletServer(latency_seconds=latency, item_error_rate=item_error_rate) as server:
+            settings.any_api_external = server.url
+            rate, created = await _run(billets, concurrency, size)
+            await close_http_client()
+
+        label = 'one per request' if size == 1 else f'batches of {size}'
+        print(f'{label:>16}: {rate:10.1f} billets/s, {server.requests} requests, {created} billets created')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--billets', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.01, help='latency of the stub server in seconds')
+    parser.add_argument('--item-error-rate', type=float, default=0.01, help='ratio of billets failed in batches')
+    args = parser.parse_args()
+
+    asyncio.run(main(args.billets, args.concurrency, args.batch_size, args.latency, args.item_error_rate))
@@ -0,0 +1,100 @@
+"""Payloads/sec of BuildPayload with babel and strftime, as before, and with the precompiled formatters.
+
+Run with the environment of the project loaded:
+
+    PYTHONPATH=. python tests/manual/bench_build_payload.py --installments 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from babel.numbers import format_decimal
+
+from src.common.helpers import DateHelper
+from src.domain.bank_billet.use_cases.build_payload_for_create_billet import INSTRUCTIONS_DEFAULT, BuildPayload
+from src.infra.adapters.repositories.financial_installment import (
+    FinancialInstallmentProjection,
+    FinancingProjection,
+)
+
+
+class LegacyBuildPayload(BuildPayload):
+    """BuildPayload as it was, resolving the locale and the month names for every installment"""
+
+    def _tags(self):
+        type_billet = 'regular'
+        date_billet = self.parse_date()
+        currency = format_decimal(self.financial_installments.amount, format='#,##0.00', locale='pt_BR')
+        return [
+            type_billet,
+            date_billet,
+            f'{self.financial_installments.number}[{currency}/' f'{self.financings.identifier}/{type_billet}]',
+        ]
+
+    def parse_date(self):
+        month_short, year = date.strftime(self.financial_installments.expire_on, '%b-%y').split('-')
+        translated_month_short = DateHelper.translate_month(month_short)
+        return f'{translated_month_short}-{year}'
+
+    def _build_struct_to_send(self):
+        return {
+            'amount': self.financial_installments.amount,
+            'expireAt': self.financial_installments.expire_on.strftime('%Y-%m-%d'),
+            'description': self.description(),
+            'instructions': INSTRUCTIONS_DEFAULT,
+            'documentNumber': self._put_additional_numbers(),
+            'controlNumber': self._put_additional_numbers(),
+            'tags': self._tags(),
+            'customerID': self.financings.customer_id,
+            'fineType': 1,
+            'finePercentage': '2.00',
+            'fineValue': '0.01',
+            'daysForFine': 1,
+            'interestType': 0,
+            'interestPercentage': '0.03',
+            'interestValue': '0.01',
+            'daysToInterest': 1,
+        }
+
+
+def synthetic_installments(quantity: int) -> list[tuple[FinancialInstallmentProjection, FinancingProjection]]:
+    rng = random.Random(42)
+    rows = []
+    for index in range(quantity):
+        financing = FinancingProjection(
+            id=index // 12, identifier=f'FIN{index // 12:08}', installments_number=12, customer_id=index // 12
+        )
+        installment = FinancialInstallmentProjection(
+            id=index,
+            number=index % 12 + 1,
+            amount=rng.randint(1000, 10_000_000),
+            expire_on=datetime(2023, 1, 10) + timedelta(days=rng.randint(0, 3650)),
+            financing_id=financing.id,
+        )
+        rows.append((installment, financing))
+    return rows
+
+
+def _run(builder: type[BuildPayload], rows: list) -> tuple[float, list[dict]]:
+    started_at = time.perf_counter()
+    payloads = [builder(installment, financing)._build_struct_to_send() for installment, financing in rows]
+    return len(rows) / (time.perf_counter() - started_at), payloads
+
+
+def main(installments: int) -> None:
+    rows = synthetic_installments(installments)
+
+    legacy_rate, legacy_payloads = _run(LegacyBuildPayload, rows)
+    rate, payloads = _run(BuildPayload, rows)
+
+    assert payloads == legacy_payloads, 'the payloads differ from the legacy ones'
+    print(f'{"babel + strftime":>18}: {legacy_rate:12.1f} payloads/s')
+    print(f'{"precompiled":>18}: {rate:12.1f} payloads/s ({rate / legacy_rate:.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--installments', type=int, default=1_000_000)
+    main(parser.parse_args().installments)
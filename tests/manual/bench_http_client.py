@@ -0,0 +1,57 @@
+"""Requests/sec of CreateBilletRequest with and without connection reuse.
+
+Run with the environment of the project loaded:
+
+    PYTHONPATH=. python tests/manual/bench_http_client.py --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+
+from tests.manual.stub_server import StubBilletServer
+
+PAYLOAD = {'amount': 125000, 'expireAt': '2023-01-10', 'description': 'Parcela Nº 1/12 do Financiamento Solfácil'}
+
+
+async def _run(requests: int, concurrency: int, reuse: bool) -> float:
+    from src.infra.adapters.acl.acl_create_billet import CreateBilletRequest
+    from src.infra.adapters.acl.http_client import close_http_client, create_http_client
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        async with semaphore:
+            if reuse:
+                return await CreateBilletRequest().create_billet(PAYLOAD)
+
+            async with create_http_client() as client:
+                return await CreateBilletRequest(client=client).create_billet(PAYLOAD)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await close_http_client()
+    return requests / elapsed
+
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    async with StubBilletServer(latency_seconds=latency) as server:
+        from src.settings import get_settings
+
+        get_settings().broker_settings.any_api_external = server.url
+
+        for reuse in (False, True):
+            server.connections = 0
+            rate = await _run(requests, concurrency, reuse)
+            label = 'shared client' if reuse else 'client per request'
+            print(f'{label:>20}: {rate:10.1f} req/s, {server.connections} TCP connections')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help='latency of the stub server in seconds')
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
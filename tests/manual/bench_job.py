@@ -0,0 +1,175 @@
+"""End-to-end throughput of job_get_prefixed_installments against synthetic data and a mock billet provider.
+
+Recreates the database of the environment, seeds ``--financings`` financings of 12 installments (see
+``make_billing_dataset``), starts a StubBilletServer with the given latency, error and 429 rates and runs the job
+once, reporting billets/s, the per-billet latency percentiles, the peak RSS during the job and the statements sent to
+the database. Only for the unittest (SQLite) and local environments, as the database is dropped.
+
+Run with the environment of the project loaded:
+
+    ENVIRONMENT=unittest PYTHONPATH=. python tests/manual/bench_job.py --financings 2000 --output bench_job.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+
+from tests.manual.stub_server import StubBilletServer
+
+_STATM = Path('/proc/self/statm')
+
+
+def _rss_bytes() -> int:
+    """Current RSS, or the peak RSS of the process where /proc is not available"""
+    if _STATM.exists():
+        return int(_STATM.read_text().split()[1]) * resource.getpagesize()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PeakRss:
+    """Samples the RSS of the process while running, so the seed of the database does not count"""
+
+    def __init__(self, interval_seconds: float = 0.05):
+        self.interval_seconds = interval_seconds
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        while True:
+            self.peak = max(self.peak, _rss_bytes())
+            await asyncio.sleep(self.interval_seconds)
+
+    async def __aenter__(self) -> 'PeakRss':
+        self._task = asyncio.create_task(self._sample())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._task.cancel()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+class RoundTrips:
+    """Statements sent to the database by the engine while counting, an executemany counts once"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+    def __enter__(self) -> 'RoundTrips':
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+async def _seed(financings: int, seed: int) -> dict:
+    from src.infra.adapters.database.orm.settings import get_session
+    from tests import create_test_database
+    from tests.factories import insert_billing_dataset, make_billing_dataset
+
+    await create_test_database()
+    today = datetime.utcnow()
+    dataset = make_billing_dataset(
+        financings, random.Random(seed), first_expire_on=today - timedelta(days=365), today=today, billed_rate=0.1
+    )
+    async with get_session() as session:
+        await insert_billing_dataset(session, dataset)
+    return {
+        'financings': len(dataset.financings),
+        'installments': len(dataset.installments),
+        'payments': len(dataset.payments),
+        'batch_items': len(dataset.batch_items),
+    }
+
+
+async def main(args: argparse.Namespace) -> dict:
+    from src.infra.adapters.database.orm.settings import async_engine
+    from src.jobs.job_get_prefixed_installments import job_get_prefixed_installments
+    from src.settings import Env, get_settings, is_env
+
+    if not (is_env(Env.UNITTEST) or is_env(Env.LOCAL)):
+        raise SystemExit('bench_job drops the database, run it with ENVIRONMENT=unittest or local')
+
+    broker_settings = get_settings().broker_settings
+    broker_settings.broker_rate_limit_enabled = not args.no_rate_limit
+    broker_settings.broker_batch_enabled = args.batch
+    get_settings().job_settings.job_send_workers = args.send_workers
+
+    dataset = await _seed(args.financings, args.seed)
+
+    async with StubBilletServer(
+        latency_seconds=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate
+    ) as server:
+        broker_settings.any_api_external = server.url
+        with RoundTrips(async_engine) as round_trips:
+            async with PeakRss() as rss:
+                started_at = time.perf_counter()
+                result = await job_get_prefixed_installments()
+                elapsed = time.perf_counter() - started_at
+
+    latency = result['latency'].summary()
+    return {
+        'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': async_engine.dialect.name,
+        'config': {**vars(args), 'output': str(args.output) if args.output else None},
+        'dataset': dataset,
+        'processed': result['processed'],
+        'skipped': result['skipped'],
+        'failed': result['failed'],
+        'elapsed_seconds': elapsed,
+        'billets_per_second': result['processed'] / elapsed if elapsed else 0.0,
+        'latency_seconds': {name: latency[name] for name in ('p50', 'p95', 'p99', 'max')},
+        'peak_rss_mb': rss.peak / 1024 / 1024,
+        'db_round_trips': round_trips.count,
+        'provider_requests': server.requests,
+        'circuit_breaker': result['circuit_breaker'],
+    }
+
+
+def _print(report: dict) -> None:
+    latency = report['latency_seconds']
+    print(
+        f'{report["processed"]} billets in {report["elapsed_seconds"]:.2f} s: '
+        f'{report["billets_per_second"]:.1f} billets/s, {report["failed"]} failed, {report["skipped"]} skipped\n'
+        f'latency p50 {latency["p50"] * 1000:.1f} ms, p95 {latency["p95"] * 1000:.1f} ms, '
+        f'p99 {latency["p99"] * 1000:.1f} ms\n'
+        f'peak RSS {report["peak_rss_mb"]:.1f} MB, {report["db_round_trips"]} database round trips, '
+        f'{report["provider_requests"]} provider requests'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--financings', type=int, default=2000, help='12 installments are created by financing')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.02, help='latency of the mock provider in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='ratio of requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.01, help='ratio of requests answered with 429')
+    parser.add_argument('--send-workers', type=int, default=20)
+    parser.add_argument('--batch', action='store_true', help='send the billets with the batch endpoint')
+    parser.add_argument('--no-rate-limit', action='store_true', help='disable the adaptive rate limiter')
+    parser.add_argument('--output', type=Path, help='write the report as JSON, to compare runs')
+    arguments = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    report = asyncio.run(main(arguments))
+    _print(report)
+    if arguments.output:
+        arguments.output.write_text(json.dumps(report, indent=2) + '\n')
@@ -0,0 +1,79 @@
+"""Success rate and latency of CreateBilletRequest against a faulty provider, with retries and hedging.
+
+Run with the environment of the project loaded:
+
+    PYTHONPATH=. python tests/manual/bench_retry.py --requests 2000 --error-rate 0.05 --slow-rate 0.02
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from tests.manual.stub_server import StubBilletServer
+
+PAYLOAD = {'amount': 125000, 'expireAt': '2023-01-10', 'description': 'Parcela Nº 1/12 do Financiamento Solfácil'}
+
+
+async def _run(requests: int, concurrency: int, retry: bool, hedge: bool) -> tuple[float, dict]:
+    from src.common.histogram import LatencyHistogram
+    from src.infra.adapters.acl.acl_create_billet import CreateBilletRequest
+    from src.infra.adapters.acl.retry import Hedger, RetryPolicy
+
+    retry_policy = RetryPolicy() if retry else None
+    hedger = Hedger(budget=retry_policy.budget) if hedge else None
+    latency = LatencyHistogram()
+    semaphore = asyncio.Semaphore(concurrency)
+    succeeded = 0
+
+    async def one_request():
+        nonlocal succeeded
+        async with semaphore:
+            started_at = time.perf_counter()
+            request = CreateBilletRequest(retry_policy=retry_policy, hedger=hedger)
+            try:
+                response = await request.post('/xpto', PAYLOAD, idempotency_key=uuid4().hex if hedge else None)
+            except Exception:
+                return
+            finally:
+                latency.observe(time.perf_counter() - started_at)
+            succeeded += response.status_code == 201
+
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    return succeeded / requests, latency.summary()
+
+
+async def main(requests: int, concurrency: int, error_rate: float, slow_rate: float, slow_seconds: float) -> None:
+    from src.infra.adapters.acl.http_client import close_http_client
+    from src.settings import get_settings
+
+    settings = get_settings().broker_settings
+    settings.broker_rate_limit_enabled = False
+    settings.broker_retry_max_attempts = 1
+    settings.broker_hedging_enabled = False
+
+    modes = (('no retries', False, False), ('retries', True, False), ('retries + hedging', True, True))
+    for label, retry, hedge in modes:
+        async with StubBilletServer(
+            latency_seconds=0.01, error_rate=error_rate, slow_rate=slow_rate, slow_seconds=slow_seconds
+        ) as server:
+            settings.any_api_external = server.url
+            success, latency = await _run(requests, concurrency, retry, hedge)
+            await close_http_client()
+
+        print(
+            f'{label:>18}: {success:7.2%} succeeded, {server.requests} provider requests, '
+            f'p50 {latency["p50"] * 1000:7.1f} ms, p95 {latency["p95"] * 1000:7.1f} ms, '
+            f'p99 {latency["p99"] * 1000:7.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.05, help='ratio of requests answered with 503')
+    parser.add_argument('--slow-rate', type=float, default=0.02, help='ratio of requests answered slowly')
+    parser.add_argument('--slow-seconds', type=float, default=1.0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency, args.error_rate, args.slow_rate, args.slow_seconds))
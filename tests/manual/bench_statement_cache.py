@@ -0,0 +1,125 @@
+"""Per-call overhead of the repository queries building their statements on every call, as before, and reusing the
+statements built once with bound parameters.
+
+Each query runs against an in-memory SQLite with a handful of rows, so the time is dominated by the work done in
+Python: building the select, generating its cache key and looking up the compiled SQL.
+
+Run with the environment of the project loaded:
+
+    PYTHONPATH=. python tests/manual/bench_statement_cache.py --calls 5000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from sqlalchemy import asc, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.infra.adapters.database.orm.models.base import BaseModel
+from src.infra.adapters.repositories.bank_billet_creation_batch_item import RepositoryBankBilletCreationBatchItem
+from src.infra.adapters.repositories.financial_installment import (
+    RepositoryFinancialInstallment,
+    _build_installments_not_billet_stmt,
+)
+from src.infra.adapters.repositories.sqlalchemy_repository import ORDER_BY_DESC, Page, _sort_keys
+from src.schemas.schema_base import CountStrategy, PaginateQuery
+from tests.factories import make_financial_installment, make_financing
+
+FUTURE_DATA = datetime(2023, 2, 1)
+
+
+class LegacyRepositoryFinancialInstallment(RepositoryFinancialInstallment):
+    """RepositoryFinancialInstallment as it was, building its statements with the values of every call"""
+
+    async def find_installments_not_billet(self, future_data):
+        # a new statement of equal structure on every call, as the repository built it before
+        stmt = _build_installments_not_billet_stmt.__wrapped__(
+            tuple(self.installment_status), tuple(self.financing_status), tuple(self.securitization)
+        )
+        result = await self.session_db.execute(stmt, {'future_data': future_data})
+        return [self._preload_projection(row) for row in result]
+
+    async def get_financial_installment_by_id(self, financial_installment_id):
+        stmt = (
+            select(self.financial_installment_model, self.financing_model)
+            .join(self.financing_model, self.financing_model.id == self.financial_installment_model.financing_id)
+            .where(self.financial_installment_model.id == financial_installment_id)
+        )
+        row = (await self.session_db.execute(stmt)).one()
+        return {'financial_installments': row[0], 'financings': row[1]}
+
+
+class LegacyRepositoryBankBilletCreationBatchItem(RepositoryBankBilletCreationBatchItem):
+    """get_page parsing the sort spec and building the select on every call"""
+
+    async def get_page(self, query: PaginateQuery = None) -> Page:
+        keys = _sort_keys.__wrapped__(self.entity_model, query.sort)
+        statement = select(self.entity_model).order_by(
+            *(desc(column) if ORDER_BY_DESC == order else asc(column) for column, order in keys)
+        )
+        items, count, strategy = await self._get_page(
+            stmt=statement, limit=query.limit, offset=query.offset, count_strategy=query.count_strategy
+        )
+        return Page(items=items, count=count, count_strategy=strategy)
+
+
+async def _seed(session: AsyncSession) -> int:
+    financing = make_financing()
+    session.add(financing)
+    await session.flush()
+    installments = [make_financial_installment(number=number, financing_id=financing.id) for number in range(1, 6)]
+    session.add_all(installments)
+    await session.flush()
+    return installments[0].id
+
+
+async def _per_call(calls: int, call: Callable[[], Awaitable]) -> float:
+    for _ in range(min(calls, 100)):
+        await call()
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - started_at) / calls * 1_000_000
+
+
+async def main(calls: int) -> None:
+    engine = create_async_engine('sqlite+aiosqlite://')
+    async with engine.begin() as connection:
+        await connection.run_sync(BaseModel.metadata.create_all)
+
+    query = PaginateQuery(
+        limit=10, offset=None, sort='status:asc,created_at:desc', count_strategy=CountStrategy.EXACT
+    )
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        installment_id = await _seed(session)
+        benches = {
+            'find_installments_not_billet': lambda repository: repository.find_installments_not_billet(
+                FUTURE_DATA
+            ),
+            'get_financial_installment_by_id': lambda repository: repository.get_financial_installment_by_id(
+                installment_id
+            ),
+        }
+        for name, bench in benches.items():
+            legacy = await _per_call(
+                calls, lambda bench=bench: bench(LegacyRepositoryFinancialInstallment(session))
+            )
+            cached = await _per_call(calls, lambda bench=bench: bench(RepositoryFinancialInstallment(session)))
+            print(f'{name:>32}: {legacy:8.1f} us/call built per call, {cached:8.1f} us/call cached')
+
+        legacy = await _per_call(
+            calls, lambda: LegacyRepositoryBankBilletCreationBatchItem(session).get_page(query)
+        )
+        cached = await _per_call(calls, lambda: RepositoryBankBilletCreationBatchItem(session).get_page(query))
+        print(f'{"get_page":>32}: {legacy:8.1f} us/call built per call, {cached:8.1f} us/call cached')
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=5000)
+    asyncio.run(main(parser.parse_args().calls))
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Optional
+
+_REASONS = {
+    200: 'OK',
+    201: 'Created',
+    207: 'Multi-Status',
+    404: 'Not Found',
+    429: 'Too Many Requests',
+    503: 'Service Unavailable',
+}
+
+
+@dataclass
+class StubBilletServer:
+    """Minimal HTTP/1.1 server with keep-alive that answers as the billet provider.
+
+    Used by the manual benchmarks, it runs in the same event loop as the client being measured. Faults are injected
+    at random: ``error_rate`` of the requests answer 503, ``throttle_rate`` answer 429 and ``slow_rate`` take
+    ``slow_seconds`` more, as a slow node of the provider. The batch endpoint fails ``item_error_rate`` of the
+    billets of each request and answers the others.
+    """
+
+    host: str = '127.0.0.1'
+    port: int = 0
+    latency_seconds: float = 0.0
+    requests: int = 0
+    connections: int = 0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_seconds: float = 1.0
+    item_error_rate: float = 0.0
+    rng: random.Random = field(default_factory=lambda: random.Random(42), repr=False)
+    _server: Optional[asyncio.base_events.Server] = field(default=None, repr=False)
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    async def start(self) -> 'StubBilletServer':
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> 'StubBilletServer':
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def respond(self, method: str, path: str, body: bytes) -> tuple[int, dict | list, dict]:
+        """Status, content and extra headers answered for one request"""
+        if method == 'POST' and path == '/xpto':
+            payload = json.loads(body or b'{}')
+            return 201, {'id': self.requests, 'description': payload.get('description')}, {}
+
+        if method == 'POST' and path == '/xpto/batch':
+            return 207, [self._batch_result(index, payload) for index, payload in enumerate(json.loads(body))], {}
+
+        return 404, {'detail': 'Not Found'}, {}
+
+    def _batch_result(self, index: int, payload: dict) -> dict:
+        if self.rng.random() < self.item_error_rate:
+            return {
+                'controlNumber': payload.get('controlNumber'),
+                'statusCode': 422,
+                'content': {'erros': 'Invalid'},
+            }
+
+        content = {'id': f'{self.requests}-{index}', 'description': payload.get('description')}
+        return {'controlNumber': payload.get('controlNumber'), 'statusCode': 201, 'content': content}
+
+    async def _respond_with_faults(self, method: str, path: str, body: bytes) -> tuple[int, dict | list, dict]:
+        draw = self.rng.random()
+        if draw < self.error_rate:
+            return 503, {'detail': 'Service Unavailable'}, {}
+        if draw < self.error_rate + self.throttle_rate:
+            return 429, {'detail': 'Too Many Requests'}, {'Retry-After': '0'}
+
+        return await self.respond(method, path, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, _ = request_line.decode().split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, value = line.decode().split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                self.requests += 1
+
+                latency = self.latency_seconds
+                if self.slow_rate and self.rng.random() < self.slow_rate:
+                    latency += self.slow_seconds
+                if latency:
+                    await asyncio.sleep(latency)
+
+                status_code, content, extra_headers = await self._respond_with_faults(method, path, body)
+                writer.write(self._render(status_code, content, extra_headers))
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _render(status_code: int, content: dict | list, extra_headers: dict) -> bytes:
+        body = json.dumps(content).encode()
+        headers = {
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive',
+            **extra_headers,
+        }
+        head = f'HTTP/1.1 {status_code} {_REASONS.get(status_code, "Status")}\r\n'
+        head += ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+        return f'{head}\r\n'.encode() + body
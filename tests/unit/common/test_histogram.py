@@ -0,0 +1,48 @@
+import pytest
+
+from src.common.histogram import LatencyHistogram
+
+
+def test_latency_histogram_should_summarize_observations():
+    histogram = LatencyHistogram(bounds=(0.1, 0.2, 0.3))
+    for seconds in (0.05, 0.15, 0.15, 0.25):
+        histogram.observe(seconds)
+
+    assert histogram.buckets == [1, 2, 1, 0]
+    assert histogram.count == 4
+    assert histogram.mean == pytest.approx(0.15)
+    assert histogram.maximum == 0.25
+    assert histogram.percentile(0.5) == pytest.approx(0.15)
+    assert histogram.percentile(1) == 0.25
+
+
+def test_latency_histogram_should_merge_histograms_with_same_buckets():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.observe(0.01)
+    second.observe(2)
+
+    first.merge(second)
+
+    assert first.count == 2
+    assert first.maximum == 2
+    assert first.total == pytest.approx(2.01)
+
+
+def test_latency_histogram_should_not_merge_histograms_with_different_buckets():
+    with pytest.raises(ValueError, match='different buckets'):
+        LatencyHistogram(bounds=(1.0,)).merge(LatencyHistogram(bounds=(2.0,)))
+
+
+def test_latency_histogram_should_render_cumulative_prometheus_buckets():
+    histogram = LatencyHistogram(bounds=(0.1, 0.2))
+    for seconds in (0.05, 0.15, 0.5):
+        histogram.observe(seconds)
+
+    assert histogram.prometheus_samples('job_seconds', 'stage="send"') == [
+        'job_seconds_bucket{stage="send",le="0.1"} 1',
+        'job_seconds_bucket{stage="send",le="0.2"} 2',
+        'job_seconds_bucket{stage="send",le="+Inf"} 3',
+        f'job_seconds_sum{{stage="send"}} {histogram.total}',
+        'job_seconds_count{stage="send"} 3',
+    ]
+    assert histogram.prometheus_samples('job_seconds')[-1] == 'job_seconds_count 3'
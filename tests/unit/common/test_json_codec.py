@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from src.common import json_codec
+from tests.factories import make_financial_installment
+
+
+@dataclass(slots=True)
+class Projection:
+    id: int  # noqa VNE003
+    expire_on: datetime
+
+
+class Model:
+    def to_dict(self):
+        return {'id': 1}
+
+
+VALUE = {
+    'amount': Decimal('1234.50'),
+    'expire_on': datetime(2023, 1, 10, 12, 30),
+    'paid_on': date(2023, 1, 11),
+    'uuid': UUID('12345678123456781234567812345678'),
+    'projection': Projection(id=1, expire_on=datetime(2023, 2, 10)),
+    'model': Model(),
+    'description': 'Parcela Nº 1/12 do Financiamento Solfácil',
+    1: None,
+}
+
+EXPECTED = {
+    'amount': '1234.50',
+    'expire_on': '2023-01-10T12:30:00',
+    'paid_on': '2023-01-11',
+    'uuid': '12345678-1234-5678-1234-567812345678',
+    'projection': {'id': 1, 'expire_on': '2023-02-10T00:00:00'},
+    'model': {'id': 1},
+    'description': 'Parcela Nº 1/12 do Financiamento Solfácil',
+    '1': None,
+}
+
+
+def test_dumps_should_encode_datetimes_decimals_dataclasses_and_models():
+    assert json_codec.loads(json_codec.dumps(VALUE)) == EXPECTED
+
+
+@pytest.mark.skipif(json_codec.orjson is None, reason='orjson is not installed')
+def test_stdlib_fallback_should_encode_as_orjson():
+    assert json_codec._stdlib_dumps(VALUE) == json_codec._orjson_dumps(VALUE)
+
+
+def test_dumps_should_encode_the_datetimes_of_the_models():
+    installment = make_financial_installment(
+        id=1, expire_on=None, created_at=datetime(2023, 1, 1, 8), updated_at=datetime(2023, 1, 2, 9, 30)
+    )
+
+    encoded = json_codec.loads(json_codec.dumps(installment))
+
+    assert (encoded['expire_on'], encoded['created_at'], encoded['updated_at']) == (
+        None,
+        '2023-01-01T08:00:00',
+        '2023-01-02T09:30:00',
+    )
+
+
+def test_dumps_should_reject_unknown_types():
+    with pytest.raises(TypeError):
+        json_codec.dumps(object())
+
+
+def test_codec_json_response_should_render_with_the_codec():
+    response = json_codec.CodecJSONResponse({'expire_on': date(2023, 1, 10)})
+
+    assert response.body == b'{"expire_on":"2023-01-10"}'
+    assert response.headers['content-type'] == 'application/json'
@@ -0,0 +1,35 @@
+import random
+from decimal import Decimal
+
+from babel.numbers import format_decimal
+
+from src.common.helpers import NumberHelper
+
+_RNG = random.Random(42)
+VALUES = [
+    0,
+    -1,
+    125000,
+    10**12,
+    0.005,
+    0.015,
+    2.675,
+    -0.004,
+    0.1 + 0.2,
+    Decimal('1.125'),
+    Decimal('-1234.565'),
+    *(_RNG.randint(-(10**9), 10**9) for _ in range(100)),
+    *(round(_RNG.uniform(-1e7, 1e7), _RNG.randint(0, 4)) for _ in range(100)),
+    *(Decimal(_RNG.randint(-(10**9), 10**9)) / 10 ** _RNG.randint(0, 5) for _ in range(100)),
+]
+
+
+def test_format_decimal_pt_br_should_format_as_babel():
+    formatted = [NumberHelper.format_decimal_pt_br(value) for value in VALUES]
+
+    assert formatted == [format_decimal(value, format='#,##0.00', locale='pt_BR') for value in VALUES]
+
+
+def test_format_decimal_pt_br_should_use_pt_br_separators():
+    assert NumberHelper.format_decimal_pt_br(1234567) == '1.234.567,00'
+    assert NumberHelper.format_decimal_pt_br(Decimal('1234.5')) == '1.234,50'
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from src.common.pipeline import Pipeline, Stage
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _source(items):
+    for item in items:
+        yield item
+
+
+async def test_pipeline_should_run_every_item_through_all_stages():
+    results = []
+
+    async def double(item):
+        return item * 2
+
+    async def collect(item):
+        results.append(item)
+        return item
+
+    stats = await Pipeline(
+        stages=[
+            Stage(name='double', handler=double, workers=3),
+            Stage(name='collect', handler=collect, workers=2),
+        ],
+        queue_size=2,
+    ).run(_source(range(50)))
+
+    assert sorted(results) == [item * 2 for item in range(50)]
+    assert stats['double'].processed == 50
+    assert stats['collect'].processed == 50
+
+
+async def test_pipeline_should_count_skipped_and_failed_items():
+    async def handler(item):
+        if item == 1:
+            return None
+        if item == 2:
+            raise ValueError('boom')
+        return item
+
+    stats = await Pipeline(stages=[Stage(name='only', handler=handler)]).run(_source([0, 1, 2, 3]))
+
+    assert stats['only'].processed == 2
+    assert stats['only'].skipped == 1
+    assert stats['only'].failed == 1
+
+
+async def test_pipeline_should_bound_items_in_flight():
+    produced = 0
+    in_flight = []
+
+    async def source():
+        nonlocal produced
+        for item in range(100):
+            produced += 1
+            yield item
+
+    async def slow(item):
+        in_flight.append(produced - item)
+        await asyncio.sleep(0)
+        return item
+
+    await Pipeline(stages=[Stage(name='slow', handler=slow, workers=2)], queue_size=5).run(source())
+
+    # queue_size + workers + the item blocked on ``put`` by the producer
+    assert max(in_flight) <= 5 + 2 + 1
+
+
+async def test_pipeline_should_hand_batches_to_batch_stages():
+    batches = []
+
+    async def collect(items):
+        batches.append(items)
+        return [None if item == 3 else item for item in items]
+
+    stats = await Pipeline(stages=[Stage(name='collect', handler=collect, batch_size=4)], queue_size=10).run(
+        _source(range(10))
+    )
+
+    assert sorted(item for batch in batches for item in batch) == list(range(10))
+    assert all(len(batch) <= 4 for batch in batches)
+    assert stats['collect'].processed == 9
+    assert stats['collect'].skipped == 1
+
+
+async def test_pipeline_should_fail_every_item_of_a_failed_batch():
+    done, failed = [], []
+
+    async def fail(items):
+        raise ValueError('boom')
+
+    stats = await Pipeline(
+        stages=[Stage(name='fail', handler=fail, batch_size=5)],
+        queue_size=10,
+        on_done=done.append,
+        on_failed=failed.append,
+    ).run(_source(range(7)))
+
+    assert stats['fail'].failed == 7
+    assert sorted(done) == list(range(7))
+    assert sorted(failed) == list(range(7))
+
+
+async def test_pipeline_should_time_the_source_and_every_stage():
+    async def double(item):
+        return item * 2
+
+    stats = await Pipeline(stages=[Stage(name='double', handler=double)], source_name='fetch').run(
+        _source(range(5))
+    )
+
+    assert list(stats) == ['fetch', 'double']
+    assert stats['fetch'].processed == 5
+    assert stats['fetch'].latency.count == 5
+    assert stats['double'].latency.count == 5
@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+
+from src.domain.bank_billet.bank_billet_proccess import CreateBillet
+from src.infra.adapters.acl.acl_create_billet import CreateBilletRequest
+from src.infra.adapters.acl.circuit_breaker import CircuitOpenError
+from src.infra.adapters.repositories.financial_installment import FinancialInstallmentProjection
+from src.settings import get_settings
+
+
+def _billet() -> CreateBillet:
+    installment = FinancialInstallmentProjection(
+        id=1, number=2, amount=100, expire_on=date(2023, 1, 10), financing_id=3
+    )
+    return CreateBillet(installment_id=1, batch_id=None, financial_installment=installment, payload={})
+
+
+def test_idempotency_key_should_depend_only_on_the_installment():
+    billet = _billet()
+
+    assert billet.idempotency_key == _billet().idempotency_key
+    billet.financial_installment.expire_on = date(2023, 2, 10)
+    assert billet.idempotency_key != _billet().idempotency_key
+
+
+@pytest.mark.asyncio()
+async def test_send_should_wait_while_the_circuit_is_open(mocker):
+    create_billet = mocker.patch.object(
+        CreateBilletRequest,
+        'create_billet',
+        side_effect=[CircuitOpenError(0.01), {'content': {'id': 1}, 'status_code': 201}],
+    )
+    mocker.patch.object(CreateBilletRequest, '__init__', return_value=None)
+
+    billet = await _billet().send()
+
+    assert billet.response['status_code'] == 201
+    assert create_billet.call_count == 2
+    assert create_billet.call_args.kwargs == {'idempotency_key': billet.idempotency_key}
+
+
+@pytest.mark.asyncio()
+async def test_send_should_give_up_after_the_max_wait(mocker):
+    mocker.patch.object(CreateBilletRequest, 'create_billet', side_effect=CircuitOpenError(30))
+    mocker.patch.object(CreateBilletRequest, '__init__', return_value=None)
+    mocker.patch.object(get_settings().job_settings, 'job_circuit_open_max_wait_seconds', 10)
+
+    with pytest.raises(CircuitOpenError):
+        await _billet().send()
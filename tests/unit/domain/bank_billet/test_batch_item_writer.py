@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.domain.bank_billet.batch_item_writer import BatchItemWriter
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeSaveMany:
+    def __init__(self, broken_ids=()):
+        self.calls = []
+        self.broken_ids = set(broken_ids)
+
+    async def __call__(self, rows):
+        if any(row['financial_installment_id'] in self.broken_ids for row in rows):
+            raise SQLAlchemyError('broken row')
+        self.calls.append([row['financial_installment_id'] for row in rows])
+
+
+def _row(installment_id):
+    return {'financial_installment_id': installment_id, 'status': 'done'}
+
+
+async def test_batch_item_writer_should_flush_when_buffer_is_full():
+    save_many = FakeSaveMany()
+    writer = BatchItemWriter(flush_size=2, flush_interval_seconds=60, save_many=save_many)
+
+    for installment_id in range(5):
+        await writer.add(_row(installment_id))
+
+    assert save_many.calls == [[0, 1], [2, 3]]
+
+    await writer.close()
+
+    assert save_many.calls == [[0, 1], [2, 3], [4]]
+    assert writer.saved == 5
+
+
+async def test_batch_item_writer_should_flush_periodically():
+    save_many = FakeSaveMany()
+
+    async with BatchItemWriter(flush_size=100, flush_interval_seconds=0.01, save_many=save_many) as writer:
+        await writer.add(_row(1))
+        await asyncio.sleep(0.05)
+
+        assert save_many.calls == [[1]]
+
+
+async def test_batch_item_writer_should_report_rows_which_failed():
+    save_many = FakeSaveMany(broken_ids={2})
+    failed = []
+
+    async with BatchItemWriter(
+        flush_size=3, flush_interval_seconds=60, save_many=save_many, on_failed=failed.append
+    ) as writer:
+        for installment_id in range(1, 4):
+            await writer.add(_row(installment_id))
+
+    assert save_many.calls == [[1], [3]]
+    assert writer.saved == 2
+    assert [row['financial_installment_id'] for row, _ in writer.failed] == [2]
+    assert [row['financial_installment_id'] for row in failed] == [2]
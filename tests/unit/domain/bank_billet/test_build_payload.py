@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from src.domain.bank_billet.use_cases.build_payload_for_create_billet import BuildPayload
+from src.infra.adapters.repositories.financial_installment import (
+    FinancialInstallmentProjection,
+    FinancingProjection,
+)
+
+
+@pytest.mark.asyncio()
+async def test_build_payload_for_create_billet_should_format_in_pt_br():
+    payload = await BuildPayload(
+        financial_installments=FinancialInstallmentProjection(
+            id=1, number=2, amount=123456, expire_on=datetime(2023, 2, 10), financing_id=77
+        ),
+        financings=FinancingProjection(id=77, identifier='FIN77', installments_number=12, customer_id=5),
+    ).build_payload_for_create_billet()
+
+    assert payload['expireAt'] == '2023-02-10'
+    assert payload['description'] == 'Parcela Nº 2/12 do Financiamento Solfácil'
+    assert payload['documentNumber'] == payload['controlNumber'] == '77002'
+    assert payload['tags'] == ['regular', 'Fev-23', '2[123.456,00/FIN77/regular]']
+    assert payload['customerID'] == 5
+    assert payload['finePercentage'] == '2.00'
+
+
+@pytest.mark.parametrize(('month', 'abbreviation'), [(1, 'Jan'), (2, 'Fev'), (4, 'Abr'), (8, 'Ago'), (12, 'Dez')])
+def test_parse_date_should_not_depend_on_the_locale(month, abbreviation):
+    installment = FinancialInstallmentProjection(
+        id=1, number=1, amount=1, expire_on=datetime(2031, month, 1), financing_id=1
+    )
+
+    assert BuildPayload(financial_installments=installment, financings=None).parse_date() == f'{abbreviation}-31'
@@ -0,0 +1,56 @@
+from src.domain.bank_billet.checkpoint import CheckpointTracker
+
+
+def test_checkpoint_tracker_should_only_advance_over_finished_installments():
+    tracker = CheckpointTracker()
+    for installment_id in (1, 2, 3, 4):
+        tracker.start(installment_id)
+
+    tracker.finish(2)
+    assert tracker.checkpoint is None
+
+    tracker.finish(1)
+    assert tracker.checkpoint == 2
+
+    tracker.finish(4)
+    assert tracker.checkpoint == 2
+
+    tracker.finish(3)
+    assert tracker.checkpoint == 4
+
+
+def test_checkpoint_tracker_should_keep_the_checkpoint_it_was_resumed_from():
+    tracker = CheckpointTracker(checkpoint=10)
+
+    tracker.start(11)
+
+    assert tracker.checkpoint == 10
+
+
+def test_checkpoint_tracker_should_hold_the_checkpoint_before_a_failed_installment():
+    tracker = CheckpointTracker()
+    for installment_id in (1, 2, 3, 4):
+        tracker.start(installment_id)
+
+    tracker.finish(1)
+    tracker.fail(2)
+    tracker.finish(2)
+    tracker.finish(3)
+    tracker.start(5)
+    tracker.finish(4)
+    tracker.finish(5)
+
+    assert tracker.checkpoint == 1
+
+
+def test_checkpoint_tracker_should_go_back_before_an_installment_failed_after_finishing():
+    tracker = CheckpointTracker()
+    for installment_id in (1, 2, 3):
+        tracker.start(installment_id)
+        tracker.finish(installment_id)
+
+    tracker.fail(2)
+
+    assert tracker.checkpoint == 1
+    assert tracker.held(3) == 1
+    assert tracker.held(None) is None
@@ -0,0 +1,96 @@
+import httpx
+import pytest
+
+from src.infra.adapters.acl.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _respond(status_code: int):
+    async def send():
+        return httpx.Response(status_code)
+
+    return send
+
+
+async def _fail():
+    raise httpx.ConnectError('refused')
+
+
+async def test_circuit_breaker_should_open_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+
+    await breaker.call(_respond(500))
+    await breaker.call(_respond(201))
+    await breaker.call(_respond(500))
+    assert breaker.state is CircuitState.CLOSED
+
+    with pytest.raises(httpx.ConnectError):
+        await breaker.call(_fail)
+    assert breaker.state is CircuitState.OPEN
+
+
+async def test_circuit_breaker_should_fail_fast_while_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30, clock=clock)
+    await breaker.call(_respond(503))
+
+    clock.now = 10
+    with pytest.raises(CircuitOpenError) as err:
+        await breaker.call(_respond(201))
+
+    assert err.value.retry_after == 20
+    assert breaker.rejected == 1
+
+
+async def test_circuit_breaker_should_close_after_a_successful_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30, clock=clock)
+    await breaker.call(_respond(503))
+
+    clock.now = 30
+    await breaker.call(_respond(201))
+
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.stats() == {
+        'state': 'closed',
+        'transitions': {'closed->open': 1, 'open->half_open': 1, 'half_open->closed': 1},
+        'rejected': 0,
+    }
+
+
+async def test_circuit_breaker_should_reopen_after_a_failed_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30, clock=clock)
+    await breaker.call(_respond(503))
+
+    clock.now = 30
+    await breaker.call(_respond(502))
+
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(_respond(201))
+
+
+async def test_circuit_breaker_should_limit_half_open_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30, clock=clock)
+    await breaker.call(_respond(503))
+    clock.now = 30
+
+    async def probe():
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(_respond(201))
+        return httpx.Response(201)
+
+    await breaker.call(probe)
+
+    assert breaker.state is CircuitState.CLOSED
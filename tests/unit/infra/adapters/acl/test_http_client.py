@@ -0,0 +1,114 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from src.infra.adapters.acl.acl_create_billet import IDEMPOTENCY_KEY_FIELD, CreateBilletRequest
+from src.infra.adapters.acl.http_client import close_http_client, create_http_client, get_http_client
+from src.settings import get_settings
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def _broker_url(mocker):
+    mocker.patch.object(get_settings().broker_settings, 'any_api_external', 'http://provider')
+
+
+async def test_get_http_client_should_share_the_client_until_closed():
+    client = get_http_client()
+
+    assert get_http_client() is client
+
+    await close_http_client()
+
+    assert client.is_closed
+    assert get_http_client() is not client
+    await close_http_client()
+
+
+async def test_create_http_client_should_use_broker_timeouts():
+    settings = get_settings().broker_settings
+
+    async with create_http_client() as client:
+        assert client.timeout == httpx.Timeout(
+            connect=settings.broker_connect_timeout_seconds,
+            read=settings.broker_read_timeout_seconds,
+            write=settings.broker_write_timeout_seconds,
+            pool=settings.broker_pool_timeout_seconds,
+        )
+
+
+async def test_create_billet_should_return_content_and_status_code():
+    async with httpx.AsyncClient(base_url='http://provider') as client:
+        with respx.mock(base_url='http://provider') as provider:
+            provider.post('/xpto').respond(201, json={'id': 10})
+
+            response = await CreateBilletRequest(client=client).create_billet({'amount': 100})
+
+    assert response == {'content': {'id': 10}, 'status_code': 201}
+
+
+async def test_create_billets_should_map_each_result_to_its_payload(mocker):
+    mocker.patch.object(get_settings().broker_settings, 'broker_batch_size', 2)
+    payloads = [{'controlNumber': '1001'}, {'controlNumber': '1002'}, {'controlNumber': '1003'}]
+
+    async with httpx.AsyncClient(base_url='http://provider') as client:
+        with respx.mock(base_url='http://provider') as provider:
+            provider.post('/xpto/batch').mock(
+                side_effect=[
+                    httpx.Response(
+                        207,
+                        json=[
+                            {'controlNumber': '1002', 'statusCode': 422, 'content': {'erros': 'invalid'}},
+                            {'controlNumber': '1001', 'statusCode': 201, 'content': {'id': 1}},
+                        ],
+                    ),
+                    httpx.Response(207, json=[]),
+                ]
+            )
+
+            responses = await CreateBilletRequest(client=client).create_billets(payloads)
+
+    assert responses == [
+        {'content': {'id': 1}, 'status_code': 201},
+        {'content': {'erros': 'invalid'}, 'status_code': 422},
+        {'content': {'detail': 'Billet missing from the batch response'}, 'status_code': 502},
+    ]
+
+
+async def test_create_billets_should_fail_every_payload_of_a_failed_request():
+    async with httpx.AsyncClient(base_url='http://provider') as client:
+        with respx.mock(base_url='http://provider') as provider:
+            provider.post('/xpto/batch').respond(400, json={'detail': 'bad request'})
+
+            responses = await CreateBilletRequest(client=client).create_billets([{'controlNumber': '1'}] * 2)
+
+    assert responses == [{'content': {'detail': 'bad request'}, 'status_code': 400}] * 2
+
+
+async def test_create_billets_should_send_the_key_of_each_billet_whatever_its_chunk(mocker):
+    payloads = [{'controlNumber': str(number)} for number in range(1, 6)]
+    keys = [f'key-{number}' for number in range(1, 6)]
+    sent = {}
+
+    async def send_in_batches_of(size, start):
+        mocker.patch.object(get_settings().broker_settings, 'broker_batch_size', size)
+        async with httpx.AsyncClient(base_url='http://provider') as client:
+            with respx.mock(base_url='http://provider') as provider:
+                provider.post('/xpto/batch').respond(207, json=[])
+
+                await CreateBilletRequest(client=client).create_billets(payloads[start:], keys[start:])
+
+                requests = [call.request for call in provider.calls]
+
+        for request in requests:
+            assert 'Idempotency-Key' not in request.headers
+            for item in json.loads(request.content):
+                sent.setdefault(item['controlNumber'], set()).add(item[IDEMPOTENCY_KEY_FIELD])
+
+    await send_in_batches_of(2, start=0)
+    await send_in_batches_of(3, start=1)
+
+    assert sent == {payload['controlNumber']: {key} for payload, key in zip(payloads, keys)}
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from src.infra.adapters.acl.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(**values):
+    return AdaptiveRateLimiter(**{'rate': 10, 'min_rate': 1, 'max_rate': 20, 'increase': 10, **values})
+
+
+def test_rate_limiter_should_increase_additively_on_success():
+    limiter = _limiter()
+
+    for _ in range(10):
+        limiter.on_response(201, latency_seconds=0.01)
+
+    assert 15 < limiter.rate < 20
+
+
+def test_rate_limiter_should_decrease_multiplicatively_once_by_cooldown():
+    clock = FakeClock()
+    limiter = _limiter(clock=clock)
+
+    limiter.on_response(429, latency_seconds=0.01)
+    limiter.on_response(429, latency_seconds=0.01)
+    assert limiter.rate == 5
+
+    clock.now = 2
+    limiter.on_response(429, latency_seconds=0.01)
+    limiter.on_timeout()
+    assert limiter.rate == 2.5
+
+
+def test_rate_limiter_should_decrease_when_latency_is_above_target():
+    limiter = _limiter(latency_target_seconds=0.5)
+
+    limiter.on_response(201, latency_seconds=1)
+
+    assert limiter.rate == 5
+
+
+def test_rate_limiter_should_respect_bounds():
+    limiter = _limiter(rate=1.5)
+
+    limiter.on_response(429, latency_seconds=0.01)
+    assert limiter.rate == 1
+
+    limiter.rate = 20
+    limiter.on_response(201, latency_seconds=0.01)
+    assert limiter.rate == 20
+
+
+@pytest.mark.asyncio()
+async def test_rate_limiter_should_space_requests_by_rate():
+    limiter = _limiter(rate=100, max_rate=100)
+
+    started_at = time.monotonic()
+    for _ in range(6):
+        await limiter.acquire()
+
+    assert time.monotonic() - started_at >= 0.045
+
+
+@pytest.mark.asyncio()
+async def test_rate_limiter_should_pause_during_retry_after():
+    limiter = _limiter(rate=100, max_rate=100)
+    limiter.on_response(429, latency_seconds=0.01, retry_after=0.05)
+
+    started_at = time.monotonic()
+    await limiter.acquire()
+
+    assert time.monotonic() - started_at >= 0.045
+
+
+def test_parse_retry_after_should_accept_seconds_and_dates():
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after('invalid') is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from src.infra.adapters.acl.acl_create_billet import CreateBilletRequest
+from src.infra.adapters.acl.retry import Hedger, LatencyTracker, RetryBudget, RetryPolicy
+from src.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def _without_circuit_breaker(mocker):
+    mocker.patch.object(get_settings().broker_settings, 'broker_circuit_breaker_enabled', False)
+
+
+def _policy(**values) -> RetryPolicy:
+    return RetryPolicy(**{'base_delay_seconds': 0.001, 'random': lambda: 1.0, **values})
+
+
+async def _post(policy: RetryPolicy, idempotent: bool = False) -> httpx.Response:
+    async with httpx.AsyncClient(base_url='http://provider') as client:
+        request = CreateBilletRequest(client=client, retry_policy=policy)
+        return await request.post('/xpto', {'amount': 100}, idempotency_key='key' if idempotent else None)
+
+
+@pytest.mark.asyncio()
+async def test_retry_policy_should_retry_throttled_responses():
+    with respx.mock(base_url='http://provider') as provider:
+        route = provider.post('/xpto')
+        route.side_effect = [httpx.Response(429), httpx.Response(503), httpx.Response(201, json={'id': 1})]
+
+        response = await _post(_policy())
+
+    assert response.status_code == 201
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio()
+async def test_retry_policy_should_stop_at_max_attempts():
+    with respx.mock(base_url='http://provider') as provider:
+        route = provider.post('/xpto').respond(503)
+
+        response = await _post(_policy(max_attempts=2))
+
+    assert response.status_code == 503
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio()
+async def test_retry_policy_should_stop_when_budget_is_exhausted():
+    with respx.mock(base_url='http://provider') as provider:
+        route = provider.post('/xpto').respond(503)
+
+        response = await _post(_policy(budget=RetryBudget(tokens=0, ratio=0.1)))
+
+    assert response.status_code == 503
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio()
+async def test_retry_policy_should_not_retry_sent_requests_that_are_not_idempotent():
+    with respx.mock(base_url='http://provider') as provider:
+        route = provider.post('/xpto')
+        route.side_effect = [httpx.Response(500), httpx.Response(201, json={'id': 1})]
+        assert (await _post(_policy())).status_code == 500
+
+        route.side_effect = [httpx.ReadTimeout('timeout'), httpx.Response(201, json={'id': 1})]
+        with pytest.raises(httpx.ReadTimeout):
+            await _post(_policy())
+
+        route.side_effect = [httpx.ReadTimeout('timeout'), httpx.Response(201, json={'id': 1})]
+        assert (await _post(_policy(), idempotent=True)).status_code == 201
+
+
+def test_retry_policy_backoff_should_grow_until_max_delay():
+    policy = RetryPolicy(base_delay_seconds=0.1, max_delay_seconds=1, random=lambda: 1.0)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [0.2, 0.4, 0.8, 1, 1]
+
+
+def test_latency_tracker_should_keep_the_quantile_of_the_window():
+    tracker = LatencyTracker(quantile=0.9, window=100, min_samples=10)
+
+    for seconds in range(1, 10):
+        tracker.observe(seconds)
+    assert tracker.value is None
+
+    tracker.observe(10)
+    assert tracker.value == 10
+
+
+@pytest.mark.asyncio()
+async def test_hedger_should_answer_the_fastest_request():
+    delays = [1.0, 0.01]
+
+    async def send():
+        await asyncio.sleep(delays.pop(0))
+        return httpx.Response(201)
+
+    hedger = Hedger(tracker=LatencyTracker(min_samples=1))
+    hedger.tracker.observe(0.01)
+
+    response = await asyncio.wait_for(hedger.run(send), timeout=0.5)
+
+    assert response.status_code == 201
+    assert hedger.hedged == 1
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(('hedge_after_seconds', 'requests'), [(0.01, 2), (1.0, 1)])
+async def test_hedger_should_cancel_its_requests_when_cancelled(hedge_after_seconds, requests):
+    sent = []
+
+    async def send():
+        sent.append(asyncio.current_task())
+        await asyncio.sleep(1)
+
+    hedger = Hedger(tracker=LatencyTracker(min_samples=1))
+    hedger.tracker.observe(hedge_after_seconds)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(hedger.run(send), timeout=0.05)
+
+    assert len(sent) == requests
+    assert all(task.cancelled() for task in sent)
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infra.adapters.database.orm import pool
+from src.infra.adapters.database.orm.pool import TimedAsyncAdaptedQueuePool
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_timed_pool_should_report_the_wait_for_a_checked_out_connection(monkeypatch):
+    waits = []
+    monkeypatch.setattr(pool, 'checkout_wait_listeners', [waits.append])
+    engine = create_async_engine(
+        'sqlite+aiosqlite://', poolclass=TimedAsyncAdaptedQueuePool, pool_size=1, max_overflow=0
+    )
+
+    async def hold_connection(holding: asyncio.Event):
+        async with engine.connect():
+            holding.set()
+            await asyncio.sleep(0.1)
+
+    holding = asyncio.Event()
+    holder = asyncio.create_task(hold_connection(holding))
+    await holding.wait()
+    async with engine.connect():
+        pass
+    await holder
+    await engine.dispose()
+
+    assert len(waits) == 2
+    assert max(waits) >= 0.09
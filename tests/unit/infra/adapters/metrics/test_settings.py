@@ -0,0 +1,24 @@
+import os
+from unittest import mock
+
+from src.infra.adapters.metrics.settings import MULTIPROC_DIR_ENV, prepare_multiprocess_dir
+from src.settings import get_settings
+
+
+def test_prepare_multiprocess_dir_should_be_skipped_for_a_single_worker():
+    with mock.patch.dict(os.environ, clear=False):
+        os.environ.pop(MULTIPROC_DIR_ENV, None)
+
+        assert prepare_multiprocess_dir(workers=1) is None
+        assert MULTIPROC_DIR_ENV not in os.environ
+
+
+def test_prepare_multiprocess_dir_should_clean_the_files_of_a_previous_run(tmp_path, monkeypatch):
+    (tmp_path / 'counter_123.db').write_bytes(b'stale')
+    monkeypatch.setattr(get_settings().metrics_settings, 'prometheus_multiproc_dir', str(tmp_path))
+
+    with mock.patch.dict(os.environ, clear=False):
+        assert prepare_multiprocess_dir(workers=4) == str(tmp_path)
+        assert os.environ[MULTIPROC_DIR_ENV] == str(tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,31 @@
+from src.infra.adapters.repositories.count_cache import CountCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_count_cache_should_expire_counts_after_the_ttl():
+    clock = FakeClock()
+    cache = CountCache(ttl_seconds=10, clock=clock)
+    cache.set('query', 42)
+
+    clock.now = 9.9
+    assert cache.get('query') == 42
+
+    clock.now = 10
+    assert cache.get('query') is None
+
+
+def test_count_cache_should_evict_the_oldest_count_when_full():
+    cache = CountCache(max_entries=2)
+    cache.set('first', 1)
+    cache.set('second', 2)
+    cache.set('third', 3)
+
+    assert cache.get('first') is None
+    assert (cache.get('second'), cache.get('third')) == (2, 3)
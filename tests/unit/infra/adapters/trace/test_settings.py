@@ -0,0 +1,122 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+import respx
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from src.infra.adapters.acl.http_client import create_http_client
+from src.infra.adapters.database.orm.settings import get_connection
+from src.infra.adapters.logging.settings import TraceContextFilter
+from src.infra.adapters.trace.settings import (
+    TailSamplingSpanProcessor,
+    current_trace_ids,
+    set_up_tracing,
+    shutdown_tracing,
+    trace_handler,
+)
+from src.settings import get_settings
+from tests import base_url
+
+pytest.importorskip('opentelemetry.sdk')
+
+from opentelemetry.sdk.trace import TracerProvider  # noqa E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa E402
+from opentelemetry.trace import SpanKind, Status, StatusCode  # noqa E402
+
+
+@pytest.fixture()
+def exporter(mocker):
+    mocker.patch.object(get_settings().otlp_settings, 'otlp_tracing_enabled', True)
+    mocker.patch.object(get_settings().otlp_settings, 'otlp_tail_sampling_ratio', 1.0)
+    mocker.patch.object(get_settings().broker_settings, 'any_api_external', 'http://provider')
+    exporter = InMemorySpanExporter()
+    assert set_up_tracing(exporter) is True
+    yield exporter
+    shutdown_tracing()
+
+
+def _finished_spans(exporter: InMemorySpanExporter) -> dict:
+    shutdown_tracing()
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def _log_record() -> logging.LogRecord:
+    record = logging.LogRecord('src', logging.INFO, __file__, 1, 'message', None, None)
+    TraceContextFilter().filter(record)
+    return record
+
+
+async def _build(item):
+    return _log_record()
+
+
+@pytest.mark.asyncio()
+async def test_trace_handler_should_not_wrap_handlers_with_tracing_disabled():
+    record = _log_record()
+
+    assert trace_handler('billing_job.build', _build) is _build
+    assert (record.otelTraceID, record.otelSpanID) == ('0', '0')
+
+
+@pytest.mark.asyncio()
+async def test_trace_handler_should_run_each_call_in_a_span_seen_by_the_logs(exporter):
+    record = await trace_handler('billing_job.build', _build)(SimpleNamespace(installment_id=7))
+
+    span = _finished_spans(exporter)['billing_job.build']
+    assert span.attributes['billing.installment_id'] == 7
+    assert record.otelTraceID == format(span.context.trace_id, '032x')
+    assert record.otelSpanID == format(span.context.span_id, '016x')
+    assert current_trace_ids() == ('0', '0')
+
+
+@pytest.mark.asyncio()
+async def test_tracing_should_trace_sql_statements(exporter):
+    async with get_connection() as connection:
+        await connection.execute(text('SELECT 1'))
+
+    assert any(span.name.startswith('SELECT') for span in _finished_spans(exporter).values())
+
+
+@pytest.mark.asyncio()
+async def test_tracing_should_trace_requests_to_the_billet_provider(exporter):
+    with respx.mock(base_url='http://provider') as provider:
+        provider.post('/xpto').respond(201)
+        async with create_http_client() as client:
+            await client.post('/xpto')
+
+    spans = [span for span in _finished_spans(exporter).values() if span.kind is SpanKind.CLIENT]
+    assert [span.name for span in spans] == ['POST']
+
+
+@pytest.mark.asyncio()
+async def test_tracing_should_trace_api_routes(exporter):
+    from src.app import create_app
+
+    async with AsyncClient(app=create_app(), base_url=base_url) as client:
+        await client.get('/')
+
+    spans = [span for span in _finished_spans(exporter).values() if span.kind is SpanKind.SERVER]
+    assert [span.name for span in spans] == ['GET /']
+
+
+def test_tail_sampling_should_keep_only_failed_and_slow_traces_below_the_ratio():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(
+        TailSamplingSpanProcessor(SimpleSpanProcessor(exporter), ratio=0.0, latency_threshold_seconds=1.0)
+    )
+    tracer = provider.get_tracer(__name__)
+
+    with tracer.start_as_current_span('fast'):
+        with tracer.start_as_current_span('fast child'):
+            pass
+    with tracer.start_as_current_span('failed'):
+        with tracer.start_as_current_span('failed child') as child:
+            child.set_status(Status(StatusCode.ERROR))
+    slow = tracer.start_span('slow', start_time=0)
+    slow.end(end_time=2 * 10**9)
+
+    assert sorted(span.name for span in exporter.get_finished_spans()) == ['failed', 'failed child', 'slow']
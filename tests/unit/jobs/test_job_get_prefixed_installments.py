@@ -0,0 +1,65 @@
+from src.common.histogram import LatencyHistogram
+from src.common.pipeline import StageStats
+from src.jobs.job_get_prefixed_installments import aggregate_shard_results
+
+
+def _shard_result(latencies: list[float], circuit_breaker: dict = None, **values) -> dict:
+    latency = LatencyHistogram()
+    send = StageStats(processed=len(latencies), latency=LatencyHistogram())
+    for seconds in latencies:
+        latency.observe(seconds)
+        send.latency.observe(seconds)
+    return {
+        'Success': True,
+        'processed': len(latencies),
+        'skipped': 0,
+        'failed': 0,
+        'created': len(latencies),
+        'rejected': 0,
+        'interrupted': False,
+        'elapsed_seconds': 1.0,
+        'latency': latency,
+        'stages': {'send': send},
+        'circuit_breaker': circuit_breaker,
+        **values,
+    }
+
+
+def test_aggregate_shard_results_should_merge_the_latency_samples_and_the_stages():
+    result = aggregate_shard_results(
+        [
+            _shard_result([0.05, 0.5], elapsed_seconds=2.0),
+            _shard_result([0.7], failed=1, interrupted=True),
+        ]
+    )
+
+    assert (result['shards'], result['processed'], result['failed'], result['interrupted']) == (2, 3, 1, True)
+    assert result['elapsed_seconds'] == 2.0
+    expected = LatencyHistogram()
+    for seconds in (0.05, 0.5, 0.7):
+        expected.observe(seconds)
+    assert result['latency'] == expected
+    assert result['stages']['send'] == StageStats(processed=3, latency=expected)
+
+
+def test_aggregate_shard_results_should_merge_the_circuit_breakers():
+    result = aggregate_shard_results(
+        [
+            _shard_result([], {'state': 'closed', 'transitions': {}, 'rejected': 0}),
+            _shard_result([], {'state': 'open', 'transitions': {'closed->open': 1}, 'rejected': 3}),
+            _shard_result(
+                [],
+                {'state': 'closed', 'transitions': {'closed->open': 1, 'open->half_open': 1}, 'rejected': 2},
+            ),
+        ]
+    )
+
+    assert result['circuit_breaker'] == {
+        'states': {'closed': 2, 'open': 1},
+        'transitions': {'closed->open': 2, 'open->half_open': 1},
+        'rejected': 5,
+    }
+
+
+def test_aggregate_shard_results_should_leave_out_a_disabled_circuit_breaker():
+    assert aggregate_shard_results([_shard_result([0.05]), _shard_result([0.5])])['circuit_breaker'] is None
@@ -0,0 +1,94 @@
+from src.common.histogram import LatencyHistogram
+from src.common.pipeline import StageStats
+from src.jobs.job_metrics import prometheus_text, summary_table, write_prometheus_textfile
+
+
+def _result() -> dict:
+    send = StageStats(processed=2, failed=1, latency=LatencyHistogram(bounds=(0.1, 1.0)))
+    send.latency.observe(0.05)
+    send.latency.observe(0.5)
+    latency = LatencyHistogram(bounds=(0.1, 1.0))
+    latency.observe(0.7)
+    return {
+        'processed': 2,
+        'skipped': 0,
+        'failed': 1,
+        'created': 1,
+        'rejected': 1,
+        'elapsed_seconds': 2.0,
+        'latency': latency,
+        'stages': {'fetch': StageStats(processed=3), 'send': send},
+    }
+
+
+def test_summary_table_should_have_a_row_by_stage_and_the_totals():
+    lines = summary_table(_result()).splitlines()
+
+    assert lines[0].split()[:4] == ['stage', 'processed', 'skipped', 'failed']
+    assert lines[1].split()[:4] == ['fetch', '3', '0', '0']
+    assert lines[2].split()[:4] == ['send', '2', '0', '1']
+    assert lines[3].startswith('billets: created 1, rejected 1, skipped 0, failed 1, 1.0 billets/s in 2.00 s')
+
+
+def test_prometheus_text_should_export_stages_and_billets():
+    text = prometheus_text(_result())
+
+    assert '# TYPE billing_job_stage_seconds histogram' in text
+    assert 'billing_job_stage_seconds_count{stage="send"} 2' in text
+    assert 'billing_job_stage_items_total{stage="send",result="failed"} 1' in text
+    assert 'billing_job_billets_total{result="rejected"} 1' in text
+    assert 'billing_job_billet_seconds_bucket{le="1.0"} 1' in text
+    assert text.endswith('billing_job_duration_seconds 2.0\n')
+
+
+def test_write_prometheus_textfile_should_replace_the_file(tmp_path):
+    path = tmp_path / 'billing_job.prom'
+    path.write_text('old')
+
+    write_prometheus_textfile(str(path), _result())
+
+    assert path.read_text() == prometheus_text(_result())
+    assert [file.name for file in tmp_path.iterdir()] == ['billing_job.prom']
+
+
+def test_summary_table_should_show_the_circuit_breaker():
+    result = {**_result(), 'circuit_breaker': {'state': 'open', 'transitions': {'closed->open': 1}, 'rejected': 4}}
+
+    lines = summary_table(result).splitlines()
+
+    assert lines[-1] == 'circuit breaker: ended open 1, transitions closed->open 1, rejected 4'
+
+
+def test_prometheus_text_should_export_the_circuit_breaker():
+    circuit_breaker = {
+        'state': 'half_open',
+        'transitions': {'closed->open': 2, 'open->half_open': 1},
+        'rejected': 7,
+    }
+
+    text = prometheus_text({**_result(), 'circuit_breaker': circuit_breaker})
+
+    assert '# TYPE billing_job_circuit_breaker_transitions_total counter' in text
+    assert 'billing_job_circuit_breaker_transitions_total{transition="closed->open"} 2' in text
+    assert 'billing_job_circuit_breaker_transitions_total{transition="open->half_open"} 1' in text
+    assert '# TYPE billing_job_circuit_breaker_rejected_calls_total counter' in text
+    assert 'billing_job_circuit_breaker_rejected_calls_total 7' in text
+    assert '# TYPE billing_job_circuit_breaker_state gauge' in text
+    assert text.endswith(
+        'billing_job_circuit_breaker_state{state="closed"} 0\n'
+        'billing_job_circuit_breaker_state{state="open"} 0\n'
+        'billing_job_circuit_breaker_state{state="half_open"} 1\n'
+    )
+
+
+def test_prometheus_text_should_count_the_circuits_of_the_shards_by_state():
+    circuit_breaker = {'states': {'closed': 2, 'open': 1}, 'transitions': {}, 'rejected': 0}
+
+    text = prometheus_text({**_result(), 'circuit_breaker': circuit_breaker})
+
+    assert 'billing_job_circuit_breaker_state{state="closed"} 2' in text
+    assert 'billing_job_circuit_breaker_state{state="open"} 1' in text
+
+
+def test_prometheus_text_should_leave_out_a_disabled_circuit_breaker():
+    assert 'circuit_breaker' not in prometheus_text({**_result(), 'circuit_breaker': None})
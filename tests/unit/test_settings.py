@@ -1,7 +1,11 @@
 import os
 from unittest import mock
 
+import pytest
+from pydantic import ValidationError
+
 import src.settings
+from src.schemas.schema_base import CountStrategy
 
 
 def test_otlp_settings_with_mock_enviroments_values(os_enviroments_otlp_mock):
@@ -62,6 +66,20 @@ def test_database_settings_with_mock_enviroments_values(os_enviroments_database_
     assert database_settings.database_pool_recicle_seconds == 99
     assert database_settings.database_echo_sql == 'debug'
     assert database_settings.database_page_size == 1
+    assert database_settings.database_count_strategy is CountStrategy.EXACT
+
+
+def test_database_settings_should_read_the_count_strategy(os_enviroments_database_mock):
+    with mock.patch.dict(os.environ, {**os_enviroments_database_mock, 'DATABASE_COUNT_STRATEGY': 'estimated'}):
+        database_settings = src.settings.DatabaseSettings()
+
+    assert database_settings.database_count_strategy is CountStrategy.ESTIMATED
+
+
+def test_database_settings_should_reject_an_unknown_count_strategy(os_enviroments_database_mock):
+    with mock.patch.dict(os.environ, {**os_enviroments_database_mock, 'DATABASE_COUNT_STRATEGY': 'exat'}):
+        with pytest.raises(ValidationError, match='database_count_strategy'):
+            src.settings.DatabaseSettings()
 
 
 def test_database_async_uri(os_enviroments_database_mock):